@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from apps.telegram_bot.clients import AsyncTelegramBotClient, WeComWebhookClient
+from apps.telegram_bot.dispatcher import UpdateWatermark, update_chat_id
+from apps.telegram_bot.handlers import CommandRouter
+from apps.telegram_bot.history import HistoryStore
+from core.llm.async_openai_client import AsyncOpenAIChatClient, BlockingChatClient
+from infra.config import Settings, load_settings
+
+logger = logging.getLogger(__name__)
+
+
+class LoopTimer:
+    """``threading.Timer`` look-alike scheduled with ``loop.call_later``.
+
+    Waiting costs a timer handle instead of a thread; when it fires the
+    (synchronous) callback runs on ``executor``. ``start`` and ``cancel`` may
+    be called from any thread.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        executor: Optional[Executor],
+        delay: float,
+        callback: Callable[..., Any],
+        args: Sequence[Any] = (),
+    ):
+        self._loop = loop
+        self._executor = executor
+        self._delay = delay
+        self._callback = callback
+        self._args = tuple(args)
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._cancelled = False
+
+    def start(self) -> None:
+        self._loop.call_soon_threadsafe(self._arm)
+
+    def cancel(self) -> None:
+        self._cancelled = True
+        self._loop.call_soon_threadsafe(self._disarm)
+
+    def _arm(self) -> None:
+        if not self._cancelled:
+            self._handle = self._loop.call_later(self._delay, self._fire)
+
+    def _disarm(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+
+    def _fire(self) -> None:
+        if self._cancelled:
+            return
+        future = self._loop.run_in_executor(self._executor, self._callback, *self._args)
+        future.add_done_callback(_log_failure)
+
+
+def loop_timer_factory(loop: asyncio.AbstractEventLoop, executor: Optional[Executor] = None):
+    """Timer factory for the scheduling services (tracker, proactivity, …)."""
+
+    def _factory(delay: float, callback: Callable[..., Any], args: Sequence[Any]) -> LoopTimer:
+        return LoopTimer(loop, executor, delay, callback, args)
+
+    return _factory
+
+
+class BlockingTelegramClient:
+    """Synchronous facade over ``AsyncTelegramBotClient``.
+
+    Lets the existing handlers and services, which run in executor threads,
+    keep calling ``send_message`` and friends while the HTTP requests happen
+    on the event loop.
+    """
+
+    def __init__(self, client: AsyncTelegramBotClient, loop: asyncio.AbstractEventLoop):
+        self._client = client
+        self._loop = loop
+        self.history_store = client.history_store
+
+    def send_message(self, *args: Any, **kwargs: Any):
+        return self._run(self._client.send_message(*args, **kwargs))
+
+    def edit_message_text(self, *args: Any, **kwargs: Any):
+        return self._run(self._client.edit_message_text(*args, **kwargs))
+
+    def send_chat_action(self, *args: Any, **kwargs: Any) -> None:
+        self._run(self._client.send_chat_action(*args, **kwargs))
+
+    def _run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+
+class AsyncBotRuntime:
+    """Long-polling loop on asyncio with one lightweight lane per chat.
+
+    Each chat gets a queue and a consumer task (created on demand and dropped
+    when idle), so its updates run in order while chats interleave freely.
+    The synchronous ``CommandRouter`` runs on ``executor``; at most
+    ``max_pending`` updates are in flight before polling pauses. The update
+    checkpoint follows the same watermark rule as ``UpdateDispatcher``.
+    """
+
+    def __init__(
+        self,
+        client: AsyncTelegramBotClient,
+        history: HistoryStore,
+        router: CommandRouter,
+        executor: Executor,
+        poll_timeout: int = 25,
+        max_pending: int = 100,
+    ):
+        self._client = client
+        self._history = history
+        self._router = router
+        self._executor = executor
+        self._poll_timeout = poll_timeout
+        self._slots = asyncio.Semaphore(max(1, max_pending))
+        self._lanes: Dict[Optional[int], "asyncio.Queue[dict]"] = {}
+        self._watermark = UpdateWatermark()
+        # One thread keeps checkpoint writes in order without blocking the loop.
+        self._checkpoint_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="checkpoint")
+
+    async def run_forever(self) -> None:
+        logger.info("Starting asyncio Telegram bot long-polling loop")
+        offset = self._history.last_update_id()
+        backoff = 1.0
+        webhook_cleared = False
+        while True:
+            try:
+                if not webhook_cleared:
+                    # Polling is refused while a webhook is still registered.
+                    await self._client.delete_webhook()
+                    webhook_cleared = True
+                updates = await self._client.get_updates(
+                    offset=offset + 1 if offset is not None else None,
+                    timeout=self._poll_timeout,
+                )
+                backoff = 1.0
+                for update in updates:
+                    offset = update.get("update_id", offset)
+                    await self.submit(update)
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                logger.exception("Bot polling error: %s", error)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+
+    async def submit(self, update: dict) -> None:
+        await self._slots.acquire()
+        update_id = update.get("update_id")
+        if update_id is not None:
+            self._watermark.submit(update_id)
+        chat_id = update_chat_id(update)
+        lane = self._lanes.get(chat_id)
+        if lane is None:
+            lane = self._lanes[chat_id] = asyncio.Queue()
+            asyncio.get_running_loop().create_task(self._drain(chat_id, lane))
+        lane.put_nowait(update)
+
+    async def _drain(self, chat_id: Optional[int], lane: "asyncio.Queue[dict]") -> None:
+        loop = asyncio.get_running_loop()
+        while not lane.empty():
+            update = lane.get_nowait()
+            try:
+                await loop.run_in_executor(self._executor, self._router.handle, update)
+            except Exception:
+                logger.exception("处理 Telegram 更新失败：%s", update.get("update_id"))
+            finally:
+                self._finish(update.get("update_id"))
+                self._slots.release()
+        # Nothing can be enqueued between the empty check and this line: both
+        # run on the loop thread without an await in between.
+        self._lanes.pop(chat_id, None)
+
+    def _finish(self, update_id: Optional[int]) -> None:
+        if update_id is None:
+            return
+        advanced = self._watermark.finish(update_id)
+        if advanced is not None:
+            self._checkpoint_writer.submit(self._history.record_update_checkpoint, advanced)
+
+
+async def run(settings: Settings) -> None:
+    from apps.telegram_bot.bot import build_runtime
+
+    loop = asyncio.get_running_loop()
+    # Runs the synchronous handlers and timer callbacks only. They block on
+    # the Telegram client, whose requests use the client's own I/O threads.
+    executor = ThreadPoolExecutor(
+        max_workers=max(4, settings.telegram.workers * 2), thread_name_prefix="bot-sync"
+    )
+    history = HistoryStore(
+        settings.paths.history_dir,
+        durability=settings.telegram.checkpoint_durability,
+        flush_interval=settings.telegram.checkpoint_flush_seconds,
+        timer_factory=loop_timer_factory(loop, executor),
+    )
+    client = AsyncTelegramBotClient(
+        token=settings.telegram.token,
+        history_store=history,
+        request_timeout=settings.telegram.poll_timeout + 5,
+        wecom_client=WeComWebhookClient(settings.wecom.webhook_url) if settings.wecom else None,
+    )
+    llm_client = None
+    if settings.llm and settings.llm.enabled:
+        llm_client = BlockingChatClient(
+            AsyncOpenAIChatClient(
+                api_key=settings.llm.api_key,
+                base_url=settings.llm.base_url,
+                model=settings.llm.model,
+                provider=settings.llm.provider,
+                timeout_seconds=settings.llm.timeout_seconds,
+                stream_deadline_seconds=settings.llm.stream_deadline_seconds,
+                max_retries=settings.llm.max_retries,
+                fallbacks=settings.llm.fallbacks,
+                breaker_failures=settings.llm.breaker_failures,
+                breaker_reset_seconds=settings.llm.breaker_reset_seconds,
+            ),
+            loop,
+        )
+    # Service construction reads repositories and timer state from disk.
+    runtime = await loop.run_in_executor(
+        executor,
+        lambda: build_runtime(
+            settings,
+            history=history,
+            client=BlockingTelegramClient(client, loop),
+            llm_client=llm_client,
+            timer_factory=loop_timer_factory(loop, executor),
+            threaded_dispatch=False,
+        ),
+    )
+    bot = AsyncBotRuntime(
+        client,
+        history,
+        runtime.router,
+        executor,
+        poll_timeout=settings.telegram.poll_timeout,
+        max_pending=settings.telegram.max_pending_updates,
+    )
+    try:
+        await bot.run_forever()
+    finally:
+        if runtime.digests is not None:
+            runtime.digests.close()
+        await client.close()
+        history.close()
+
+
+def main(settings: Optional[Settings] = None) -> None:
+    asyncio.run(run(settings or load_settings()))
+
+
+def _log_failure(future: "asyncio.Future[Any]") -> None:
+    if not future.cancelled() and future.exception() is not None:
+        logger.error("定时任务执行失败", exc_info=future.exception())
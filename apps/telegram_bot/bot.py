@@ -1,28 +1,40 @@
 from __future__ import annotations
 
 import logging
+import secrets
 import time
 from dataclasses import dataclass, field
 from pathlib import Path
 import threading
-from typing import List
+from typing import Any, Callable, List, Optional
+from urllib.parse import urlparse
 
 from apps.telegram_bot.clients import TelegramBotClient, WeComWebhookClient
+from apps.telegram_bot.deadline_alerts import DeadlineAlertScheduler
+from apps.telegram_bot.dispatcher import UpdateDispatcher
+from apps.telegram_bot.digests import TaskDigestService
 from apps.telegram_bot.handlers import CommandRouter
 from apps.telegram_bot.history import HistoryStore
+from apps.telegram_bot.outbound import OutboundQueue
 from apps.telegram_bot.proactivity import ProactivityService
 from apps.telegram_bot.rest import RestScheduleService
 from apps.telegram_bot.session_monitor import TaskSessionMonitor
 from apps.telegram_bot.tracker import TaskTracker
 from apps.telegram_bot.user_state import UserStateService
+from apps.telegram_bot.webhook import WebhookServer
 from core.llm.agent import LLMAgent
 from core.llm.context_builder import AgentContextBuilder
+from core.llm.conversation_window import ConversationWindow
+from core.llm.history_recall import HistoryRecall
+from core.llm.intents import IntentRouter
+from core.llm.tool_selector import ToolSelector
 from core.llm.openai_client import OpenAIChatClient
 from core.llm.run_logger import AgentRunLogger
 from core.llm.tools import build_default_tools
 from core.repositories import LogRepository, ProjectRepository, TaskRepository
-from core.services import LogbookService, StatusGuard, TaskSummaryService
-from infra.config import load_settings
+from core.services import LogbookService, StatusGuard, TaskSearchIndex, TaskSummaryService
+from core.utils.telemetry import telemetry
+from infra.config import Settings, load_settings
 from infra.notion_sync import NotionSyncService
 
 logger = logging.getLogger(__name__)
@@ -35,31 +47,119 @@ class BotRuntime:
     router: CommandRouter
     poll_timeout: int = 25
     background_threads: List[threading.Thread] = field(default_factory=list)
+    dispatcher: Optional[UpdateDispatcher] = None
+    outbound: Optional[OutboundQueue] = None
+    webhook: Optional[WebhookServer] = None
+    webhook_url: Optional[str] = None
+    webhook_secret: Optional[str] = None
+    digests: Optional[TaskDigestService] = None
 
     def run_forever(self):
+        if self.webhook is not None:
+            self.run_webhook()
+            return
         logger.info("Starting Telegram bot long-polling loop")
         offset = self.history.last_update_id()
+        backoff = 1.0
+        webhook_cleared = False
         while True:
             try:
+                if not webhook_cleared:
+                    # getUpdates is refused while a webhook from an earlier
+                    # webhook-mode run is still registered.
+                    self.client.delete_webhook()
+                    webhook_cleared = True
+                if self.dispatcher is not None:
+                    offset = self._poll_dispatched(offset)
+                    backoff = 1.0
+                    continue
+                # getUpdates itself waits up to poll_timeout for new updates,
+                # so an empty answer is simply followed by the next poll.
                 updates = self.client.get_updates(
                     offset=offset + 1 if offset is not None else None,
                     timeout=self.poll_timeout,
                 )
-                if not updates:
-                    time.sleep(5)
-                    continue
+                backoff = 1.0
                 for update in updates:
-                    self.router.handle(update)
                     offset = update.get("update_id", offset)
+                    self.router.handle(update)
                     self.history.record_update_checkpoint(offset)
+                if updates:
+                    self.history.flush_checkpoint()
             except Exception as error:
                 logger.exception("Bot polling error: %s", error)
-                time.sleep(5)
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
 
+    def _poll_dispatched(self, submitted: Optional[int]) -> Optional[int]:
+        """Fetch from the dispatcher's watermark and submit unseen updates.
 
-def build_runtime() -> BotRuntime:
-    settings = load_settings()
-    history = HistoryStore(settings.paths.history_dir)
+        Telegram forgets every update below the ``getUpdates`` offset, so the
+        offset must not move past updates that are still queued: after a crash
+        they are fetched again instead of being lost. Updates that come back
+        while still queued are skipped. Returns the highest submitted id.
+        """
+        watermark = self.dispatcher.watermark
+        confirmed = watermark if watermark is not None else self.history.last_update_id()
+        updates = self.client.get_updates(
+            offset=confirmed + 1 if confirmed is not None else None,
+            timeout=self.poll_timeout,
+        )
+        fresh = [
+            update
+            for update in updates
+            if submitted is None or update.get("update_id", submitted + 1) > submitted
+        ]
+        for update in fresh:
+            # Blocks while the chat's worker queue is full.
+            self.dispatcher.submit(update)
+            submitted = update.get("update_id", submitted)
+        if updates and not fresh:
+            # Only queued updates came back, so getUpdates would return at
+            # once; let a worker finish something before asking again.
+            self.dispatcher.wait_for_progress(timeout=1.0)
+        return submitted
+
+    def close(self):
+        """Drain queued updates and messages, then persist the checkpoint."""
+        if self.webhook is not None:
+            self.webhook.stop()
+        if self.dispatcher is not None:
+            self.dispatcher.stop()
+        if self.outbound is not None:
+            self.outbound.close()
+        if self.digests is not None:
+            self.digests.close()
+        self.history.close()
+
+    def run_webhook(self):
+        """Register the webhook with Telegram and serve it until interrupted."""
+        self.client.set_webhook(self.webhook_url, secret_token=self.webhook_secret)
+        logger.info("Telegram webhook registered: %s", self.webhook_url)
+        self.webhook.serve_forever()
+
+
+def build_runtime(
+    settings: Optional[Settings] = None,
+    history: Optional[HistoryStore] = None,
+    client: Any = None,
+    llm_client: Any = None,
+    timer_factory: Optional[Callable[..., Any]] = None,
+    threaded_dispatch: bool = True,
+) -> BotRuntime:
+    """Wire every service together.
+
+    ``client``, ``llm_client`` and ``timer_factory`` replace the blocking
+    Telegram client, the OpenAI client and ``threading.Timer``; the asyncio
+    runtime passes loop-backed equivalents here.
+    """
+    settings = settings or load_settings()
+    history = history or HistoryStore(
+        settings.paths.history_dir,
+        durability=settings.telegram.checkpoint_durability,
+        flush_interval=settings.telegram.checkpoint_flush_seconds,
+        timer_factory=timer_factory,
+    )
     user_state = UserStateService(settings.paths.history_dir / "user_state.json")
     user_state.reset_all()
     rest_service = RestScheduleService(settings.paths.history_dir / "rest_windows.json")
@@ -83,29 +183,52 @@ def build_runtime() -> BotRuntime:
         if settings.wecom
         else None
     )
-    client = TelegramBotClient(
-        token=settings.telegram.token,
-        history_store=history,
-        request_timeout=settings.telegram.poll_timeout + 5,
-        wecom_client=wecom_client,
-    )
+    outbound = None
+    if client is None:
+        client = TelegramBotClient(
+            token=settings.telegram.token,
+            history_store=history,
+            request_timeout=settings.telegram.poll_timeout + 5,
+            wecom_client=wecom_client,
+        )
+        outbound = OutboundQueue(
+            client,
+            global_rate=settings.telegram.send_rate_global,
+            chat_rate=settings.telegram.send_rate_per_chat,
+        )
+    # Handlers and timers enqueue through the outbound queue; polling and
+    # webhook registration keep using the client directly.
+    sender = outbound or client
     profile_path = Path(__file__).resolve().parents[2] / "docs" / "user_profile_doc.md"
     # print(profile_path)
-    context_builder = AgentContextBuilder(history, profile_path)
-    run_logger = AgentRunLogger(settings.paths.history_dir / "agent_runs")
+    context_builder = AgentContextBuilder(
+        history,
+        profile_path,
+        window=ConversationWindow(
+            max_tokens=settings.llm.history_tokens if settings.llm else 2000
+        ),
+        recall=HistoryRecall(history),
+    )
+    run_logger = AgentRunLogger(
+        settings.paths.history_dir / "agent_runs",
+        redact=bool(settings.llm and settings.llm.run_log_redact),
+        sample_rate=settings.llm.run_log_sample_rate if settings.llm else 0.0,
+    )
     tracker = TaskTracker(
-        client,
+        sender,
         interval_seconds=settings.tracker_interval,
         follow_up_seconds=settings.tracker_follow_up,
         rest_service=rest_service,
         user_state=user_state,
         storage_path=settings.paths.history_dir / "tracker_entries.json",
+        timer_factory=timer_factory,
     )
     session_monitor = TaskSessionMonitor(
-        client,
+        sender,
         rest_service,
         tracker=tracker,
         task_repository=task_repo,
+        timer_factory=timer_factory,
     )
     proactivity = ProactivityService(
         state_service=user_state,
@@ -116,6 +239,7 @@ def build_runtime() -> BotRuntime:
         follow_up_seconds=settings.proactivity.question_follow_up_seconds,
         state_unknown_retry_seconds=settings.proactivity.state_unknown_retry_seconds,
         tracker=tracker,
+        timer_factory=timer_factory,
     )
     llm_agent = None
     tools = build_default_tools(
@@ -130,13 +254,23 @@ def build_runtime() -> BotRuntime:
         rest_service=rest_service,
         session_monitor=session_monitor,
         notion_sync_service=notion_sync,
+        search_index=TaskSearchIndex(task_repo, log_repo),
+        payload_token_budget=settings.llm.tool_payload_tokens if settings.llm else 3000,
     )
     if settings.llm and settings.llm.enabled:
-        llm_client = OpenAIChatClient(
+        llm_client = llm_client or OpenAIChatClient(
             api_key=settings.llm.api_key,
             base_url=settings.llm.base_url,
             model=settings.llm.model,
             provider=settings.llm.provider,
+            timeout_seconds=settings.llm.timeout_seconds,
+            stream_deadline_seconds=settings.llm.stream_deadline_seconds,
+            max_retries=settings.llm.max_retries,
+            fallbacks=settings.llm.fallbacks,
+            hedge_after_seconds=settings.llm.hedge_after_seconds,
+            max_concurrent_calls=settings.llm.max_concurrent_turns,
+            breaker_failures=settings.llm.breaker_failures,
+            breaker_reset_seconds=settings.llm.breaker_reset_seconds,
         )
         llm_agent = LLMAgent(
             context_builder=context_builder,
@@ -147,6 +281,8 @@ def build_runtime() -> BotRuntime:
             llm_client=llm_client,
             temperature=settings.llm.temperature,
             run_logger=run_logger,
+            intent_router=IntentRouter(threshold=settings.llm.intent_threshold),
+            tool_selector=ToolSelector(tools),
         )
     else:
         llm_agent = LLMAgent(
@@ -157,6 +293,7 @@ def build_runtime() -> BotRuntime:
             tools=tools,
             llm_client=None,
             run_logger=run_logger,
+            intent_router=IntentRouter(),
         )
 
     if llm_agent is None:
@@ -168,9 +305,17 @@ def build_runtime() -> BotRuntime:
     if settings.notion.sync_interval > 0:
         thread = notion_sync.start_background_sync(settings.notion.sync_interval)
         background_threads.append(thread)
+    reporter = telemetry.start_reporter(settings.telemetry_report_seconds)
+    if reporter is not None:
+        background_threads.append(reporter)
 
+    digests = TaskDigestService(
+        task_repo,
+        storage_path=settings.paths.processed_dir / "task_digests.json",
+        timer_factory=timer_factory,
+    )
     router = CommandRouter(
-        client=client,
+        client=sender,
         history_store=history,
         agent=llm_agent,
         task_repo=task_repo,
@@ -181,20 +326,71 @@ def build_runtime() -> BotRuntime:
         rest_service=rest_service,
         session_monitor=session_monitor,
         notion_sync=notion_sync,
+        admin_ids=settings.telegram.admin_ids,
+        digests=digests,
+        stream_replies=bool(settings.llm and settings.llm.enabled and settings.llm.stream),
+        max_concurrent_turns=settings.llm.max_concurrent_turns if settings.llm else 2,
     )
+    deadline_alerts = DeadlineAlertScheduler(
+        status_guard,
+        task_repo,
+        handler=router.broadcast_interventions,
+        storage_path=settings.paths.history_dir / "deadline_alerts.json",
+        timer_factory=timer_factory,
+    )
+    deadline_alerts.start()
+    dispatcher = None
+    webhook_url = settings.telegram.webhook_url
+    # Webhook requests must be answered quickly, so they always go through
+    # the dispatcher even with a single worker.
+    if threaded_dispatch and (settings.telegram.workers > 1 or webhook_url):
+        dispatcher = UpdateDispatcher(
+            router.handle,
+            checkpoint=history.record_update_checkpoint,
+            workers=max(1, settings.telegram.workers),
+            max_pending=settings.telegram.max_pending_updates,
+        )
+    webhook = None
+    webhook_secret = None
+    if webhook_url and dispatcher is not None:
+        webhook_secret = settings.telegram.webhook_secret or secrets.token_urlsafe(32)
+        webhook = WebhookServer(
+            dispatcher.submit,
+            secret_token=webhook_secret,
+            host=settings.telegram.webhook_host,
+            port=settings.telegram.webhook_port,
+            path=urlparse(webhook_url).path or "/telegram",
+        )
     return BotRuntime(
         client=client,
         history=history,
         router=router,
         poll_timeout=settings.telegram.poll_timeout,
         background_threads=background_threads,
+        dispatcher=dispatcher,
+        outbound=outbound,
+        webhook=webhook,
+        webhook_url=webhook_url,
+        webhook_secret=webhook_secret,
+        digests=digests,
     )
 
 
 def main():
     logging.basicConfig(level=logging.INFO)
-    runtime = build_runtime()
-    runtime.run_forever()
+    settings = load_settings()
+    if settings.telegram and settings.telegram.runtime == "asyncio":
+        if settings.telegram.webhook_url:
+            logger.warning("asyncio 运行时暂不支持 Webhook，继续使用长轮询")
+        from apps.telegram_bot.async_runtime import main as async_main
+
+        async_main(settings)
+        return
+    runtime = build_runtime(settings)
+    try:
+        runtime.run_forever()
+    finally:
+        runtime.close()
 
 
 if __name__ == "__main__":
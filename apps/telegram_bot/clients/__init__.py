@@ -1,4 +1,5 @@
+from .async_telegram_client import AsyncTelegramBotClient
 from .telegram_client import TelegramAPIError, TelegramBotClient
 from .wecom_client import WeComWebhookClient
 
-__all__ = ["TelegramBotClient", "TelegramAPIError", "WeComWebhookClient"]
+__all__ = ["AsyncTelegramBotClient", "TelegramBotClient", "TelegramAPIError", "WeComWebhookClient"]
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+import requests
+
+from apps.telegram_bot.history.history_store import HistoryStore
+from core.utils.telemetry import telemetry
+from .wecom_client import WeComWebhookClient
+
+try:  # pragma: no cover - optional dependency
+    import aiohttp
+except ImportError:  # pragma: no cover - optional dependency
+    aiohttp = None
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncTelegramBotClient:
+    """asyncio Telegram Bot API client.
+
+    Uses ``aiohttp`` when it is installed; otherwise each request runs on a
+    ``requests`` session in the client's own I/O executor so the API stays the
+    same. History writes and the WeCom mirror are offloaded to it too. The
+    executor must not be the pool that runs the synchronous handlers: those
+    block on this client, and would otherwise wait for their own threads.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        history_store: HistoryStore,
+        base_url: str | None = None,
+        request_timeout: int = 30,
+        wecom_client: Optional[WeComWebhookClient] = None,
+        session: Any = None,
+        io_executor: Optional[Executor] = None,
+        io_workers: int = 8,
+    ):
+        self.token = token
+        self.history_store = history_store
+        self.base_url = base_url or f"https://api.telegram.org/bot{token}"
+        self.request_timeout = request_timeout
+        self.wecom_client = wecom_client
+        self._session = session
+        self._owns_session = session is None
+        self._io = io_executor or ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="telegram-io")
+        self._owns_io = io_executor is None
+
+    async def close(self) -> None:
+        if self._owns_session and self._session is not None:
+            closed = self._session.close()
+            if asyncio.iscoroutine(closed):
+                await closed
+        self._session = None
+        if self._owns_io:
+            self._io.shutdown(wait=False)
+
+    async def get_updates(self, offset: int | None = None, timeout: int = 25):
+        params = {"timeout": timeout}
+        if offset is not None:
+            params["offset"] = offset
+        payload = await self._call("getUpdates", params, method="GET")
+        return payload.get("result", [])
+
+    async def delete_webhook(self, drop_pending_updates: bool = False):
+        return await self._call("deleteWebhook", {"drop_pending_updates": str(drop_pending_updates).lower()})
+
+    async def send_message(
+        self,
+        chat_id: int,
+        text: str,
+        parse_mode: str | None = "Markdown",
+        record_history: bool = True,
+        priority: int | None = None,
+        **kwargs: Any,
+    ):
+        data = {"chat_id": chat_id, "text": text}
+        if parse_mode:
+            data["parse_mode"] = parse_mode
+        data.update(kwargs)
+        with telemetry.span("telegram_send"):
+            payload = await self._call("sendMessage", data)
+        message = payload["result"]
+        if record_history:
+            await self._record(message, text)
+        return message
+
+    async def edit_message_text(
+        self,
+        chat_id: int,
+        message_id: int,
+        text: str,
+        parse_mode: str | None = "Markdown",
+        record_history: bool = False,
+        priority: int | None = None,
+        **kwargs: Any,
+    ):
+        data = {"chat_id": chat_id, "message_id": message_id, "text": text}
+        if parse_mode:
+            data["parse_mode"] = parse_mode
+        data.update(kwargs)
+        with telemetry.span("telegram_edit"):
+            payload = await self._call("editMessageText", data)
+        message = payload["result"]
+        if record_history and isinstance(message, dict):
+            await self._record(message, text)
+        return message
+
+    async def send_chat_action(self, chat_id: int, action: str = "typing") -> None:
+        await self._call("sendChatAction", {"chat_id": chat_id, "action": action})
+
+    async def _call(self, api_method: str, data: Dict[str, Any], method: str = "POST") -> Dict[str, Any]:
+        url = f"{self.base_url}/{api_method}"
+        if aiohttp is None:
+            return await self._offload(self._call_blocking, url, data, method)
+        if self._session is None:
+            self._session = aiohttp.ClientSession()
+        timeout = aiohttp.ClientTimeout(total=self.request_timeout)
+        if method == "GET":
+            request = self._session.get(url, params=data, timeout=timeout)
+        else:
+            request = self._session.post(url, data=data, timeout=timeout)
+        async with request as response:
+            try:
+                payload = await response.json(content_type=None)
+            except ValueError:
+                payload = await response.text()
+            if response.status >= 400:
+                raise RuntimeError(f"Telegram API error {response.status}: {payload}")
+            return payload
+
+    def _call_blocking(self, url: str, data: Dict[str, Any], method: str) -> Dict[str, Any]:
+        if self._session is None:
+            self._session = requests.Session()
+        if method == "GET":
+            response = self._session.get(url, params=data, timeout=self.request_timeout)
+        else:
+            response = self._session.post(url, data=data, timeout=self.request_timeout)
+        try:
+            payload = response.json()
+        except ValueError:
+            payload = response.text
+        if response.status_code >= 400:
+            raise RuntimeError(f"Telegram API error {response.status_code}: {payload}")
+        return payload
+
+    async def _record(self, message: Dict[str, Any], text: str) -> None:
+        await self._offload(self.history_store.append_bot, message)
+        if self.wecom_client:
+            try:
+                await self._offload(self.wecom_client.send_text, text)
+            except Exception as error:  # pragma: no cover - best effort logging
+                logger.warning("Mirror message to WeCom failed: %s", error)
+
+    async def _offload(self, func: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._io, func, *args)
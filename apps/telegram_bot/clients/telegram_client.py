@@ -8,13 +8,17 @@ from typing import Any, Dict, Optional
 import requests
 
 from apps.telegram_bot.history.history_store import HistoryStore
+from core.utils.telemetry import telemetry
 from .wecom_client import WeComWebhookClient
 
 logger = logging.getLogger(__name__)
 
 
 class TelegramAPIError(RuntimeError):
-    pass
+    def __init__(self, message: str, status_code: int | None = None, retry_after: float | None = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
 
 
 @dataclass
@@ -46,7 +50,14 @@ class TelegramBotClient:
             except ValueError:
                 data = response.text
 
-            raise RuntimeError(f"Telegram API error {response.status_code}: {data}")
+            retry_after = None
+            if isinstance(data, dict):
+                retry_after = (data.get("parameters") or {}).get("retry_after")
+            raise TelegramAPIError(
+                f"Telegram API error {response.status_code}: {data}",
+                status_code=response.status_code,
+                retry_after=retry_after,
+            )
 
         # 正常情况
         try:
@@ -67,23 +78,95 @@ class TelegramBotClient:
         payload = self._handle_response(response)
         return payload.get("result", [])
 
-    def send_message(self, chat_id: int, text: str, parse_mode: str | None = "Markdown", **kwargs):
+    def send_message(
+        self,
+        chat_id: int,
+        text: str,
+        parse_mode: str | None = "Markdown",
+        record_history: bool = True,
+        priority: int | None = None,
+        **kwargs,
+    ):
+        """Send a message right away; ``priority`` only matters to ``OutboundQueue``."""
         print("Sending message:", [text])
         data = {"chat_id": chat_id, "text": text}
         if parse_mode:
             data["parse_mode"] = parse_mode
         data.update(kwargs)
+        with telemetry.span("telegram_send"):
+            response = self.session.post(
+                f"{self.base_url}/sendMessage",
+                data=data,
+                timeout=self.request_timeout,
+            )
+        payload = self._handle_response(response)
+        message = payload["result"]
+        if record_history:
+            self._record(message, text)
+        return message
+
+    def edit_message_text(
+        self,
+        chat_id: int,
+        message_id: int,
+        text: str,
+        parse_mode: str | None = "Markdown",
+        record_history: bool = False,
+        priority: int | None = None,
+        **kwargs,
+    ):
+        """Replace the text of a message sent earlier.
+
+        Intermediate edits stay out of the history; pass ``record_history`` on
+        the final edit so the settled text is stored (once, keyed by message id).
+        """
+        data = {"chat_id": chat_id, "message_id": message_id, "text": text}
+        if parse_mode:
+            data["parse_mode"] = parse_mode
+        data.update(kwargs)
+        with telemetry.span("telegram_edit"):
+            response = self.session.post(
+                f"{self.base_url}/editMessageText",
+                data=data,
+                timeout=self.request_timeout,
+            )
+        payload = self._handle_response(response)
+        message = payload["result"]
+        if record_history and isinstance(message, dict):
+            self._record(message, text)
+        return message
+
+    def set_webhook(self, url: str, secret_token: str | None = None, drop_pending_updates: bool = False):
+        data: Dict[str, Any] = {"url": url, "drop_pending_updates": drop_pending_updates}
+        if secret_token:
+            data["secret_token"] = secret_token
         response = self.session.post(
-            f"{self.base_url}/sendMessage",
+            f"{self.base_url}/setWebhook",
             data=data,
             timeout=self.request_timeout,
         )
-        payload = self._handle_response(response)
-        message = payload["result"]
+        return self._handle_response(response)
+
+    def delete_webhook(self, drop_pending_updates: bool = False):
+        response = self.session.post(
+            f"{self.base_url}/deleteWebhook",
+            data={"drop_pending_updates": drop_pending_updates},
+            timeout=self.request_timeout,
+        )
+        return self._handle_response(response)
+
+    def send_chat_action(self, chat_id: int, action: str = "typing") -> None:
+        response = self.session.post(
+            f"{self.base_url}/sendChatAction",
+            data={"chat_id": chat_id, "action": action},
+            timeout=self.request_timeout,
+        )
+        self._handle_response(response)
+
+    def _record(self, message: Dict[str, Any], text: str) -> None:
         self.history_store.append_bot(message)
         if self.wecom_client:
             self._mirror_to_wecom(text)
-        return message
 
     def _mirror_to_wecom(self, text: str) -> None:
         try:
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, List, Optional, Set
+
+from core.domain import Intervention
+from core.repositories import RepositoryChange, TaskRepository
+from core.services import StatusGuard
+from core.utils.timezone import local_now
+
+logger = logging.getLogger(__name__)
+
+AlertHandler = Callable[[List[Intervention]], None]
+
+
+def _alert_key(intervention: Intervention) -> str:
+    # The message embeds the deadline, so moving a due date re-arms the alert.
+    return f"{intervention.task_id}|{intervention.reason}|{intervention.message}"
+
+
+class DeadlineAlertScheduler:
+    """Pushes ``due_soon``/``overdue`` interventions when a deadline is crossed.
+
+    A single timer is armed for ``StatusGuard.next_transition()``; task changes
+    re-arm it shortly afterwards. Alerts already delivered are remembered (and
+    persisted when ``storage_path`` is set) so each one is sent once.
+    """
+
+    def __init__(
+        self,
+        status_guard: StatusGuard,
+        task_repository: TaskRepository,
+        handler: AlertHandler,
+        timer_factory=None,
+        storage_path: Path | None = None,
+        change_delay_seconds: float = 2.0,
+        max_sleep_seconds: float = 6 * 3600,
+    ):
+        self._guard = status_guard
+        self._task_repo = task_repository
+        self._handler = handler
+        self._timer_factory = timer_factory or self._default_timer
+        self._storage_path = Path(storage_path) if storage_path else None
+        self._change_delay = change_delay_seconds
+        self._max_sleep = max_sleep_seconds
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        self._unsubscribe: Optional[Callable[[], None]] = None
+        self._sent: Set[str] = self._load_sent()
+
+    def _default_timer(self, delay, callback, args):
+        timer = threading.Timer(delay, callback, args=args)
+        timer.daemon = True
+        return timer
+
+    def start(self) -> None:
+        if self._unsubscribe is None:
+            self._unsubscribe = self._task_repo.subscribe(self._on_task_change)
+        self._arm(0)
+
+    def stop(self) -> None:
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+
+    def check_now(self) -> List[Intervention]:
+        """Evaluate immediately, deliver new alerts and re-arm the timer."""
+        now = local_now()
+        interventions = self._guard.evaluate(now)
+        current = {_alert_key(item) for item in interventions}
+        with self._lock:
+            previous = self._sent
+            fresh = [item for item in interventions if _alert_key(item) not in previous]
+            # Forget alerts that no longer apply so a reopened task can alert again.
+            self._sent = previous & current
+        if fresh:
+            try:
+                self._handler(fresh)
+            except Exception:
+                # Left out of ``_sent`` so the next check retries them.
+                logger.exception("截止提醒推送失败")
+            else:
+                with self._lock:
+                    self._sent |= {_alert_key(item) for item in fresh}
+        with self._lock:
+            changed = self._sent != previous
+        if changed:
+            self._persist()
+        upcoming = self._guard.next_transition(now)
+        delay = self._max_sleep
+        if upcoming is not None:
+            delay = min(delay, max(1.0, (upcoming - now).total_seconds() + 1))
+        self._arm(delay)
+        return fresh
+
+    def _on_task_change(self, _: RepositoryChange) -> None:
+        self._arm(self._change_delay)
+
+    def _arm(self, delay: float) -> None:
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+            self._timer = self._timer_factory(delay, self._fire, ())
+            self._timer.start()
+
+    def _fire(self) -> None:
+        try:
+            self.check_now()
+        except Exception:
+            logger.exception("截止提醒检查失败")
+            self._arm(self._max_sleep)
+
+    def _load_sent(self) -> Set[str]:
+        if not self._storage_path or not self._storage_path.exists():
+            return set()
+        try:
+            data = json.loads(self._storage_path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            return set()
+        return set(data.get("sent", []))
+
+    def _persist(self) -> None:
+        if not self._storage_path:
+            return
+        with self._lock:
+            snapshot = {"sent": sorted(self._sent)}
+        self._storage_path.parent.mkdir(parents=True, exist_ok=True)
+        self._storage_path.write_text(
+            json.dumps(snapshot, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
@@ -0,0 +1,357 @@
+from __future__ import annotations
+
+import bisect
+import json
+import logging
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from apps.telegram_bot.tracker import escape_md
+from core.domain import Task, notion_page_url
+from core.repositories import RepositoryChange
+from core.repositories.changes import DELETE, RESET
+from core.services.status_guard import CLOSED_STATUSES
+from core.services.task_summary_service import PRIORITY_ORDER
+from core.utils.timezone import format_beijing, local_now, parse_due
+
+logger = logging.getLogger(__name__)
+
+UNGROUPED = "未归类"
+
+SortKey = Tuple[int, str, str]
+
+
+def format_due(value: Optional[str]) -> str:
+    if not value:
+        return "未计划"
+    try:
+        return format_beijing(datetime.fromisoformat(value))
+    except ValueError:
+        return value
+
+
+def format_task_link(obj: Any) -> str:
+    task_label = escape_md(getattr(obj, "task_name", None) or getattr(obj, "name", None) or getattr(obj, "task_id", None) or "未关联")
+    url = getattr(obj, "task_url", None) or getattr(obj, "url", None)
+    if url and "notion.so" in url:
+        return f"[{task_label}]({url})"
+    return task_label
+
+
+def _sort_key(task: Task) -> SortKey:
+    return (
+        PRIORITY_ORDER.get(task.priority, 99),
+        task.due_date or "9999-12-31",
+        (task.name or "").lower(),
+    )
+
+
+def _render_fragments(task: Task) -> Dict[str, str]:
+    """Per-task markdown pieces shared by every digest view."""
+    name = escape_md(task.name)
+    status = escape_md(task.status or "Unknown")
+    due_text = format_due(task.due_date)
+    project = escape_md(task.project_name or "")
+    today = (
+        f"{format_task_link(task)} ｜状态:{status} ｜优先级:{escape_md(task.priority or 'Unknown')} ｜截止:{due_text}"
+    )
+    if project:
+        today += f"\n  项目：{project}"
+    light = f"[{name}]({task.url})" if task.url else name
+    return {
+        "today": today,
+        "light": f"{light}\n   项目：{project or UNGROUPED}",
+        "project": f"  - [{name}]({task.url or notion_page_url(task.id)}) ｜状态:{status} ｜截止:{due_text}",
+        "project_light": f"  - {light}",
+        "overdue": f"{format_task_link(task)} ｜截止:{due_text} ｜优先级:{escape_md(task.priority or 'Unknown')}",
+    }
+
+
+@dataclass(slots=True)
+class DigestView:
+    text: str
+    task_ids: List[str] = field(default_factory=list)
+    generation: Optional[int] = None
+
+
+@dataclass(slots=True)
+class _DigestEntry:
+    key: SortKey
+    project: str
+    fragments: Dict[str, str]
+
+
+class TaskDigestService:
+    """Materialised `/tasks` views, kept current from repository change events.
+
+    Each task's markdown fragments and sort key are rendered once and patched
+    when that task changes; a Notion sync (repository reset) rebuilds the whole
+    digest eagerly in the sync thread. Views are then assembled from the cached
+    fragments. With ``storage_path`` the digest is also written next to the
+    processed data and reused on startup while the source files are unchanged:
+    right after a sync, and ``persist_delay_seconds`` after a burst of single
+    task changes, so local edits do not rewrite the file on the caller's
+    thread. ``close`` writes any pending snapshot. Repositories that do not
+    publish changes are re-read on every call.
+    """
+
+    def __init__(
+        self,
+        task_repository: Any,
+        storage_path: Path | None = None,
+        timer_factory=None,
+        persist_delay_seconds: float = 30.0,
+    ):
+        self._task_repo = task_repository
+        self._storage_path = Path(storage_path) if storage_path else None
+        self._timer_factory = timer_factory or self._default_timer
+        self._persist_delay = persist_delay_seconds
+        self._persist_timer = None
+        self._lock = threading.RLock()
+        self._entries: Dict[str, _DigestEntry] = {}
+        self._order: List[Tuple[SortKey, str]] = []
+        self._groups: Optional[List[Tuple[str, List[str]]]] = None
+        self._views: Dict[Tuple[str, int], DigestView] = {}
+        self._generation: Optional[int] = None
+        self._live = hasattr(task_repository, "subscribe") and hasattr(task_repository, "generation")
+        if self._live:
+            task_repository.subscribe(self._on_change)
+            self._load_snapshot()
+
+    # ------------------------------------------------------------------ views
+    def today(self, limit: int = 10) -> DigestView:
+        return self._view("today", limit, self._render_today)
+
+    def light(self, limit: int = 10) -> DigestView:
+        return self._view("light", limit, self._render_light)
+
+    def projects(self, per_project_limit: int = 5, light: bool = False) -> DigestView:
+        name = "project_light" if light else "project"
+        return self._view(name, per_project_limit, lambda limit: self._render_projects(limit, light))
+
+    def overdue(self, limit: int = 20) -> DigestView:
+        # Depends on the clock, so it is assembled on every call from the
+        # repository's due timeline rather than from the cached entries.
+        now = local_now()
+        if hasattr(self._task_repo, "tasks_due_between"):
+            due = self._task_repo.tasks_due_between(end=now)
+        else:
+            due = [
+                (moment, task)
+                for task in self._task_repo.list_active_tasks()
+                for moment in [parse_due(task.due_date)]
+                if moment is not None and moment <= now
+            ]
+            due.sort(key=lambda item: item[0])
+        tasks = [task for _, task in due if task.status not in CLOSED_STATUSES][:limit]
+        with self._lock:
+            self._ensure_current()
+            lines = ["*已逾期任务*"]
+            for idx, task in enumerate(tasks, start=1):
+                entry = self._entries.get(task.id)
+                fragment = entry.fragments["overdue"] if entry else _render_fragments(task)["overdue"]
+                lines.append(f"{idx}. {fragment}")
+            return DigestView("\n".join(lines), [task.id for task in tasks], self._generation)
+
+    # ------------------------------------------------------------- rendering
+    def _view(self, name: str, limit: int, render) -> DigestView:
+        with self._lock:
+            self._ensure_current()
+            cached = self._views.get((name, limit))
+            if cached is not None:
+                return cached
+            view = render(limit)
+            view.generation = self._generation
+            if self._live:
+                self._views[(name, limit)] = view
+            return view
+
+    def _render_today(self, limit: int) -> DigestView:
+        task_ids = [task_id for _, task_id in self._order[:limit]]
+        lines: List[str] = []
+        for idx, task_id in enumerate(task_ids, start=1):
+            lines.append(f"{idx}. {self._entries[task_id].fragments['today']}")
+            lines.append("")
+        lines.append(escape_md("提示：/tasks update <序号> status=进行中 或 /tasks delete <序号>（仅自建任务）"))
+        return DigestView("\n".join(lines).strip(), task_ids)
+
+    def _render_light(self, limit: int) -> DigestView:
+        task_ids = [task_id for _, task_id in self._order[:limit]]
+        lines = ["*轻量任务视图*"]
+        lines.extend(
+            f"{idx}. {self._entries[task_id].fragments['light']}"
+            for idx, task_id in enumerate(task_ids, start=1)
+        )
+        return DigestView("\n".join(lines).strip(), task_ids)
+
+    def _render_projects(self, per_project_limit: int, light: bool) -> DigestView:
+        fragment = "project_light" if light else "project"
+        lines = ["*按项目分组（精简视图）*" if light else "*按项目分组任务*"]
+        shown: List[str] = []
+        for idx, (project, task_ids) in enumerate(self._project_groups(), start=1):
+            header = escape_md(project)
+            lines.append(f"{idx}. {header}" if light else f"{idx}. {header} ｜任务:{len(task_ids)}")
+            visible = task_ids[:per_project_limit]
+            shown.extend(visible)
+            lines.extend(self._entries[task_id].fragments[fragment] for task_id in visible)
+            if light and not visible:
+                lines.append("  - （暂无任务）")
+            lines.append("")
+        if light:
+            lines.append(escape_md("提示：使用 `/tasks group light [N]` 设置每个项目展示数量。"))
+        else:
+            lines.append(escape_md("提示：使用 /tasks projects [N] 可设置每个项目的展示数量。"))
+        return DigestView("\n".join(lines).strip(), shown)
+
+    def _project_groups(self) -> List[Tuple[str, List[str]]]:
+        if self._groups is None:
+            # ``_order`` is already sorted, so the first task seen fixes each
+            # project's position and buckets come out sorted as well.
+            groups: Dict[str, List[str]] = {}
+            for _, task_id in self._order:
+                groups.setdefault(self._entries[task_id].project, []).append(task_id)
+            self._groups = list(groups.items())
+        return self._groups
+
+    # ------------------------------------------------------------ maintenance
+    def _ensure_current(self) -> None:
+        generation = getattr(self._task_repo, "generation", None)
+        if not self._live or generation is None:
+            self._rebuild()
+            return
+        if self._generation != generation:
+            self._rebuild()
+            self._persist()
+
+    def _rebuild(self) -> None:
+        self._entries = {}
+        for task in self._task_repo.list_active_tasks():
+            self._entries[task.id] = self._build_entry(task)
+        self._order = sorted((entry.key, task_id) for task_id, entry in self._entries.items())
+        self._groups = None
+        self._views.clear()
+        self._generation = getattr(self._task_repo, "generation", None)
+
+    @staticmethod
+    def _build_entry(task: Task) -> _DigestEntry:
+        project = task.project_name.strip() if task.project_name else ""
+        return _DigestEntry(
+            key=_sort_key(task),
+            project=project or UNGROUPED,
+            fragments=_render_fragments(task),
+        )
+
+    def _on_change(self, change: RepositoryChange) -> None:
+        with self._lock:
+            if change.kind == RESET:
+                try:
+                    self._rebuild()
+                except Exception:  # pragma: no cover - rebuilt lazily on next read
+                    logger.exception("任务摘要重建失败")
+                    self._generation = None
+                    return
+            elif self._generation is not None and self._generation + 1 == change.generation:
+                self._apply(change.kind, change.ids)
+                self._generation = change.generation
+                self._schedule_persist()
+                return
+            else:
+                # Missed an event (or never built): start over on next read.
+                self._generation = None
+                return
+        self._persist()
+
+    def _apply(self, kind: str, task_ids: Iterable[str]) -> None:
+        for task_id in task_ids:
+            previous = self._entries.pop(task_id, None)
+            if previous is not None:
+                index = bisect.bisect_left(self._order, (previous.key, task_id))
+                if index < len(self._order) and self._order[index] == (previous.key, task_id):
+                    self._order.pop(index)
+            task = None if kind == DELETE else self._task_repo.get_task(task_id)
+            if task is not None:
+                entry = self._build_entry(task)
+                self._entries[task_id] = entry
+                bisect.insort(self._order, (entry.key, task_id))
+        self._groups = None
+        self._views.clear()
+
+    # ------------------------------------------------------------ persistence
+    def close(self) -> None:
+        """Write a snapshot that is still waiting for its timer."""
+        with self._lock:
+            timer, self._persist_timer = self._persist_timer, None
+        if timer is not None:
+            timer.cancel()
+            self._persist()
+
+    @staticmethod
+    def _default_timer(delay, callback, args):
+        timer = threading.Timer(delay, callback, args=args)
+        timer.daemon = True
+        return timer
+
+    def _schedule_persist(self) -> None:
+        # Called with the lock held; one pending timer covers every change
+        # until it fires, since it writes the state at that moment.
+        if not self._storage_path or self._persist_timer is not None:
+            return
+        self._persist_timer = self._timer_factory(self._persist_delay, self._persist_scheduled, ())
+        self._persist_timer.start()
+
+    def _persist_scheduled(self) -> None:
+        with self._lock:
+            self._persist_timer = None
+        self._persist()
+
+    def _source_stamp(self) -> Optional[Dict[str, int]]:
+        stamp = getattr(self._task_repo, "source_stamp", None)
+        return stamp() if callable(stamp) else None
+
+    def _persist(self) -> None:
+        if not self._storage_path or self._generation is None:
+            return
+        with self._lock:
+            snapshot = {
+                "source": self._source_stamp(),
+                "order": [task_id for _, task_id in self._order],
+                "entries": {
+                    task_id: {
+                        "key": list(entry.key),
+                        "project": entry.project,
+                        "fragments": entry.fragments,
+                    }
+                    for task_id, entry in self._entries.items()
+                },
+            }
+        try:
+            self._storage_path.parent.mkdir(parents=True, exist_ok=True)
+            self._storage_path.write_text(json.dumps(snapshot, ensure_ascii=False), encoding="utf-8")
+        except OSError:
+            logger.exception("任务摘要写入失败：%s", self._storage_path)
+
+    def _load_snapshot(self) -> None:
+        if not self._storage_path or not self._storage_path.exists():
+            return
+        try:
+            data = json.loads(self._storage_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return
+        stamp = self._source_stamp()
+        if stamp is None or data.get("source") != stamp:
+            return
+        entries: Dict[str, _DigestEntry] = {}
+        for task_id, payload in data.get("entries", {}).items():
+            entries[task_id] = _DigestEntry(
+                key=tuple(payload["key"]),
+                project=payload["project"],
+                fragments=payload["fragments"],
+            )
+        self._entries = entries
+        self._order = [(entries[task_id].key, task_id) for task_id in data.get("order", []) if task_id in entries]
+        self._groups = None
+        self._views.clear()
+        self._generation = self._task_repo.generation
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+UpdateHandler = Callable[[dict], None]
+CheckpointWriter = Callable[[int], None]
+
+_STOP = object()
+
+
+def update_chat_id(update: dict) -> Optional[int]:
+    for key in ("message", "edited_message", "callback_query"):
+        payload = update.get(key)
+        if not payload:
+            continue
+        chat = payload.get("chat") or (payload.get("message") or {}).get("chat") or {}
+        if "id" in chat:
+            return chat["id"]
+    return None
+
+
+class UpdateWatermark:
+    """Highest update id whose predecessors have all finished.
+
+    Not thread-safe; callers serialise access.
+    """
+
+    def __init__(self) -> None:
+        self._submitted: Deque[int] = deque()
+        self._finished: Set[int] = set()
+        self.value: Optional[int] = None
+
+    @property
+    def idle(self) -> bool:
+        return not self._submitted
+
+    def submit(self, update_id: int) -> None:
+        self._submitted.append(update_id)
+
+    def finish(self, update_id: int) -> Optional[int]:
+        """Mark ``update_id`` done; returns the new watermark if it moved."""
+        self._finished.add(update_id)
+        advanced = None
+        while self._submitted and self._submitted[0] in self._finished:
+            self._finished.discard(self._submitted[0])
+            advanced = self._submitted.popleft()
+        if advanced is not None:
+            self.value = advanced
+        return advanced
+
+
+class UpdateDispatcher:
+    """Handles Telegram updates on a pool of workers, sharded by chat.
+
+    Every update of a chat goes to the same worker, so one chat's updates run
+    strictly in order while other chats proceed in parallel. Each worker has a
+    queue of at most ``max_pending`` updates; ``submit`` blocks when it is
+    full, which stops the polling loop from fetching more. ``checkpoint`` is
+    called with the highest update id whose predecessors have all finished.
+    """
+
+    def __init__(
+        self,
+        handler: UpdateHandler,
+        checkpoint: Optional[CheckpointWriter] = None,
+        workers: int = 4,
+        max_pending: int = 100,
+    ):
+        self._handler = handler
+        self._checkpoint = checkpoint
+        self._queues: List["queue.Queue[object]"] = [
+            queue.Queue(maxsize=max(1, max_pending)) for _ in range(max(1, workers))
+        ]
+        self._lock = threading.Lock()
+        self._progress = threading.Condition(self._lock)
+        self._watermark = UpdateWatermark()
+        self._handled = 0
+        self._threads = [
+            threading.Thread(target=self._work, args=(lane,), name=f"update-worker-{idx}", daemon=True)
+            for idx, lane in enumerate(self._queues)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def watermark(self) -> Optional[int]:
+        with self._lock:
+            return self._watermark.value
+
+    def submit(self, update: dict) -> None:
+        update_id = update.get("update_id")
+        if update_id is not None:
+            with self._lock:
+                self._watermark.submit(update_id)
+        chat_id = update_chat_id(update)
+        lane = self._queues[hash(chat_id) % len(self._queues)]
+        lane.put(update)
+
+    def pending(self) -> Dict[str, int]:
+        return {f"worker-{idx}": lane.qsize() for idx, lane in enumerate(self._queues)}
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every submitted update is handled; False on timeout."""
+        with self._progress:
+            return self._progress.wait_for(lambda: self._watermark.idle, timeout=timeout)
+
+    def wait_for_progress(self, timeout: Optional[float] = None) -> bool:
+        """Wait until another update is handled; False on timeout."""
+        with self._progress:
+            handled = self._handled
+            return self._progress.wait_for(lambda: self._handled != handled, timeout=timeout)
+
+    def stop(self) -> None:
+        for lane in self._queues:
+            lane.put(_STOP)
+        for thread in self._threads:
+            thread.join(timeout=5)
+
+    def _work(self, lane: "queue.Queue[object]") -> None:
+        while True:
+            update = lane.get()
+            if update is _STOP:
+                return
+            try:
+                self._handler(update)
+            except Exception:
+                logger.exception("处理 Telegram 更新失败：%s", update.get("update_id"))
+            finally:
+                self._finish(update.get("update_id"))
+
+    def _finish(self, update_id: Optional[int]) -> None:
+        if update_id is None:
+            return
+        with self._lock:
+            advanced = self._watermark.finish(update_id)
+            if advanced is not None and self._checkpoint is not None:
+                # Written under the lock so checkpoints never go backwards.
+                self._checkpoint(advanced)
+            self._handled += 1
+            self._progress.notify_all()
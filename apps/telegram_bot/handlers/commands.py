@@ -1,24 +1,34 @@
 from __future__ import annotations
 
+import logging
 import re
 import string
 from datetime import datetime, timezone
 import threading
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 from types import SimpleNamespace
 
 from apps.telegram_bot.clients import TelegramBotClient
+from apps.telegram_bot.digests import DigestView, TaskDigestService, format_due, format_task_link
 from apps.telegram_bot.history import HistoryStore
+from apps.telegram_bot.live_message import LiveMessage, ProgressReporter
+from apps.telegram_bot.outbound import PRIORITY_PROGRESS
 from apps.telegram_bot.proactivity import ProactivityService, QUESTION_EVENT, STATE_EVENT
 from apps.telegram_bot.rest import RestScheduleService, RestWindow
 from apps.telegram_bot.session_monitor import TaskSessionMonitor
 from apps.telegram_bot.tracker import TaskTracker, escape_md
+from apps.telegram_bot.turn_scheduler import TurnScheduler
 from apps.telegram_bot.user_state import UserStateService
 from core.llm.agent import LLMAgent
+from core.domain import Intervention
 from core.repositories import LogRepository, TaskRepository
+from core.repositories.interning import shared_pool
+from core.utils.telemetry import telemetry
 from core.utils.timezone import format_beijing
 from infra.notion_sync import NotionSyncService
 
+logger = logging.getLogger(__name__)
+
 
 class CommandRouter:
     _PROGRESS_KEYWORDS = [
@@ -51,6 +61,11 @@ class CommandRouter:
         rest_service: Optional[RestScheduleService] = None,
         session_monitor: Optional[TaskSessionMonitor] = None,
         notion_sync: Optional[NotionSyncService] = None,
+        admin_ids: Iterable[int] = (),
+        digests: Optional[TaskDigestService] = None,
+        stream_replies: bool = False,
+        stream_edit_interval: float = 1.0,
+        max_concurrent_turns: int = 2,
     ):
         self._client = client
         self._history = history_store
@@ -63,6 +78,11 @@ class CommandRouter:
         self._rest_service = rest_service
         self._session_monitor = session_monitor
         self._notion_sync = notion_sync
+        self._admin_ids = tuple(admin_ids)
+        self._digests = digests or (TaskDigestService(task_repo) if task_repo else None)
+        self._stream_replies = stream_replies and hasattr(client, "edit_message_text")
+        self._stream_edit_interval = stream_edit_interval
+        self._turns = TurnScheduler(self._run_proactive_prompt, max_concurrent=max_concurrent_turns)
         self._log_snapshot: Dict[int, List[str]] = {}
         self._task_snapshot: Dict[int, List[str]] = {}
         self._rest_snapshot: Dict[int, List[str]] = {}
@@ -71,13 +91,18 @@ class CommandRouter:
             self._proactivity.set_event_handler(self._handle_proactive_event)
 
     def handle(self, update: dict) -> None:
+        # The runtime advances the update checkpoint once the update is done.
         message = update.get("message") or update.get("edited_message")
         if not message:
-            self._history.record_update_checkpoint(update.get("update_id"))
             return
         chat_id = message["chat"]["id"]
         text = (message.get("text") or "").strip()
-        self._history.append_user(update)
+        if not self._history.append_user(update, checkpoint=False) and update.get("message"):
+            # Replayed after a crash (the checkpoint is flushed in batches):
+            # the message was handled before, so don't run it twice. Edits
+            # reuse the message id and are still handled.
+            logger.info("跳过已处理的消息：update %s", update.get("update_id"))
+            return
         if self._proactivity:
             should_interrupt = self._proactivity.record_user_message(chat_id, text)
             if should_interrupt:
@@ -126,6 +151,12 @@ class CommandRouter:
         if lowered.startswith("/update"):
             self._handle_update(chat_id)
             return
+        if lowered.startswith("/memory"):
+            self._handle_memory(chat_id)
+            return
+        if lowered.startswith("/stats"):
+            self._handle_stats(chat_id)
+            return
         self._maybe_auto_update_state(chat_id, text)
         if self._tracker:
             enriched = self._tracker.consume_reply(chat_id, text)
@@ -133,11 +164,35 @@ class CommandRouter:
                 text = enriched
         if not self._agent:
             raise RuntimeError("LLM Agent 未配置，无法处理消息。")
+        self._turns.run_user_turn(chat_id, lambda: self._reply(chat_id, text))
+
+    def _reply(self, chat_id: int, text: str) -> None:
+        if self._stream_replies:
+            self._reply_streaming(chat_id, text)
+            return
         responses = self._agent.handle(chat_id, text)
         for resp in responses:
             if resp and resp.strip():
                 self._send_message(chat_id, resp)
 
+    def _reply_streaming(self, chat_id: int, text: str) -> None:
+        live = LiveMessage(self._client, chat_id, min_interval=self._stream_edit_interval)
+        live.start()
+        try:
+            responses = self._agent.handle(chat_id, text, on_partial=live.update)
+        except Exception:
+            live.finish(escape_md("处理失败，请稍后重试。"))
+            raise
+        responses = [resp for resp in responses if resp and resp.strip()]
+        first = responses[0] if responses else "（LLM 未返回内容）"
+        if live.finish(first):
+            if self._proactivity:
+                self._proactivity.record_agent_message(chat_id, first)
+        else:
+            self._send_message(chat_id, first)
+        for resp in responses[1:]:
+            self._send_message(chat_id, resp)
+
     def _handle_track(self, chat_id: int, text: str) -> None:
         if not self._tracker or not self._task_repo:
             self._send_message(chat_id, escape_md("暂不支持跟踪功能。"))
@@ -212,31 +267,76 @@ class CommandRouter:
         if not self._notion_sync:
             self._send_message(chat_id, escape_md("Notion 同步未配置。"))
             return
-        self._send_message(chat_id, escape_md("正在后台同步 Notion 数据，完成后会告知你。"))
+        reporter = ProgressReporter(
+            self._client,
+            chat_id,
+            title="🔄 正在后台同步 Notion 数据，完成后会在此更新。",
+            priority=PRIORITY_PROGRESS,
+        )
+        reporter.start()
 
         def _run_sync() -> None:
-            def _progress(message: str) -> None:
-                self._send_message(chat_id, escape_md(message))
-
             result = self._notion_sync.sync(
-                actor=f"command:{chat_id}", force=True, progress_callback=_progress
+                actor=f"command:{chat_id}", force=True, progress_callback=reporter.report
             )
             prefix = "✅" if result.success else "⚠️"
-            self._send_message(chat_id, f"{prefix} {result.message}", markdown=False)
+            status = f"{prefix} {result.message}"
+            reporter.finish(status)
+            if self._proactivity:
+                self._proactivity.record_agent_message(chat_id, status)
 
         threading.Thread(target=_run_sync, name=f"update-{chat_id}", daemon=True).start()
 
+    def _handle_memory(self, chat_id: int) -> None:
+        reports = []
+        if self._task_repo and hasattr(self._task_repo, "memory_report"):
+            reports.append(("任务", self._task_repo.memory_report()))
+        if self._log_repo and hasattr(self._log_repo, "memory_report"):
+            reports.append(("日志", self._log_repo.memory_report()))
+        if not reports:
+            self._send_message(chat_id, escape_md("暂无可统计的数据。"))
+            return
+        lines = ["内存占用："]
+        for label, report in reports:
+            lines.append(
+                f"- {label}：{report['entities']} 条 ｜共 {report['bytes'] / 1024:.1f} KB"
+                f" ｜平均 {report['bytes_per_entity']} B/条"
+            )
+        lines.append(f"- 共享字符串：{len(shared_pool)} 个")
+        self._send_message(chat_id, "\n".join(lines), markdown=False)
+
+    def _handle_stats(self, chat_id: int) -> None:
+        # Counters are process-wide, so only admins get to see them.
+        if chat_id not in self._admin_ids:
+            self._send_message(chat_id, "该命令仅限管理员使用。", markdown=False)
+            return
+        lines = ["运行统计："]
+        lines.extend(f"- {line}" for line in telemetry.report_lines() or ["暂无耗时数据"])
+        turns = self._turns.stats()
+        lines.append(
+            f"- 对话轮次：用户 {turns['user_turns']} ｜主动 {turns['proactive_turns']}"
+            f" ｜合并 {turns['coalesced']} ｜丢弃 {turns['dropped']}"
+        )
+        if self._agent:
+            intents = self._agent.intent_stats()
+            if intents:
+                lines.append(f"- 快速意图：命中率 {intents['hit_rate']:.0%}（{intents['seen']} 条）")
+            for name, data in (self._agent.llm_stats() or {}).items():
+                lines.append(
+                    f"- LLM {name}：{data['calls']} 次 ｜错误 {data['errors']} ｜熔断 {data['circuit']}"
+                )
+        self._send_message(chat_id, "\n".join(lines), markdown=False)
+
     def _handle_logs(self, chat_id: int, text: str) -> None:
         if not self._log_repo:
             self._send_message(chat_id, escape_md("日志功能暂不可用。"))
             return
         lowered = text.lower()
-        logs = self._log_repo.list_logs()
         if " delete" in lowered:
-            self._handle_delete_log(chat_id, text, logs)
+            self._handle_delete_log(chat_id, text)
             return
         if " update" in lowered:
-            self._handle_update_log(chat_id, text, logs)
+            self._handle_update_log(chat_id, text)
             return
         parts = text.split()
         limit = 5
@@ -250,14 +350,13 @@ class CommandRouter:
                 limit = max(1, min(20, int(token)))
             except ValueError:
                 continue
-        if not logs:
-            self._send_message(chat_id, escape_md("当前没有日志记录。"))
-            return
         if group_by_task:
-            self._render_logs_grouped(chat_id, logs, limit)
+            self._render_logs_grouped(chat_id, self._log_repo.query_logs(), limit)
+            return
+        display_entries = self._log_repo.query_logs(limit=limit).to_list()
+        if not display_entries:
+            self._send_message(chat_id, escape_md("当前没有日志记录。"))
             return
-        snippet = logs[-limit:]
-        display_entries = list(reversed(snippet))
         self._log_snapshot[chat_id] = [entry.id for entry in display_entries]
         lines: List[str] = []
         for idx, entry in enumerate(display_entries, start=1):
@@ -273,13 +372,18 @@ class CommandRouter:
         lines.append("如需操作：/logs delete <序号> 或 /logs delete <序号1> <序号2> ... 或 /logs update <序号> <新内容>")
         self._send_message(chat_id, "\n".join(lines), markdown=False)
 
-    def _render_logs_grouped(self, chat_id: int, logs: List, limit: int, per_task_limit: int = 3) -> None:
+    def _render_logs_grouped(self, chat_id: int, logs: Iterable, limit: int, per_task_limit: int = 3) -> None:
+        """Group newest-first ``logs`` by task, stopping once ``limit`` groups are full."""
         groups: List[Dict[str, Any]] = []
         seen: Dict[str, Dict[str, Any]] = {}
-        for entry in reversed(logs):
+        for entry in logs:
+            if len(groups) >= limit and all(len(g["logs"]) >= per_task_limit for g in groups):
+                break
             key = entry.task_id or f"local:{entry.task_name or '未关联'}"
             group = seen.get(key)
             if not group:
+                if len(groups) >= limit:
+                    continue
                 group = {
                     "task_id": entry.task_id,
                     "task_name": entry.task_name,
@@ -313,7 +417,7 @@ class CommandRouter:
         lines.append("提示：使用 /logs tasks [N] 可按任务归并，默认每个任务展示 3 条。")
         self._send_message(chat_id, "\n".join(lines), markdown=False)
 
-    def _handle_delete_log(self, chat_id: int, text: str, logs: list) -> None:
+    def _handle_delete_log(self, chat_id: int, text: str) -> None:
         snapshot = self._log_snapshot.get(chat_id)
         if not snapshot:
             self._send_message(chat_id, escape_md("请先使用 /logs 查看当前列表，再执行删除。"))
@@ -329,8 +433,7 @@ class CommandRouter:
         deleted = []
         remaining_snapshot = snapshot[:]
         for index in sorted(indices, reverse=True):
-            target_id = snapshot[index - 1]
-            target = next((entry for entry in logs if entry.id == target_id), None)
+            target = self._log_repo.get_log(snapshot[index - 1])
             if not target:
                 continue
             success = self._log_repo.delete_log(target.id) if self._log_repo else False
@@ -351,7 +454,7 @@ class CommandRouter:
             markdown=True,
         )
 
-    def _handle_update_log(self, chat_id: int, text: str, logs: list) -> None:
+    def _handle_update_log(self, chat_id: int, text: str) -> None:
         snapshot = self._log_snapshot.get(chat_id)
         if not snapshot:
             self._send_message(chat_id, escape_md("请先使用 /logs 查看当前列表，再执行更新。"))
@@ -368,8 +471,7 @@ class CommandRouter:
         if not note_text:
             self._send_message(chat_id, escape_md("请提供需要更新的内容。"))
             return
-        target_id = snapshot[index - 1]
-        target = next((entry for entry in logs if entry.id == target_id), None)
+        target = self._log_repo.get_log(snapshot[index - 1])
         if not target:
             self._send_message(chat_id, escape_md("未找到该日志，请重新查看 /logs。"))
             return
@@ -437,11 +539,14 @@ class CommandRouter:
             "/help - 查看所有命令说明",
             "/tasks [N] - 查看当前待办任务列表（默认 N=10）。使用 update/delete 可通过序号修改自建任务。",
             "/tasks projects [N] - 按项目分组查看任务（默认每个项目展示 5 条，N 可调）。",
+            "/tasks overdue [N] - 查看已逾期的任务（按截止时间排序）。",
             "/logs [N] - 查看最近日志（默认 N=5）",
             "/logs tasks [N] - 按任务归并查看最近日志（默认展示 5 个任务，每个最多 3 条日志）",
             "/logs delete <序号> - 删除最近一次 /logs 输出中的对应日志",
             "/logs update <序号> <内容> - 更新对应日志，可包含“任务 XXX：...”重绑任务",
             "/update - 立即同步 Notion 项目/任务/日志数据",
+            "/memory - 查看任务与日志在内存中的占用（每条字节数）",
+            "/stats - 查看各阶段耗时（p50/p95）与 Token 用量（仅管理员）",
             "/state - 查看当前记录的行动/心理状态",
             "/next - 查看下一次主动提醒的时间与条件",
             "/blocks [cancel <序号>] - 查看或取消时间块（休息/任务）",
@@ -473,6 +578,14 @@ class CommandRouter:
                         break
                 self._handle_tasks_light(chat_id, limit=limit)
                 return
+            if action == "overdue":
+                limit = 20
+                for token in parts[2:]:
+                    if token.isdigit():
+                        limit = max(1, min(50, int(token)))
+                        break
+                self._handle_tasks_overdue(chat_id, limit=limit)
+                return
             if action in {"projects", "project", "byproject", "group"}:
                 light_mode = any(token.lower() == "light" for token in parts[2:])
                 per_project_limit = 5
@@ -490,144 +603,48 @@ class CommandRouter:
             if token.isdigit():
                 limit = max(1, min(20, int(token)))
                 break
-        tasks = self._task_repo.list_active_tasks()
-        if not tasks:
-            self._task_snapshot.pop(chat_id, None)
+        self._send_digest(chat_id, self._digests.today(limit))
+
+    def _send_digest(self, chat_id: int, view: DigestView, remember: bool = True) -> None:
+        if not view.task_ids:
+            if remember:
+                self._task_snapshot.pop(chat_id, None)
             self._send_message(chat_id, escape_md("当前没有待办任务。"))
             return
-        def sort_key(task):
-            priority_order = {"Urgent": 0, "High": 1, "Medium": 2, "Low": 3}
-            return (
-                priority_order.get(task.priority, 99),
-                task.due_date or "9999-12-31",
-                task.name.lower(),
-            )
-        sorted_tasks = sorted(tasks, key=sort_key)[:limit]
-        self._task_snapshot[chat_id] = [task.id for task in sorted_tasks]
-        lines: List[str] = []
-        for idx, task in enumerate(sorted_tasks, start=1):
-            display_name = self._format_task_link_text(task)
-            priority = escape_md(task.priority or "Unknown")
-            status = escape_md(task.status or "Unknown")
-            due_text = self._format_due(task.due_date)
-            project = escape_md(task.project_name or "")
-            lines.append(f"{idx}. {display_name} ｜状态:{status} ｜优先级:{priority} ｜截止:{due_text}")
-            if project:
-                lines.append(f"  项目：{project}")
-            # snippet = (task.content or "").strip()
-            # if snippet:
-            #     # 视为一行，去除空白符，打印前60字符
-            #     snippet_one_line = " ".join(snippet.split())
-            #     preview = snippet_one_line[:60]
-            #     # preview = escape_md(snippet_one_line[:60])
-            #     lines.append(f"  摘要：{preview}")
-            lines.append("")
-        lines.append(escape_md("提示：/tasks update <序号> status=进行中 或 /tasks delete <序号>（仅自建任务）"))
-        self._send_message(chat_id, "\n".join(lines).strip(), markdown=True)
+        if remember:
+            self._task_snapshot[chat_id] = list(view.task_ids)
+        self._send_message(chat_id, view.text, markdown=True)
 
     def _handle_tasks_light(self, chat_id: int, limit: int = 10) -> None:
-        if not self._task_repo:
+        if not self._digests:
             self._send_message(chat_id, escape_md("任务数据不可用。"))
             return
-        tasks = self._task_repo.list_active_tasks()
-        if not tasks:
-            self._task_snapshot.pop(chat_id, None)
-            self._send_message(chat_id, escape_md("当前没有待办任务。"))
+        self._send_digest(chat_id, self._digests.light(limit))
+
+    def _handle_tasks_overdue(self, chat_id: int, limit: int = 20) -> None:
+        if not self._digests:
+            self._send_message(chat_id, escape_md("任务数据不可用。"))
             return
-        def sort_key(task):
-            priority_order = {"Urgent": 0, "High": 1, "Medium": 2, "Low": 3}
-            return (
-                priority_order.get(task.priority, 99),
-                task.due_date or "9999-12-31",
-                task.name.lower(),
-            )
-        sorted_tasks = sorted(tasks, key=sort_key)[:limit]
-        self._task_snapshot[chat_id] = [task.id for task in sorted_tasks]
-        lines = ["*轻量任务视图*"]
-        for idx, task in enumerate(sorted_tasks, start=1):
-            url = task.page_url or f"https://www.notion.so/{task.id.replace('-', '')}"
-            name = escape_md(task.name)
-            project = escape_md(task.project_name or "未归类")
-            if task.page_url:
-                lines.append(f"{idx}. [{name}]({url})")
-            else:
-                lines.append(f"{idx}. {name}")
-            lines.append(f"   项目：{project}")
-        self._send_message(chat_id, "\n".join(lines).strip(), markdown=True)
+        view = self._digests.overdue(limit)
+        if not view.task_ids:
+            self._send_message(chat_id, escape_md("暂无逾期任务，保持。"))
+            return
+        self._task_snapshot[chat_id] = list(view.task_ids)
+        self._send_message(chat_id, view.text, markdown=True)
 
     def _handle_tasks_grouped(self, chat_id: int, per_project_limit: int = 5) -> None:
-        if not self._task_repo:
+        if not self._digests:
             self._send_message(chat_id, escape_md("任务数据不可用。"))
             return
-        tasks = self._task_repo.list_active_tasks()
-        if not tasks:
-            self._send_message(chat_id, escape_md("当前没有待办任务。"))
-            return
-        def sort_key(task):
-            priority_order = {"Urgent": 0, "High": 1, "Medium": 2, "Low": 3}
-            return (
-                priority_order.get(task.priority, 99),
-                task.due_date or "9999-12-31",
-                task.name.lower(),
-            )
-        groups: Dict[str, List] = {}
-        for task in tasks:
-            project_key = task.project_name.strip() if task.project_name else "未归类"
-            groups.setdefault(project_key, []).append(task)
-        ordered_projects = sorted(
-            groups.items(),
-            key=lambda item: sort_key(min(item[1], key=sort_key)),
-        )
-        lines = ["*按项目分组任务*"]
-        for idx, (project_name, bucket) in enumerate(ordered_projects, start=1):
-            safe_project = escape_md(project_name or "未归类")
-            lines.append(f"{idx}. {safe_project} ｜任务:{len(bucket)}")
-            for task in sorted(bucket, key=sort_key)[:per_project_limit]:
-                url = task.page_url or f"https://www.notion.so/{task.id.replace('-', '')}"
-                name = escape_md(task.name)
-                status = escape_md(task.status or "Unknown")
-                due_text = self._format_due(task.due_date)
-                lines.append(f"  - [{name}]({url}) ｜状态:{status} ｜截止:{due_text}")
-            lines.append("")
-        lines.append(escape_md("提示：使用 /tasks projects [N] 可设置每个项目的展示数量。"))
-        self._send_message(chat_id, "\n".join(lines).strip(), markdown=True)
+        self._send_digest(chat_id, self._digests.projects(per_project_limit), remember=False)
 
     def _handle_tasks_grouped_light(self, chat_id: int, per_project_limit: int = 5) -> None:
-        if not self._task_repo:
+        if not self._digests:
             self._send_message(chat_id, escape_md("任务数据不可用。"))
             return
-        tasks = self._task_repo.list_active_tasks()
-        if not tasks:
-            self._send_message(chat_id, escape_md("当前没有待办任务。"))
-            return
-        def sort_key(task):
-            priority_order = {"Urgent": 0, "High": 1, "Medium": 2, "Low": 3}
-            return (
-                priority_order.get(task.priority, 99),
-                task.due_date or "9999-12-31",
-                task.name.lower(),
-            )
-        groups: Dict[str, List] = {}
-        for task in tasks:
-            project_key = task.project_name.strip() if task.project_name else "未归类"
-            groups.setdefault(project_key, []).append(task)
-        ordered_projects = sorted(
-            groups.items(),
-            key=lambda item: sort_key(min(item[1], key=sort_key)),
+        self._send_digest(
+            chat_id, self._digests.projects(per_project_limit, light=True), remember=False
         )
-        lines = ["*按项目分组（精简视图）*"]
-        for idx, (project_name, bucket) in enumerate(ordered_projects, start=1):
-            safe_project = escape_md(project_name or "未归类")
-            lines.append(f"{idx}. {safe_project}")
-            names = [
-                f"  - [{escape_md(task.name)}]({task.page_url})" if task.page_url else
-                f"  - {escape_md(task.name)}"
-                for task in sorted(bucket, key=sort_key)[:per_project_limit]
-            ]
-            lines.extend(names if names else ["  - （暂无任务）"])
-            lines.append("")
-        lines.append(escape_md("提示：使用 `/tasks group light [N]` 设置每个项目展示数量。"))
-        self._send_message(chat_id, "\n".join(lines).strip(), markdown=True)
 
     def _handle_task_delete(self, chat_id: int, text: str) -> None:
         snapshot = self._task_snapshot.get(chat_id)
@@ -862,11 +879,27 @@ class CommandRouter:
             )
         else:
             return
+        self._turns.submit_proactive(chat_id, event_type, prompt)
+
+    def _run_proactive_prompt(self, chat_id: int, prompt: str) -> None:
         responses = self._agent.handle(chat_id, prompt)
         for resp in responses:
             if resp and resp.strip():
                 self._send_message(chat_id, resp)
 
+    def broadcast_interventions(self, interventions: List[Intervention]) -> None:
+        """Push deadline alerts to the configured ``admin_ids``."""
+        if not interventions:
+            return
+        if not self._admin_ids:
+            logger.warning("未配置 admin_ids，跳过 %d 条截止提醒", len(interventions))
+            return
+        lines = ["⏰ 截止提醒："]
+        lines.extend(f"- {escape_md(item.message)}" for item in interventions)
+        text = "\n".join(lines)
+        for chat_id in self._admin_ids:
+            self._send_message(chat_id, text)
+
     def _send_message(self, chat_id: int, text: str, markdown: bool = True) -> None:
         parse_mode = "Markdown" if markdown else None
         self._client.send_message(chat_id=chat_id, text=text, parse_mode=parse_mode)
@@ -896,11 +929,7 @@ class CommandRouter:
 
     @staticmethod
     def _format_task_link_text(obj) -> str:
-        task_label = escape_md(getattr(obj, "task_name", None) or getattr(obj, "name", None) or getattr(obj, "task_id", None) or "未关联")
-        url = getattr(obj, "task_url", None) or getattr(obj, "page_url", None)
-        if url and "notion.so" in url:
-            return f"[{task_label}]({url})"
-        return task_label
+        return format_task_link(obj)
 
     @staticmethod
     def _fmt_time(value: Optional[datetime]) -> str:
@@ -910,12 +939,7 @@ class CommandRouter:
 
     @staticmethod
     def _format_due(value: Optional[str]) -> str:
-        if not value:
-            return "未计划"
-        try:
-            return format_beijing(datetime.fromisoformat(value))
-        except ValueError:
-            return value
+        return format_due(value)
 
     def _format_state_desc(self, data: Optional[Dict[str, Any]]) -> Dict[str, str]:
         if not data:
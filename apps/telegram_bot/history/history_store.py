@@ -1,13 +1,18 @@
 from __future__ import annotations
 
 import json
+import logging
+import os
+import threading
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional
 
 from data_pipeline.storage import paths
 
+logger = logging.getLogger(__name__)
+
 
 def _to_iso(timestamp: int | float | str | None) -> str:
     if timestamp is None:
@@ -28,8 +33,31 @@ class HistoryEntry:
     raw: Dict
 
 
+EntryListener = Callable[[HistoryEntry], None]
+
+CHECKPOINT_DURABILITY = ("batched", "always")
+
+
 class HistoryStore:
-    def __init__(self, root_dir: Path | None = None):
+    """Chat history as one JSONL file per chat, plus the update checkpoint.
+
+    With ``durability="batched"`` the update checkpoint is kept in memory and
+    written at most every ``flush_interval`` seconds (and on
+    ``flush_checkpoint`` / ``close``); after a crash a few updates are
+    fetched again. ``append_user`` reports them as already stored, so the
+    router can skip them. ``"always"`` writes every checkpoint. Both modes
+    replace ``metadata.json`` atomically.
+    """
+
+    def __init__(
+        self,
+        root_dir: Path | None = None,
+        durability: str = "batched",
+        flush_interval: float = 2.0,
+        timer_factory: Optional[Callable[..., Any]] = None,
+    ):
+        if durability not in CHECKPOINT_DURABILITY:
+            raise ValueError(f"未知的检查点持久化模式：{durability}")
         self._root = Path(root_dir) if root_dir else paths.history_path()
         self._root.mkdir(parents=True, exist_ok=True)
         self._archive_dir = self._root / "archive"
@@ -38,7 +66,14 @@ class HistoryStore:
         if not self._metadata_path.exists():
             self._metadata_path.write_text(json.dumps({}, indent=2))
         self._cache: Dict[int, set[int]] = {}
+        self._listeners: List[EntryListener] = []
         self._metadata = self._load_metadata()
+        self._durability = durability
+        self._flush_interval = flush_interval
+        self._timer_factory = timer_factory or self._default_timer
+        self._flush_timer: Any = None
+        self._dirty = False
+        self._metadata_lock = threading.Lock()
 
     def _load_metadata(self) -> Dict[str, int]:
         with open(self._metadata_path, "r", encoding="utf-8") as file:
@@ -48,8 +83,18 @@ class HistoryStore:
                 return {}
 
     def _save_metadata(self) -> None:
-        with open(self._metadata_path, "w", encoding="utf-8") as file:
+        # Write-then-rename so a crash never leaves a truncated file behind.
+        tmp_path = self._metadata_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as file:
             json.dump(self._metadata, file, ensure_ascii=False, indent=2)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, self._metadata_path)
+
+    def _default_timer(self, delay, callback, args):
+        timer = threading.Timer(delay, callback, args=args)
+        timer.daemon = True
+        return timer
 
     def last_update_id(self) -> Optional[int]:
         return self._metadata.get("last_update_id")
@@ -57,8 +102,33 @@ class HistoryStore:
     def record_update_checkpoint(self, update_id: Optional[int]) -> None:
         if update_id is None:
             return
-        self._metadata["last_update_id"] = update_id
-        self._save_metadata()
+        with self._metadata_lock:
+            self._metadata["last_update_id"] = update_id
+            if self._durability == "always" or self._flush_interval <= 0:
+                self._save_metadata()
+                return
+            self._dirty = True
+            if self._flush_timer is None:
+                self._flush_timer = self._timer_factory(self._flush_interval, self.flush_checkpoint, ())
+                self._flush_timer.start()
+
+    def flush_checkpoint(self) -> None:
+        """Write the pending checkpoint now, e.g. after a batch of updates."""
+        with self._metadata_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._dirty:
+                return
+            try:
+                self._save_metadata()
+            except OSError:
+                logger.exception("写入更新检查点失败")
+                return
+            self._dirty = False
+
+    def close(self) -> None:
+        self.flush_checkpoint()
 
     def _chat_path(self, chat_id: int) -> Path:
         return self._root / f"{chat_id}.jsonl"
@@ -89,13 +159,34 @@ class HistoryStore:
         path = self._chat_path(entry.chat_id)
         with open(path, "a", encoding="utf-8") as file:
             file.write(json.dumps(entry.__dict__, ensure_ascii=False) + "\n")
+        for listener in list(self._listeners):
+            try:
+                listener(entry)
+            except Exception:
+                logger.exception("历史记录监听器执行失败")
         return True
 
-    def append_user(self, update: Dict) -> None:
+    def subscribe(self, listener: EntryListener) -> Callable[[], None]:
+        """Call ``listener`` with every newly stored entry; returns an unsubscribe."""
+        self._listeners.append(listener)
+
+        def _unsubscribe() -> None:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+        return _unsubscribe
+
+    def append_user(self, update: Dict, checkpoint: bool = True) -> bool:
+        """Store the user's message; False if it was already stored.
+
+        ``checkpoint=False`` leaves the update checkpoint to the caller (e.g. a
+        dispatcher tracking completion).
+        """
         message = update.get("message") or update.get("edited_message")
         if not message:
-            self.record_update_checkpoint(update.get("update_id"))
-            return
+            if checkpoint:
+                self.record_update_checkpoint(update.get("update_id"))
+            return True
         entry = HistoryEntry(
             chat_id=message["chat"]["id"],
             message_id=message["message_id"],
@@ -105,8 +196,10 @@ class HistoryStore:
             reply_to=(message.get("reply_to_message") or {}).get("message_id"),
             raw=message,
         )
-        self._append_entry(entry)
-        self.record_update_checkpoint(update.get("update_id"))
+        stored = self._append_entry(entry)
+        if checkpoint:
+            self.record_update_checkpoint(update.get("update_id"))
+        return stored
 
     def append_bot(self, message: Dict) -> None:
         entry = HistoryEntry(
@@ -130,9 +223,25 @@ class HistoryStore:
                 for line in file
                 if line.strip()
             ]
-        if len(entries) <= limit:
-            return entries
-        return entries[0:1] + entries[-limit:]
+        return entries[-limit:] if limit > 0 else []
+
+    def iter_entries(self, chat_id: int, include_archive: bool = True) -> Iterator[HistoryEntry]:
+        """All stored entries of a chat, archived sessions first, oldest first."""
+        files: List[Path] = []
+        if include_archive:
+            files.extend(sorted(self._archive_dir.glob(f"{chat_id}_*.jsonl")))
+        files.append(self._chat_path(chat_id))
+        for path in files:
+            if not path.exists():
+                continue
+            with open(path, "r", encoding="utf-8") as file:
+                for line in file:
+                    if not line.strip():
+                        continue
+                    try:
+                        yield HistoryEntry(**json.loads(line))
+                    except (json.JSONDecodeError, TypeError):
+                        continue
 
     def clear_chat(self, chat_id: int) -> None:
         self._cache.pop(chat_id, None)
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PLACEHOLDER_TEXT = "⌛ 思考中…"
+STREAM_CURSOR = " ▌"
+
+
+class LiveMessage:
+    """A Telegram message that is edited in place while its text grows.
+
+    ``start`` posts a placeholder (kept out of the chat history) and shows the
+    typing indicator; ``update`` edits it at most once per ``min_interval``
+    seconds; ``finish`` writes the final text and records it in the history.
+    Intermediate edits are sent without parse mode because half-generated
+    Markdown usually does not parse.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        chat_id: int,
+        min_interval: float = 1.0,
+        placeholder: str = PLACEHOLDER_TEXT,
+        clock: Callable[[], float] = time.monotonic,
+        cursor: str = STREAM_CURSOR,
+        priority: Optional[int] = None,
+    ):
+        self._client = client
+        self._chat_id = chat_id
+        self._min_interval = min_interval
+        self._placeholder = placeholder
+        self._clock = clock
+        self._cursor = cursor
+        # Only forwarded when set, so plain clients keep working.
+        self._extra = {} if priority is None else {"priority": priority}
+        self._message_id: Optional[int] = None
+        self._last_edit = 0.0
+        self._last_text = ""
+        self._lock = threading.Lock()
+
+    @property
+    def message_id(self) -> Optional[int]:
+        return self._message_id
+
+    def start(self) -> None:
+        try:
+            self._client.send_chat_action(self._chat_id, "typing")
+        except Exception as error:  # pragma: no cover - cosmetic only
+            logger.debug("sendChatAction failed: %s", error)
+        try:
+            message = _resolved(
+                self._client.send_message(
+                    chat_id=self._chat_id,
+                    text=self._placeholder,
+                    parse_mode=None,
+                    record_history=False,
+                    **self._extra,
+                )
+            )
+        except Exception as error:
+            logger.warning("发送占位消息失败，改为一次性回复: %s", error)
+            return
+        self._message_id = message.get("message_id") if isinstance(message, dict) else None
+        self._last_edit = self._clock()
+        self._last_text = self._placeholder
+
+    def update(self, text: str) -> None:
+        if self._message_id is None or not text.strip():
+            return
+        with self._lock:
+            now = self._clock()
+            if now - self._last_edit < self._min_interval:
+                return
+            preview = text + self._cursor
+            if preview == self._last_text:
+                return
+            self._last_edit = now
+            self._last_text = preview
+            try:
+                self._client.edit_message_text(
+                    chat_id=self._chat_id,
+                    message_id=self._message_id,
+                    text=preview,
+                    parse_mode=None,
+                    **self._extra,
+                )
+            except Exception as error:
+                logger.debug("流式编辑失败（忽略）: %s", error)
+
+    def finish(self, text: str, parse_mode: Optional[str] = "Markdown") -> bool:
+        """Write the final text; returns False if the caller must send it instead."""
+        if self._message_id is None:
+            return False
+        with self._lock:
+            for mode in dict.fromkeys([parse_mode, None]):
+                try:
+                    _resolved(
+                        self._client.edit_message_text(
+                            chat_id=self._chat_id,
+                            message_id=self._message_id,
+                            text=text,
+                            parse_mode=mode,
+                            record_history=True,
+                            **self._extra,
+                        )
+                    )
+                    self._last_text = text
+                    return True
+                except Exception as error:
+                    logger.warning("最终编辑失败(parse_mode=%s): %s", mode, error)
+        return False
+
+
+class ProgressReporter:
+    """Shows the progress of a long operation in a single message.
+
+    ``start`` posts ``title``; every ``report`` appends a line and the message
+    is edited in place at most once per ``min_interval`` seconds, showing the
+    last ``max_lines`` lines. ``finish`` writes the final status once and
+    falls back to a plain message when the placeholder could not be posted.
+    ``report`` can be handed directly to APIs taking a progress callback.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        chat_id: int,
+        title: str,
+        min_interval: float = 3.0,
+        max_lines: int = 6,
+        priority: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._client = client
+        self._chat_id = chat_id
+        self._title = title
+        self._lines: List[str] = []
+        self._max_lines = max_lines
+        self._extra = {} if priority is None else {"priority": priority}
+        self._live = LiveMessage(
+            client,
+            chat_id,
+            min_interval=min_interval,
+            placeholder=title,
+            clock=clock,
+            cursor="",
+            priority=priority,
+        )
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        self._live.start()
+
+    def report(self, line: str) -> None:
+        line = line.strip()
+        if not line:
+            return
+        with self._lock:
+            self._lines.append(line)
+            text = self._render()
+        self._live.update(text)
+
+    def finish(self, status: str) -> None:
+        with self._lock:
+            text = self._render(status)
+        if self._live.finish(text, parse_mode=None):
+            return
+        try:
+            self._client.send_message(chat_id=self._chat_id, text=text, parse_mode=None, **self._extra)
+        except Exception as error:
+            logger.warning("发送进度结果失败: %s", error)
+
+    def _render(self, status: Optional[str] = None) -> str:
+        lines = self._lines[-self._max_lines:]
+        if len(self._lines) > len(lines):
+            lines = ["…"] + lines
+        if status:
+            lines = lines + [status]
+        return "\n".join([self._title, *lines])
+
+
+def _resolved(result: Any) -> Any:
+    """Wait for requests queued on an ``OutboundQueue``; pass plain results through."""
+    return result.result() if isinstance(result, Future) else result
@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Optional, Set, Tuple
+
+import requests
+
+from apps.telegram_bot.clients.telegram_client import TelegramAPIError
+from core.utils.telemetry import telemetry
+
+logger = logging.getLogger(__name__)
+
+# Lower value goes first.
+PRIORITY_REPLY = 0
+PRIORITY_PROGRESS = 1
+PRIORITY_REMINDER = 2
+
+
+class TokenBucket:
+    """Allows ``rate`` events per second with bursts of up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self._rate = rate
+        self._capacity = max(1.0, capacity)
+        self._tokens = self._capacity
+        self._updated = now
+        self._held_until = 0.0
+
+    def delay(self, now: float) -> float:
+        """Seconds until a token is available (0 when one is available now)."""
+        self._refill(now)
+        wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self._rate
+        return max(wait, self._held_until - now)
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self._tokens -= 1
+
+    def hold(self, until: float) -> None:
+        """Refuse tokens until ``until``, e.g. for a 429 ``retry_after``."""
+        self._held_until = max(self._held_until, until)
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+
+@dataclass(slots=True)
+class _Outgoing:
+    method: str
+    chat_id: Any
+    kwargs: Dict[str, Any]
+    priority: int
+    queued_at: float
+    future: Future = field(default_factory=Future)
+    attempts: int = 0
+    not_before: float = 0.0
+
+
+class OutboundQueue:
+    """Rate-limited, prioritised sender in front of ``TelegramBotClient``.
+
+    ``send_message`` and ``edit_message_text`` enqueue the request and return
+    a ``concurrent.futures.Future`` immediately; a single sender thread
+    delivers requests in priority order (replies, then progress, then
+    reminders) while respecting a global and a per-chat token bucket. A 429
+    holds the chat for ``retry_after`` seconds, and 5xx and network errors are
+    retried with backoff. A ``sendMessage`` that timed out is not retried,
+    since Telegram may already have delivered it; edits are idempotent and
+    retried on timeouts as well. A pending edit of the same message is replaced
+    rather than queued twice. Within a chat, requests of one priority keep
+    their order.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        global_rate: float = 30.0,
+        chat_rate: float = 1.0,
+        chat_burst: int = 3,
+        max_retries: int = 5,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._client = client
+        self.history_store = getattr(client, "history_store", None)
+        self._clock = clock
+        self._global = TokenBucket(global_rate, global_rate, clock())
+        self._chat_rate = chat_rate
+        self._chat_burst = chat_burst
+        self._chats: Dict[Any, TokenBucket] = {}
+        self._lanes: Dict[int, Deque[_Outgoing]] = {}
+        self._edits: Dict[Tuple[Any, Any], _Outgoing] = {}
+        self._max_retries = max_retries
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._closing = False
+        self._thread = threading.Thread(target=self._run, name="telegram-outbound", daemon=True)
+        self._thread.start()
+
+    def send_message(self, chat_id: int, text: str, priority: int = PRIORITY_REPLY, **kwargs: Any) -> Future:
+        return self._enqueue("send_message", chat_id, priority, {"text": text, **kwargs})
+
+    def edit_message_text(
+        self, chat_id: int, message_id: int, text: str, priority: int = PRIORITY_REPLY, **kwargs: Any
+    ) -> Future:
+        key = (chat_id, message_id)
+        request = {"message_id": message_id, "text": text, **kwargs}
+        with self._lock:
+            pending = self._edits.get(key)
+            if pending is not None and pending.priority == priority:
+                pending.kwargs = {"chat_id": chat_id, **request}
+                return pending.future
+        return self._enqueue("edit_message_text", chat_id, priority, request, edit_key=key)
+
+    def send_chat_action(self, chat_id: int, action: str = "typing") -> None:
+        # Cosmetic and not worth a slot in the buckets.
+        self._client.send_chat_action(chat_id, action)
+
+    def pending(self) -> Dict[int, int]:
+        with self._lock:
+            return {priority: len(lane) for priority, lane in sorted(self._lanes.items()) if lane}
+
+    def close(self, timeout: Optional[float] = 10.0) -> None:
+        """Stop accepting requests and wait for the queue to drain."""
+        with self._ready:
+            self._closing = True
+            self._ready.notify_all()
+        self._thread.join(timeout=timeout)
+
+    def _enqueue(
+        self,
+        method: str,
+        chat_id: Any,
+        priority: int,
+        request: Dict[str, Any],
+        edit_key: Optional[Tuple[Any, Any]] = None,
+    ) -> Future:
+        item = _Outgoing(method, chat_id, {"chat_id": chat_id, **request}, priority, self._clock())
+        item.future.add_done_callback(_log_failure)
+        with self._ready:
+            if self._closing:
+                raise RuntimeError("OutboundQueue is closed")
+            self._lanes.setdefault(priority, deque()).append(item)
+            if edit_key is not None:
+                self._edits[edit_key] = item
+            self._ready.notify()
+        return item.future
+
+    def _run(self) -> None:
+        while True:
+            with self._ready:
+                while True:
+                    item, wait = self._next()
+                    if item is not None:
+                        break
+                    if self._closing and not any(self._lanes.values()):
+                        return
+                    self._ready.wait(wait)
+            self._deliver(item)
+
+    def _next(self) -> Tuple[Optional[_Outgoing], Optional[float]]:
+        """Pop the first sendable request; otherwise return how long to wait."""
+        now = self._clock()
+        wait: Optional[float] = None
+        blocked: Set[Any] = set()
+        for priority in sorted(self._lanes):
+            lane = self._lanes[priority]
+            for item in lane:
+                if item.chat_id in blocked:
+                    continue
+                delay = max(item.not_before - now, self._bucket(item.chat_id, now).delay(now))
+                if delay <= 0:
+                    delay = self._global.delay(now)
+                    if delay <= 0:
+                        lane.remove(item)
+                        if item.method == "edit_message_text":
+                            self._edits.pop((item.chat_id, item.kwargs.get("message_id")), None)
+                        self._global.take(now)
+                        self._chats[item.chat_id].take(now)
+                        return item, None
+                    return None, delay
+                # Later requests of this chat wait behind this one.
+                blocked.add(item.chat_id)
+                wait = delay if wait is None else min(wait, delay)
+        return None, wait
+
+    def _bucket(self, chat_id: Any, now: float) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            bucket = self._chats[chat_id] = TokenBucket(self._chat_rate, self._chat_burst, now)
+        return bucket
+
+    def _deliver(self, item: _Outgoing) -> None:
+        if item.attempts == 0:
+            telemetry.observe("outbound_wait", (self._clock() - item.queued_at) * 1000)
+        try:
+            result = getattr(self._client, item.method)(**item.kwargs)
+        except TelegramAPIError as error:
+            if error.retry_after is not None:
+                self._retry(item, error, hold=error.retry_after)
+            elif error.status_code is not None and error.status_code >= 500:
+                self._retry(item, error)
+            else:
+                item.future.set_exception(error)
+        except requests.ConnectionError as error:
+            # Covers ConnectTimeout: the request never reached Telegram.
+            self._retry(item, error)
+        except requests.RequestException as error:
+            if item.method == "send_message":
+                # A read timeout may mean the message went out anyway.
+                item.future.set_exception(error)
+            else:
+                self._retry(item, error)
+        except Exception as error:
+            item.future.set_exception(error)
+        else:
+            item.future.set_result(result)
+
+    def _retry(self, item: _Outgoing, error: Exception, hold: Optional[float] = None) -> None:
+        item.attempts += 1
+        if item.attempts > self._max_retries:
+            item.future.set_exception(error)
+            return
+        now = self._clock()
+        with self._ready:
+            if hold is not None:
+                logger.warning("Telegram 限流，chat %s 暂停 %s 秒", item.chat_id, hold)
+                self._bucket(item.chat_id, now).hold(now + hold)
+            else:
+                item.not_before = now + min(2 ** (item.attempts - 1), 30)
+                logger.warning("发送失败，第 %s 次重试：%s", item.attempts, error)
+            self._lanes[item.priority].appendleft(item)
+            if item.method == "edit_message_text":
+                self._edits.setdefault((item.chat_id, item.kwargs.get("message_id")), item)
+            self._ready.notify()
+
+
+def _log_failure(future: Future) -> None:
+    if not future.cancelled() and future.exception() is not None:
+        logger.warning("Telegram 消息发送失败：%s", future.exception())
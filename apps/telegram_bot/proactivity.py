@@ -43,6 +43,7 @@ class ProactivityService:
         follow_up_seconds: int = 600,
         state_unknown_retry_seconds: int = 120,
         tracker: TaskTracker | None = None,
+        timer_factory=None,
     ) -> None:
         self._state_service = state_service
         self._rest_service = rest_service
@@ -55,7 +56,7 @@ class ProactivityService:
         self._timers: Dict[int, ChatTimers] = {}
         self._lock = threading.Lock()
         self._event_handler: Optional[Callable[[int, Dict[str, Any]], None]] = None
-        self._timer_factory = lambda delay, cb, args: self._make_timer(delay, cb, args)
+        self._timer_factory = timer_factory or (lambda delay, cb, args: self._make_timer(delay, cb, args))
 
     @staticmethod
     def _make_timer(delay, callback, args):
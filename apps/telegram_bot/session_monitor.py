@@ -5,6 +5,7 @@ from datetime import datetime, timezone
 from typing import Any, Dict, Optional
 
 from apps.telegram_bot.clients import TelegramBotClient
+from apps.telegram_bot.outbound import PRIORITY_REMINDER
 from apps.telegram_bot.rest import RestScheduleService, RestWindow
 from apps.telegram_bot.tracker import TaskTracker
 from core.domain import Task
@@ -23,8 +24,10 @@ class TaskSessionMonitor:
         rest_service: RestScheduleService,
         tracker: TaskTracker | None = None,
         task_repository: TaskRepository | None = None,
+        timer_factory=None,
     ):
         self._client = client
+        self._timer_factory = timer_factory or self._default_timer
         self._rest_service = rest_service
         self._tracker = tracker
         self._task_repo = task_repository
@@ -34,6 +37,12 @@ class TaskSessionMonitor:
         self._lock = threading.Lock()
         self._bootstrap()
 
+    @staticmethod
+    def _default_timer(delay, callback, args):
+        timer = threading.Timer(delay, callback, args=args)
+        timer.daemon = True
+        return timer
+
     def _bootstrap(self) -> None:
         now = _utcnow()
         for window in self._rest_service.iter_windows(include_past=False):
@@ -54,13 +63,11 @@ class TaskSessionMonitor:
                 self._start_session(window, silent=silent_start)
             else:
                 start_delay = max(1.0, (window.start - now).total_seconds())
-                start_timer = threading.Timer(start_delay, self._handle_start, args=(window.id,))
-                start_timer.daemon = True
+                start_timer = self._timer_factory(start_delay, self._handle_start, (window.id,))
                 start_timer.start()
                 self._start_timers[window.id] = start_timer
             end_delay = max(1.0, (window.end - now).total_seconds())
-            end_timer = threading.Timer(end_delay, self._handle_end, args=(window.id,))
-            end_timer.daemon = True
+            end_timer = self._timer_factory(end_delay, self._handle_end, (window.id,))
             end_timer.start()
             self._end_timers[window.id] = end_timer
 
@@ -131,7 +138,7 @@ class TaskSessionMonitor:
             f"结束时间：{end_time}\n"
             "请确认是否完成该任务，必要时重新规划新的时间段。"
         )
-        self._client.send_message(chat_id=window.chat_id, text=text)
+        self._client.send_message(chat_id=window.chat_id, text=text, priority=PRIORITY_REMINDER)
 
     def _start_session(self, window: RestWindow, silent: bool = False) -> None:
         if window.session_type != "task":
@@ -158,6 +165,7 @@ class TaskSessionMonitor:
         if not silent:
             self._client.send_message(
                 chat_id=window.chat_id,
+                priority=PRIORITY_REMINDER,
                 text=f"🎯 任务时间块开始：{task.name}\n我已自动开启跟踪，请专注推进并及时反馈。",
             )
 
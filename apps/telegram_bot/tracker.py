@@ -8,9 +8,10 @@ from pathlib import Path
 from typing import Any, Dict, Optional
 
 from apps.telegram_bot.clients import TelegramBotClient
+from apps.telegram_bot.outbound import PRIORITY_REMINDER
 from apps.telegram_bot.rest import RestScheduleService
 from apps.telegram_bot.user_state import UserStateService
-from core.domain import Task
+from core.domain import Task, notion_page_url
 from core.utils.timezone import to_beijing
 
 MD_SPECIAL_CHARS = "\\[]"
@@ -110,7 +111,7 @@ class TaskTracker:
             entry = TrackerEntry(
                 task_id=task.id,
                 task_name=task.name,
-                task_url=task.page_url or f"https://www.notion.so/{task.id.replace('-', '')}",
+                task_url=task.url or notion_page_url(task.id),
                 timer=timer,
                 interval_seconds=interval,
                 context=context,
@@ -166,6 +167,7 @@ class TaskTracker:
                 entry.next_fire_at = now
         self._client.send_message(
             chat_id=chat_id,
+            priority=PRIORITY_REMINDER,
             text=(
                 f"⏰ 时间到。请汇报任务 [{escape_md(entry.task_name)}]"
                 f"({entry.task_url}) 的进展，并说明下一步。"
@@ -232,7 +234,7 @@ class TaskTracker:
             entry = TrackerEntry(
                 task_id=task.id,
                 task_name=task.name,
-                task_url=task.page_url or f"https://www.notion.so/{task.id.replace('-', '')}",
+                task_url=task.url or notion_page_url(task.id),
                 timer=None,
                 waiting=True,
                 interval_seconds=self._follow_up_interval,
@@ -438,7 +440,7 @@ class TaskTracker:
                     entry = TrackerEntry(
                         task_id=task_id,
                         task_name=entry_payload.get("task_name", task_id),
-                        task_url=entry_payload.get("task_url") or f"https://www.notion.so/{task_id.replace('-', '')}",
+                        task_url=entry_payload.get("task_url") or notion_page_url(task_id),
                         timer=None,
                         waiting=entry_payload.get("waiting", False),
                         start_time=start_time,
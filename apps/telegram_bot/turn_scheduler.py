@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+ProactiveRunner = Callable[[int, str], None]
+_T = TypeVar("_T")
+
+USER = "user"
+PROACTIVE = "proactive"
+
+
+@dataclass(slots=True)
+class _ChatSlot:
+    owner: Optional[str] = None  # USER / PROACTIVE while a turn is in flight
+    user_waiting: int = 0
+    # event key -> prompt; a newer event of the same kind replaces the older one
+    pending: Dict[str, str] = field(default_factory=dict)
+
+
+class TurnScheduler:
+    """Serialises agent turns per chat and caps concurrent LLM turns overall.
+
+    User turns block until the chat is free. Proactive prompts (fired from
+    timer threads) never wait: if the chat is idle they run right away in the
+    calling thread, if a proactive turn is in flight they are queued, keyed by
+    event type, and run afterwards as one merged prompt. A user turn supersedes
+    every proactive prompt that is queued or arrives while it runs.
+    """
+
+    def __init__(self, proactive_runner: ProactiveRunner, max_concurrent: int = 2):
+        self._runner = proactive_runner
+        self._cond = threading.Condition()
+        self._slots: Dict[int, _ChatSlot] = {}
+        self._llm_slots = threading.BoundedSemaphore(max(1, max_concurrent))
+        self._stats: Dict[str, int] = {
+            "user_turns": 0,
+            "proactive_turns": 0,
+            "coalesced": 0,
+            "dropped": 0,
+        }
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return dict(self._stats)
+
+    def run_user_turn(self, chat_id: int, turn: Callable[[], _T]) -> _T:
+        with self._cond:
+            slot = self._slots.setdefault(chat_id, _ChatSlot())
+            self._drop_pending(slot)
+            slot.user_waiting += 1
+            try:
+                while slot.owner is not None:
+                    self._cond.wait()
+            finally:
+                slot.user_waiting -= 1
+            slot.owner = USER
+            self._stats["user_turns"] += 1
+        try:
+            with self._llm_slots:
+                return turn()
+        finally:
+            with self._cond:
+                # Whatever was queued meanwhile is answered by this turn.
+                self._drop_pending(slot)
+                slot.owner = None
+                self._cond.notify_all()
+
+    def submit_proactive(self, chat_id: int, key: str, prompt: str) -> bool:
+        """Run ``prompt`` now, or queue it; returns True if it ran in this call."""
+        with self._cond:
+            slot = self._slots.setdefault(chat_id, _ChatSlot())
+            if slot.user_waiting or slot.owner == USER:
+                self._stats["dropped"] += 1
+                logger.info("用户(%s)正在对话，丢弃主动提醒：%s", chat_id, key)
+                return False
+            if slot.owner == PROACTIVE:
+                if key in slot.pending:
+                    self._stats["coalesced"] += 1
+                slot.pending[key] = prompt
+                return False
+            slot.owner = PROACTIVE
+        self._drain(chat_id, slot, prompt)
+        return True
+
+    def _drain(self, chat_id: int, slot: _ChatSlot, prompt: str) -> None:
+        while True:
+            with self._cond:
+                self._stats["proactive_turns"] += 1
+            try:
+                with self._llm_slots:
+                    self._runner(chat_id, prompt)
+            except Exception:
+                logger.exception("主动提醒处理失败(chat=%s)", chat_id)
+            with self._cond:
+                if slot.pending and not slot.user_waiting:
+                    prompts = list(slot.pending.values())
+                    slot.pending.clear()
+                    if len(prompts) > 1:
+                        self._stats["coalesced"] += len(prompts) - 1
+                    prompt = "\n".join(prompts)
+                    continue
+                self._drop_pending(slot)
+                slot.owner = None
+                self._cond.notify_all()
+                return
+
+    def _drop_pending(self, slot: _ChatSlot) -> None:
+        if slot.pending:
+            self._stats["dropped"] += len(slot.pending)
+            slot.pending.clear()
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import hmac
+import json
+import logging
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Deque, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+class UpdateDeduplicator:
+    """Remembers the last ``capacity`` update ids; Telegram re-delivers on timeouts."""
+
+    def __init__(self, capacity: int = 10000):
+        self._order: Deque[int] = deque()
+        self._seen: Set[int] = set()
+        self._capacity = capacity
+        self._lock = threading.Lock()
+
+    def first_time(self, update_id: Optional[int]) -> bool:
+        if update_id is None:
+            return True
+        with self._lock:
+            if update_id in self._seen:
+                return False
+            self._seen.add(update_id)
+            self._order.append(update_id)
+            if len(self._order) > self._capacity:
+                self._seen.discard(self._order.popleft())
+            return True
+
+
+class WebhookServer:
+    """Minimal HTTP endpoint receiving Telegram webhook updates.
+
+    Requests to ``path`` must carry the ``secret_token`` given to setWebhook
+    in ``X-Telegram-Bot-Api-Secret-Token``. Each new update is passed to
+    ``submit`` (the dispatcher) before answering 200; repeats of an
+    ``update_id`` are acknowledged and dropped.
+    """
+
+    def __init__(
+        self,
+        submit: Callable[[dict], None],
+        secret_token: str,
+        host: str = "0.0.0.0",
+        port: int = 8443,
+        path: str = "/telegram",
+        dedupe_capacity: int = 10000,
+    ):
+        self._submit = submit
+        self._secret = secret_token.encode("utf-8")
+        self._path = path.rstrip("/") or "/"
+        self._address = (host, port)
+        self._dedupe = UpdateDeduplicator(dedupe_capacity)
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        if self._server is None:
+            return self._address[1]
+        return self._server.server_address[1]
+
+    def start(self) -> "WebhookServer":
+        webhook = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:  # noqa: N802 - http.server naming
+                status = webhook._receive(self)
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, format: str, *args: Any) -> None:
+                logger.debug("Webhook %s", format % args)
+
+        self._server = ThreadingHTTPServer(self._address, _Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="TelegramWebhook", daemon=True)
+        self._thread.start()
+        logger.info("Telegram webhook listening on %s:%s%s", self._address[0], self.port, self._path)
+        return self
+
+    def serve_forever(self) -> None:
+        self.start()
+        self._thread.join()
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def _receive(self, request: BaseHTTPRequestHandler) -> int:
+        if request.path.split("?", 1)[0].rstrip("/") != self._path.rstrip("/"):
+            return 404
+        secret = (request.headers.get(SECRET_HEADER) or "").encode("utf-8")
+        if not hmac.compare_digest(secret, self._secret):
+            logger.warning("拒绝 Webhook 请求：secret token 不匹配")
+            return 403
+        length = int(request.headers.get("Content-Length") or 0)
+        try:
+            update = json.loads(request.rfile.read(length) or b"{}")
+        except ValueError:
+            return 400
+        if not isinstance(update, dict):
+            return 400
+        if not self._dedupe.first_time(update.get("update_id")):
+            logger.info("忽略重复的更新：%s", update.get("update_id"))
+            return 200
+        try:
+            self._submit(update)
+        except Exception:
+            logger.exception("Webhook 更新处理失败：%s", update.get("update_id"))
+            # Still 200: a retry would fail the same way.
+        return 200
@@ -1,9 +1,19 @@
-from .models import Intervention, LogEntry, Project, Task, UserProfile
+from .models import (
+    NOTION_PAGE_BASE_URL,
+    Intervention,
+    LogEntry,
+    Project,
+    Task,
+    UserProfile,
+    notion_page_url,
+)
 
 __all__ = [
     "Intervention",
     "LogEntry",
+    "NOTION_PAGE_BASE_URL",
     "Project",
     "Task",
     "UserProfile",
+    "notion_page_url",
 ]
@@ -4,6 +4,12 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from typing import List, Optional
 
+NOTION_PAGE_BASE_URL = "https://www.notion.so/"
+
+
+def notion_page_url(page_id: str) -> str:
+    return f"{NOTION_PAGE_BASE_URL}{page_id.replace('-', '')}"
+
 
 @dataclass(slots=True)
 class Project:
@@ -24,6 +30,14 @@ class Task:
     due_date: Optional[str]
     subtask_names: List[str] = field(default_factory=list)
     page_url: Optional[str] = None
+    from_notion: bool = False
+
+    @property
+    def url(self) -> Optional[str]:
+        """Explicit page URL, or the canonical Notion URL derived from the ID."""
+        if self.page_url:
+            return self.page_url
+        return notion_page_url(self.id) if self.from_notion else None
 
 
 @dataclass(slots=True)
@@ -34,6 +48,7 @@ class LogEntry:
     content: str
     task_id: Optional[str]
     task_name: str
+    created_at: Optional[str] = None
 
 
 @dataclass(slots=True)
@@ -42,6 +57,7 @@ class Intervention:
     message: str
     reason: str
     created_at: datetime = field(default_factory=datetime.utcnow)
+    task_id: Optional[str] = None
 
 
 @dataclass(slots=True)
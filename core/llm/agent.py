@@ -2,18 +2,28 @@ from __future__ import annotations
 
 import json
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import asdict, is_dataclass
+from types import SimpleNamespace
 from datetime import datetime, date
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 from core.llm.context_builder import AgentContextBuilder
+from core.llm.intents import HIT, LOW_CONFIDENCE, MISS, TOOL_ERROR, IntentRouter
 from core.llm.openai_client import ChatResponse, OpenAIChatClient
+from core.llm.resilience import CircuitOpenError
 from core.llm.run_logger import AgentRunLogger
+from core.llm.tokens import estimate_tokens
+from core.llm.tool_selector import ToolSelector
 from core.llm.tools import AgentTool
 from core.services import LogbookService, StatusGuard, TaskSummaryService
+from core.utils.telemetry import telemetry
 
 logger = logging.getLogger(__name__)
 
+PartialCallback = Callable[[str], None]
+
 
 class LLMAgent:
     def __init__(
@@ -26,24 +36,57 @@ class LLMAgent:
         llm_client: OpenAIChatClient | None = None,
         temperature: float = 0.3,
         run_logger: AgentRunLogger | None = None,
+        max_parallel_tools: int = 4,
+        intent_router: IntentRouter | None = None,
+        tool_selector: ToolSelector | None = None,
     ):
         self._context_builder = context_builder
         self._task_service = task_service
         self._logbook_service = logbook_service
         self._status_guard = status_guard
         self._tools = {tool.name: tool for tool in tools}
+        # Serialised once: an identical tool list keeps the prompt prefix cacheable.
+        self._tools_schema = [tool.to_openai_schema() for tool in tools]
         self._llm_client = llm_client
         self._temperature = temperature
         self._logger = run_logger
+        self._intents = intent_router
+        self._selector = tool_selector
+        self._tool_pool = (
+            ThreadPoolExecutor(max_workers=max_parallel_tools, thread_name_prefix="agent-tool")
+            if max_parallel_tools > 1
+            else None
+        )
+
+    def handle(
+        self,
+        chat_id: int,
+        user_text: str,
+        on_partial: Optional[PartialCallback] = None,
+    ) -> List[str]:
+        """Answer ``user_text``.
 
-    def handle(self, chat_id: int, user_text: str) -> List[str]:
+        When ``on_partial`` is given and the client can stream, it receives the
+        text generated so far by the current completion as tokens arrive.
+        """
+        started = time.perf_counter()
         log_payload: Dict[str, Any] = {"user_text": user_text}
         stages: List[Dict[str, Any]] = []
         logger.info("收到用户(%s)输入：%s", chat_id, user_text)
-        if self._llm_client:
+        fast = self._try_intent(chat_id, user_text)
+        if fast is not None:
+            responses, meta, stages = fast
+        elif self._llm_client:
             try:
                 logger.info("使用 LLM 处理用户(%s)输入", chat_id)
-                responses, meta, stages = self._handle_with_llm(chat_id, user_text)
+                responses, meta, stages = self._handle_with_llm(
+                    chat_id, user_text, on_partial
+                )
+            except CircuitOpenError as exc:
+                logger.warning("LLM 熔断中，直接使用规则逻辑: %s", exc)
+                responses, meta, stages = self._fallback(
+                    user_text, reason="circuit_open", error=str(exc)
+                )
             except Exception as exc:  # pragma: no cover - network errors
                 logger.warning("LLM 调用失败，回退到规则逻辑: %s", exc)
                 responses, meta, stages = self._fallback(
@@ -58,6 +101,7 @@ class LLMAgent:
             log_payload["responses"] = responses
             log_payload["stages"] = stages
             self._logger.log(chat_id, log_payload)
+        telemetry.observe("turn", (time.perf_counter() - started) * 1000)
         logger.info(
             "用户(%s)处理完成，模式=%s，阶段=%s，回复=%s",
             chat_id,
@@ -67,37 +111,129 @@ class LLMAgent:
         )
         return responses
 
+    def llm_stats(self) -> Optional[Dict[str, Any]]:
+        stats = getattr(self._llm_client, "stats", None)
+        return stats() if callable(stats) else None
+
+    def intent_stats(self) -> Optional[Dict[str, Any]]:
+        return self._intents.stats() if self._intents else None
+
+    def _try_intent(self, chat_id: int, user_text: str):
+        """Answer rigidly phrased messages with one tool call and a template."""
+        if self._intents is None:
+            return None
+        match = self._intents.match(user_text)
+        tool = self._tools.get(match.tool) if match else None
+        if match is None or tool is None:
+            self._intents.record(MISS)
+            return None
+        if match.confidence < self._intents.threshold:
+            self._intents.record(LOW_CONFIDENCE, match.intent)
+            return None
+        observation, result = self._run_tool(
+            SimpleNamespace(name=match.tool, arguments=match.arguments, call_id=None), 0, chat_id
+        )
+        payload = json.loads(observation["content"]) if result["status"] == "ok" else {}
+        if result["status"] != "ok" or not isinstance(payload, dict) or payload.get("status") == "error":
+            # Let the LLM explain what went wrong instead of a canned reply.
+            self._intents.record(TOOL_ERROR, match.intent)
+            logger.info("快速意图 %s 执行失败，交给 LLM：%s", match.intent, observation["content"])
+            return None
+        self._intents.record(HIT, match.intent)
+        reply = match.render(payload)
+        logger.info("快速意图命中：%s（置信度 %.2f）", match.intent, match.confidence)
+        meta = {"mode": "intent", "intent": match.intent, "confidence": match.confidence}
+        stages = [
+            {"stage": "intent", "intent": match.intent, "tool": match.tool, "result": result, "reply": reply}
+        ]
+        return [reply], meta, stages
+
+    def _chat(
+        self,
+        chat_id: int,
+        messages: List[Dict[str, Any]],
+        tools_schema: List[Dict[str, Any]],
+        on_partial: Optional[PartialCallback],
+    ) -> ChatResponse:
+        with telemetry.span("llm_call"):
+            response = self._complete(messages, tools_schema, on_partial)
+        telemetry.add_usage(chat_id, response.usage)
+        return response
+
+    def _complete(
+        self,
+        messages: List[Dict[str, Any]],
+        tools_schema: List[Dict[str, Any]],
+        on_partial: Optional[PartialCallback],
+    ) -> ChatResponse:
+        stream = getattr(self._llm_client, "chat_stream", None)
+        if on_partial is None or stream is None:
+            return self._llm_client.chat(
+                messages=messages, tools=tools_schema, temperature=self._temperature
+            )
+        text = ""
+        response: Optional[ChatResponse] = None
+        for delta in stream(messages=messages, tools=tools_schema, temperature=self._temperature):
+            if delta.content:
+                text += delta.content
+                on_partial(text)
+            if delta.response is not None:
+                response = delta.response
+        if response is None:
+            raise RuntimeError("LLM 流式响应提前结束")
+        return response
+
     def _handle_with_llm(
-        self, chat_id: int, user_text: str
+        self,
+        chat_id: int,
+        user_text: str,
+        on_partial: Optional[PartialCallback] = None,
     ) -> (List[str], Dict[str, Any], List[Dict[str, Any]]):
-        messages = self._context_builder.build_messages(chat_id, user_text)
-        tools_schema = [tool.to_openai_schema() for tool in self._tools.values()]
+        with telemetry.span("context_build"):
+            messages = self._context_builder.build_messages(chat_id, user_text)
+        tools_schema = self._tools_schema
+        meta: Dict[str, Any] = {"mode": "llm"}
+        stages: List[Dict[str, Any]] = []
+        exposed = None
+        if self._selector is not None:
+            groups = self._selector.select(chat_id, user_text)
+            tools_schema, exposed = self._selector.schemas(groups)
+            meta["tool_groups"] = sorted(groups)
         logger.info("向 LLM 发送请求，消息数=%d，工具数=%d", len(messages), len(tools_schema))
-        response = self._llm_client.chat(
-            messages=messages, tools=tools_schema, temperature=self._temperature
-        )
-        meta: Dict[str, Any] = {
-            "mode": "llm",
-            "initial_tool_calls": [call.name for call in response.tool_calls],
-            "usage_initial": response.usage,
-        }
-        stages: List[Dict[str, Any]] = [
+        response = self._chat(chat_id, messages, tools_schema, on_partial)
+        if exposed is not None and any(call.name not in exposed for call in response.tool_calls):
+            # The model reached for a tool outside the selected groups: ask
+            # again with every tool on offer.
+            hidden = [call.name for call in response.tool_calls if call.name not in exposed]
+            logger.info("LLM 请求了未提供的工具 %s，使用完整工具集重试", hidden)
+            stages.append({"stage": "tool_reoffer", "requested": hidden, "usage": response.usage})
+            _add_cached_tokens(meta, response.usage)
+            tools_schema = self._tools_schema
+            response = self._chat(chat_id, messages, tools_schema, on_partial)
+        meta["initial_tool_calls"] = [call.name for call in response.tool_calls]
+        meta["usage_initial"] = response.usage
+        _add_cached_tokens(meta, response.usage)
+        stages.append(
             {
                 "stage": "llm_initial",
                 "reply": response.content,
                 "tool_calls": [call.name for call in response.tool_calls],
                 "usage": response.usage,
             }
-        ]
+        )
+        if self._selector is not None:
+            self._selector.record_usage(chat_id, meta["initial_tool_calls"])
         messages.append(_assistant_or_tool_message(response))
         if response.tool_calls:
             logger.info(
                 "LLM 请求调用工具：%s，开始执行",
                 [call.name for call in response.tool_calls],
             )
+            started = time.perf_counter()
             observations, tool_results = self._execute_tool_calls(
                 response.tool_calls, chat_id
             )
+            batch_ms = round((time.perf_counter() - started) * 1000, 1)
             meta["tool_results"] = tool_results
             for obs in observations:
                 messages.append(obs)
@@ -105,6 +241,7 @@ class LLMAgent:
                 {
                     "stage": "tool_execution",
                     "results": tool_results,
+                    "duration_ms": batch_ms,
                 }
             )
             logger.info(
@@ -114,10 +251,9 @@ class LLMAgent:
             )
             logger.info("工具执行完成，回传 observation 后再次请求 LLM")
 
-            final = self._llm_client.chat(
-                messages=messages, tools=tools_schema, temperature=self._temperature
-            )
+            final = self._chat(chat_id, messages, tools_schema, on_partial)
             meta["usage_final"] = final.usage
+            _add_cached_tokens(meta, final.usage)
             stages.append(
                 {
                     "stage": "llm_final",
@@ -129,48 +265,71 @@ class LLMAgent:
         return [response.content or "（LLM 未返回内容）"], meta, stages
 
     def _execute_tool_calls(self, tool_calls, chat_id: int):
-        observations = []
-        results = []
+        """Run one batch of tool calls.
+
+        Consecutive read-only calls run concurrently on the tool pool; a
+        mutating (or unknown) call waits for them and runs alone, so side
+        effects keep the order the model asked for. Observations are returned
+        in request order either way.
+        """
+        outcomes: List[Any] = [None] * len(tool_calls)
+        pending: List[int] = []
         for idx, call in enumerate(tool_calls):
             tool = self._tools.get(call.name)
-            call_id = call.call_id or f"call-{idx}"
-            if not tool:
-                observations.append(
-                    {
-                        "role": "tool",
-                        "name": call.name,
-                        "tool_call_id": call_id,
-                        "content": f"未知工具 {call.name}",
-                    },
-                )
-                results.append({"name": call.name, "status": "missing"})
+            if tool is not None and tool.read_only:
+                pending.append(idx)
                 continue
-            try:
-                result = tool.execute(call.arguments, chat_id)
-                content = _safe_json_dump(result)
-                observations.append(
-                    {
-                        "role": "tool",
-                        "name": call.name,
-                        "tool_call_id": call_id,
-                        "content": content,
-                    }
-                )
-                results.append({"name": call.name, "status": "ok"})
-            except Exception as exc:
-                observations.append(
-                    {
-                        "role": "tool",
-                        "name": call.name,
-                        "tool_call_id": call_id,
-                        "content": _safe_json_dump({"error": str(exc)}),
-                    },
-                )
-                results.append(
-                    {"name": call.name, "status": "error", "error": str(exc)}
-                )
+            self._run_read_only(tool_calls, pending, chat_id, outcomes)
+            pending = []
+            outcomes[idx] = self._run_tool(call, idx, chat_id)
+        self._run_read_only(tool_calls, pending, chat_id, outcomes)
+        observations = [observation for observation, _ in outcomes]
+        results = [result for _, result in outcomes]
         return observations, results
 
+    def _run_read_only(self, tool_calls, indices: List[int], chat_id: int, outcomes: List[Any]) -> None:
+        if len(indices) < 2 or self._tool_pool is None:
+            for idx in indices:
+                outcomes[idx] = self._run_tool(tool_calls[idx], idx, chat_id)
+            return
+        futures = {
+            idx: self._tool_pool.submit(self._run_tool, tool_calls[idx], idx, chat_id)
+            for idx in indices
+        }
+        for idx, future in futures.items():
+            outcomes[idx] = future.result()
+
+    def _run_tool(self, call, idx: int, chat_id: int):
+        call_id = call.call_id or f"call-{idx}"
+        tool = self._tools.get(call.name)
+        if not tool:
+            observation = {
+                "role": "tool",
+                "name": call.name,
+                "tool_call_id": call_id,
+                "content": f"未知工具 {call.name}",
+            }
+            return observation, {"name": call.name, "status": "missing"}
+        started = time.perf_counter()
+        try:
+            result = tool.execute(call.arguments, chat_id)
+            content = _safe_json_dump(result)
+            status: Dict[str, Any] = {"name": call.name, "status": "ok"}
+        except Exception as exc:
+            content = _safe_json_dump({"error": str(exc)})
+            status = {"name": call.name, "status": "error", "error": str(exc)}
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        status["duration_ms"] = round(elapsed_ms, 1)
+        telemetry.observe(f"tool:{call.name}", elapsed_ms)
+        telemetry.add_tokens(f"tool:{call.name}", {"result_tokens": estimate_tokens(content)})
+        observation = {
+            "role": "tool",
+            "name": call.name,
+            "tool_call_id": call_id,
+            "content": content,
+        }
+        return observation, status
+
     def _fallback(
         self, text: str, reason: str, error: str | None = None
     ) -> (List[str], Dict[str, Any], List[Dict[str, Any]]):
@@ -235,6 +394,12 @@ class LLMAgent:
         )
 
 
+def _add_cached_tokens(meta: Dict[str, Any], usage: Optional[Dict[str, Any]]) -> None:
+    cached = (usage or {}).get("cached_tokens")
+    if cached is not None:
+        meta["cached_tokens"] = meta.get("cached_tokens", 0) + cached
+
+
 def _assistant_or_tool_message(response: ChatResponse) -> Dict:
     if response.tool_calls:
         tool_entries = []
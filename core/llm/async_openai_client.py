@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import queue
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence
+
+from openai import AsyncOpenAI
+
+from core.llm.openai_client import (
+    ChatDelta,
+    ChatResponse,
+    _chunk_delta,
+    _completion_response,
+    _Endpoint,
+    _StreamAccumulator,
+    _usage_dict,
+)
+from core.llm.resilience import CircuitBreaker, CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class AsyncOpenAIChatClient:
+    """asyncio counterpart of ``OpenAIChatClient``.
+
+    Same endpoints, deadlines, circuit breakers and fallbacks, but requests run
+    on the event loop through ``AsyncOpenAI``. Hedging is not offered: with
+    cheap coroutines a caller can race two calls itself.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str,
+        model: str,
+        provider: str = "openai",
+        timeout_seconds: float = 30.0,
+        stream_deadline_seconds: float = 120.0,
+        max_retries: int = 1,
+        fallbacks: Sequence[Any] = (),
+        breaker_failures: int = 3,
+        breaker_reset_seconds: float = 60.0,
+        client: Any = None,
+    ):
+        def _endpoint(name: str, key: str, url: str, model_name: str, provider_name: str, sdk: Any = None) -> _Endpoint:
+            return _Endpoint(
+                name=name,
+                client=sdk
+                or AsyncOpenAI(
+                    api_key=key,
+                    base_url=url or None,
+                    timeout=timeout_seconds,
+                    max_retries=max_retries,
+                ),
+                model=model_name,
+                provider=provider_name,
+                breaker=CircuitBreaker(breaker_failures, breaker_reset_seconds),
+            )
+
+        self._endpoints: List[_Endpoint] = [
+            _endpoint(f"{provider}:{model}", api_key, base_url, model, provider, client)
+        ]
+        for fallback in fallbacks:
+            self._endpoints.append(
+                _endpoint(
+                    f"{fallback.provider}:{fallback.model}",
+                    fallback.api_key,
+                    fallback.base_url,
+                    fallback.model,
+                    fallback.provider,
+                )
+            )
+        self._timeout = timeout_seconds
+        self._stream_deadline = stream_deadline_seconds
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            endpoint.name: {**endpoint.stats.to_dict(), "circuit": endpoint.breaker.state}
+            for endpoint in self._endpoints
+        }
+
+    async def chat(
+        self,
+        messages: List[Dict[str, Any]],
+        tools: Optional[List[Dict[str, Any]]] = None,
+        temperature: float = 0.3,
+    ) -> ChatResponse:
+        logger.info(
+            "异步调用 OpenAI ChatCompletions，模型=%s，messages=%d，tools=%d",
+            self._endpoints[0].model,
+            len(messages),
+            len(tools or []),
+        )
+        last_error: Exception | None = None
+        for endpoint in self._available():
+            started = time.monotonic()
+            try:
+                response = await asyncio.wait_for(
+                    endpoint.client.chat.completions.create(
+                        model=endpoint.model,
+                        messages=messages,
+                        tools=tools,
+                        temperature=temperature,
+                    ),
+                    timeout=self._timeout,
+                )
+            except Exception as exc:
+                self._record(endpoint, started, exc)
+                last_error = exc
+                logger.warning("LLM 端点 %s 调用失败: %s", endpoint.name, exc)
+                continue
+            self._record(endpoint, started)
+            return _completion_response(response)
+        assert last_error is not None
+        raise last_error
+
+    async def chat_stream(
+        self,
+        messages: List[Dict[str, Any]],
+        tools: Optional[List[Dict[str, Any]]] = None,
+        temperature: float = 0.3,
+    ) -> AsyncIterator[ChatDelta]:
+        """Async version of ``OpenAIChatClient.chat_stream``."""
+        last_error: Exception | None = None
+        for endpoint in self._available():
+            started = time.monotonic()
+            options: Dict[str, Any] = {}
+            if endpoint.provider == "openai":
+                options["stream_options"] = {"include_usage": True}
+            try:
+                stream = await asyncio.wait_for(
+                    endpoint.client.chat.completions.create(
+                        model=endpoint.model,
+                        messages=messages,
+                        tools=tools,
+                        temperature=temperature,
+                        stream=True,
+                        **options,
+                    ),
+                    timeout=self._timeout,
+                )
+            except Exception as exc:
+                self._record(endpoint, started, exc)
+                last_error = exc
+                logger.warning("LLM 端点 %s 流式调用失败: %s", endpoint.name, exc)
+                continue
+            accumulator = _StreamAccumulator()
+            try:
+                async for chunk in self._chunks(stream, started):
+                    usage = getattr(chunk, "usage", None)
+                    if usage is not None:
+                        accumulator.usage = _usage_dict(usage)
+                    delta = _chunk_delta(chunk)
+                    if delta is not None:
+                        accumulator.add(delta)
+                        yield delta
+            except Exception as exc:
+                self._record(endpoint, started, exc)
+                logger.exception("LLM 流式响应中断: %s", exc)
+                raise
+            self._record(endpoint, started)
+            yield ChatDelta(response=accumulator.build())
+            return
+        assert last_error is not None
+        raise last_error
+
+    async def _chunks(self, stream: Any, started: float) -> AsyncIterator[Any]:
+        iterator = stream.__aiter__()
+        while True:
+            remaining = self._stream_deadline - (time.monotonic() - started)
+            try:
+                if remaining <= 0:
+                    raise asyncio.TimeoutError
+                chunk = await asyncio.wait_for(iterator.__anext__(), timeout=remaining)
+            except StopAsyncIteration:
+                return
+            except asyncio.TimeoutError:
+                close = getattr(stream, "close", None)
+                if callable(close):
+                    await close()
+                raise TimeoutError(f"LLM 流式响应超过 {self._stream_deadline:.0f} 秒")
+            yield chunk
+
+    def _available(self) -> List[_Endpoint]:
+        candidates = []
+        for endpoint in self._endpoints:
+            if endpoint.breaker.allow():
+                candidates.append(endpoint)
+            else:
+                endpoint.stats.short_circuited += 1
+        if not candidates:
+            raise CircuitOpenError("所有 LLM 端点均处于熔断状态")
+        return candidates
+
+    @staticmethod
+    def _record(endpoint: _Endpoint, started: float, error: Exception | None = None) -> None:
+        endpoint.stats.record((time.monotonic() - started) * 1000, error)
+        if error is None:
+            endpoint.breaker.record_success()
+        else:
+            endpoint.breaker.record_failure()
+
+
+class BlockingChatClient:
+    """Synchronous facade over ``AsyncOpenAIChatClient`` for ``LLMAgent``.
+
+    The agent keeps running in worker threads while every request is carried
+    out on ``loop``. Must not be called from the loop's own thread.
+    """
+
+    def __init__(self, client: AsyncOpenAIChatClient, loop: asyncio.AbstractEventLoop):
+        self._client = client
+        self._loop = loop
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return self._client.stats()
+
+    def chat(self, **kwargs: Any) -> ChatResponse:
+        return asyncio.run_coroutine_threadsafe(self._client.chat(**kwargs), self._loop).result()
+
+    def chat_stream(self, **kwargs: Any) -> Iterator[ChatDelta]:
+        items: "queue.Queue[Any]" = queue.Queue()
+
+        async def _pump() -> None:
+            try:
+                async for delta in self._client.chat_stream(**kwargs):
+                    items.put(delta)
+            except BaseException as exc:
+                items.put(exc)
+            finally:
+                items.put(_DONE)
+
+        asyncio.run_coroutine_threadsafe(_pump(), self._loop)
+        while True:
+            item = items.get()
+            if item is _DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
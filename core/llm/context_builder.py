@@ -3,6 +3,8 @@ from __future__ import annotations
 from pathlib import Path
 from typing import List, Protocol
 
+from core.llm.conversation_window import ConversationWindow
+from core.llm.history_recall import HistoryRecall
 from core.utils.timezone import beijing_now
 
 
@@ -16,11 +18,17 @@ class AgentContextBuilder:
         self,
         history_provider: HistoryProvider,
         user_profile_path: Path,
-        history_limit: int = 8,
+        history_limit: int = 60,
+        window: ConversationWindow | None = None,
+        recall: HistoryRecall | None = None,
     ):
         self._history = history_provider
+        # How many recent entries to read; ``window`` decides how many fit.
         self._history_limit = history_limit
+        self._window = window or ConversationWindow()
+        self._recall = recall
         self._profile_text = self._load_profile(user_profile_path)
+        self._system_prompt = self._build_system_prompt()
 
     @staticmethod
     def _load_profile(path: Path) -> str:
@@ -28,16 +36,20 @@ class AgentContextBuilder:
             return "用户画像缺失。"
         return path.read_text(encoding="utf-8")
 
-    def build_messages(self, chat_id: int, user_text: str) -> List[dict]:
-        history_entries = self._history.get_history(chat_id, limit=self._history_limit)
-        beijing_time = beijing_now()
-        system_prompt = (
+    @property
+    def system_prompt(self) -> str:
+        return self._system_prompt
+
+    def _build_system_prompt(self) -> str:
+        # Kept byte-identical between requests so provider-side prompt caching
+        # can reuse it; anything that changes per request goes into
+        # ``_volatile_context`` at the end of the message list instead.
+        return (
             "你是一名 AI 秘书，负责在 Telegram 中高效督促用户，所有回复必须使用 Markdown。\n"
             "用户画像如下：\n"
             f"{self._profile_text}\n"
-            f"当前北京时间：{beijing_time:%Y-%m-%d %H:%M}\n"
             "务必遵守：\n"
-            "- 所有时间/计时器都基于真实客观时间（以当前北京时间为准），禁止主观估计“已经过去多久”。\n"
+            "- 所有时间/计时器都基于真实客观时间（以用户消息前一条系统消息给出的当前北京时间为准），禁止主观估计“已经过去多久”。\n"
             "- 风格选择：\n"
             "  * 问时间/状态：最多 2 句，每句 ≤15 字，禁止问句，直接陈述并命令。\n"
             "  * 任务规划/追踪：列事实/风险/下一步，可附具体时间点。\n"
@@ -57,9 +69,27 @@ class AgentContextBuilder:
             "- 当用户用“小时/分钟/秒”等描述提醒间隔时，请主动换算为分钟（例如 8 小时=480 分钟）后执行，禁止让用户再次输入。\n"
         )
 
-        messages: List[dict] = [{"role": "system", "content": system_prompt}]
-        for entry in history_entries:
-            role = "assistant" if entry.direction == "bot" else "user"
-            messages.append({"role": role, "content": entry.text})
+    def _volatile_context(self) -> str:
+        return f"当前北京时间：{beijing_now():%Y-%m-%d %H:%M}"
+
+    def build_messages(self, chat_id: int, user_text: str) -> List[dict]:
+        history_entries = self._history.get_history(chat_id, limit=self._history_limit)
+        summary, window = self._window.fit(
+            chat_id,
+            history_entries,
+            complete=len(history_entries) < self._history_limit,
+        )
+        messages: List[dict] = [{"role": "system", "content": self._system_prompt}]
+        if summary:
+            messages.append({"role": "system", "content": summary})
+        messages.extend({"role": item.role, "content": item.content} for item in window)
+        if self._recall is not None:
+            # Query-dependent, so it goes after the cacheable prefix.
+            shown = history_entries[len(history_entries) - len(window):]
+            in_prompt = [entry.message_id for entry in shown]
+            recalled = self._recall.recall(chat_id, user_text, exclude_message_ids=in_prompt)
+            if recalled:
+                messages.append({"role": "system", "content": recalled})
+        messages.append({"role": "system", "content": self._volatile_context()})
         messages.append({"role": "user", "content": user_text})
         return messages
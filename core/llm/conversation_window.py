@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from core.llm.tokens import estimate_tokens, truncate_to_tokens
+
+# Lines that look like a promise, a plan or a deadline survive summary
+# compaction longer than small talk.
+_COMMITMENT_RE = re.compile(
+    r"\d|今天|明天|后天|下周|周[一二三四五六日天]|截止|deadline|提醒|记得|答应|承诺|计划|安排|必须|之前|完成",
+    re.IGNORECASE,
+)
+SUMMARY_HEADER = "此前对话摘要（较早消息已压缩）："
+# Role/formatting overhead per chat message.
+_MESSAGE_OVERHEAD = 4
+
+
+@dataclass(slots=True)
+class WindowMessage:
+    role: str
+    content: str
+
+
+@dataclass(slots=True)
+class _SummaryLine:
+    seq: int
+    score: int
+    text: str
+    tokens: int
+
+
+@dataclass(slots=True)
+class _ChatSummary:
+    upto_message_id: int = -1
+    lines: List[_SummaryLine] = field(default_factory=list)
+    text: Optional[str] = None
+
+
+class ConversationWindow:
+    """Fits chat history into a token budget with a rolling summary.
+
+    The newest messages are kept verbatim (each capped at ``message_tokens``)
+    until ``max_tokens`` is used up. Messages that slide out of the window are
+    folded, one extractive line each, into a per-chat summary of at most
+    ``summary_tokens``; when it overflows, the oldest lines without dates,
+    numbers or commitments are dropped first. The summary is only touched when
+    the window actually slides, so between slides the prompt prefix is stable.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 2000,
+        message_tokens: int = 400,
+        summary_tokens: int = 300,
+        line_tokens: int = 40,
+    ):
+        self._max_tokens = max_tokens
+        self._message_tokens = message_tokens
+        self._summary_tokens = summary_tokens
+        self._line_tokens = line_tokens
+        self._summaries: Dict[int, _ChatSummary] = {}
+        self._lock = threading.Lock()
+
+    def fit(
+        self,
+        chat_id: int,
+        entries: Sequence[Any],
+        complete: bool = False,
+    ) -> Tuple[Optional[str], List[WindowMessage]]:
+        """Return ``(summary, messages)`` for chronologically ordered ``entries``.
+
+        ``complete`` tells that ``entries`` is the chat's whole history; an
+        empty or restarted history then discards the cached summary.
+        """
+        kept: List[WindowMessage] = []
+        used = 0
+        for entry in reversed(entries):
+            text = truncate_to_tokens(entry.text or "", self._message_tokens)
+            cost = estimate_tokens(text) + _MESSAGE_OVERHEAD
+            if kept and used + cost > self._max_tokens:
+                break
+            kept.append(WindowMessage(_role(entry), text))
+            used += cost
+        kept.reverse()
+        dropped = entries[: len(entries) - len(kept)]
+        with self._lock:
+            state = self._summaries.get(chat_id)
+            if complete and state is not None and (
+                not entries or _message_id(entries[0]) > state.upto_message_id
+            ):
+                # History was cleared/archived: the old summary no longer applies.
+                state = None
+                self._summaries.pop(chat_id, None)
+            fresh = [
+                entry
+                for entry in dropped
+                if state is None or _message_id(entry) > state.upto_message_id
+            ]
+            if fresh:
+                state = state or self._summaries.setdefault(chat_id, _ChatSummary())
+                self._fold(state, fresh)
+            return (state.text if state else None), kept
+
+    def reset(self, chat_id: int) -> None:
+        with self._lock:
+            self._summaries.pop(chat_id, None)
+
+    def _fold(self, state: _ChatSummary, entries: Sequence[Any]) -> None:
+        seq = state.lines[-1].seq + 1 if state.lines else 0
+        for entry in entries:
+            text = " ".join((entry.text or "").split())
+            if text:
+                line = f"{'秘书' if _role(entry) == 'assistant' else '用户'}：{truncate_to_tokens(text, self._line_tokens)}"
+                score = 1 if _COMMITMENT_RE.search(text) else 0
+                state.lines.append(_SummaryLine(seq, score, line, estimate_tokens(line) + 1))
+                seq += 1
+            state.upto_message_id = max(state.upto_message_id, _message_id(entry))
+        budget = self._summary_tokens - estimate_tokens(SUMMARY_HEADER)
+        total = sum(line.tokens for line in state.lines)
+        while state.lines and total > budget:
+            victim = min(state.lines, key=lambda line: (line.score, line.seq))
+            state.lines.remove(victim)
+            total -= victim.tokens
+        state.text = (
+            "\n".join([SUMMARY_HEADER, *(f"- {line.text}" for line in state.lines)])
+            if state.lines
+            else None
+        )
+
+
+def _role(entry: Any) -> str:
+    return "assistant" if getattr(entry, "direction", "user") == "bot" else "user"
+
+
+def _message_id(entry: Any) -> int:
+    value = getattr(entry, "message_id", None)
+    return value if isinstance(value, int) else -1
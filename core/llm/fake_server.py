@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import json
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from core.llm.tokens import estimate_tokens
+
+_FILLER = "好的，我已经根据当前任务和日志整理了下一步安排，请按优先级推进。"
+
+# (pattern on the user message, tool name, arguments); ``{text}`` in an
+# argument value is replaced by the user message.
+DEFAULT_RULES: Sequence[Tuple[str, str, Dict[str, Any]]] = (
+    (r"找|搜索|查一下|search", "search_task", {"query": "{text}"}),
+    (r"日志|进展|回顾|log", "list_logs", {"limit": 5}),
+    (r"任务|待办|今天|安排|todo", "today_tasks", {}),
+)
+
+
+@dataclass(slots=True)
+class ScriptedReply:
+    content: Optional[str] = None
+    tool_calls: List[Tuple[str, Dict[str, Any]]] = field(default_factory=list)
+
+
+Responder = Callable[[List[Dict[str, Any]]], ScriptedReply]
+
+
+class RuleResponder:
+    """Deterministic stand-in for the model.
+
+    A user message matching one of ``rules`` gets the corresponding tool call;
+    anything else, and every request that ends with tool results, gets a plain
+    reply of ``reply_chars`` characters.
+    """
+
+    def __init__(
+        self,
+        rules: Sequence[Tuple[str, str, Dict[str, Any]]] = DEFAULT_RULES,
+        reply_chars: int = 120,
+    ):
+        self._rules = [(re.compile(pattern, re.IGNORECASE), tool, args) for pattern, tool, args in rules]
+        self._reply_chars = reply_chars
+
+    def __call__(self, messages: List[Dict[str, Any]]) -> ScriptedReply:
+        last = messages[-1] if messages else {}
+        text = str(last.get("content") or "")
+        if last.get("role") == "user":
+            for pattern, tool, args in self._rules:
+                if pattern.search(text):
+                    arguments = {key: value.replace("{text}", text) if isinstance(value, str) else value
+                                 for key, value in args.items()}
+                    return ScriptedReply(tool_calls=[(tool, arguments)])
+        reply = (_FILLER * (self._reply_chars // len(_FILLER) + 1))[: self._reply_chars]
+        return ScriptedReply(content=reply)
+
+
+@dataclass(slots=True)
+class RecordedRequest:
+    messages: int
+    tools: int
+    stream: bool
+    prompt_tokens: int
+    completion_tokens: int
+
+
+class FakeLLMServer:
+    """Local OpenAI-compatible ``/v1/chat/completions`` endpoint for benchmarks.
+
+    Replies come from ``responder``. Latency is simulated as ``first_token_ms``
+    before the first token and then ``tokens_per_second``; a streamed reply is
+    sent as SSE chunks of ``chunk_chars`` characters. Every request is recorded
+    with its estimated prompt size.
+    """
+
+    def __init__(
+        self,
+        responder: Optional[Responder] = None,
+        first_token_ms: float = 200.0,
+        tokens_per_second: float = 50.0,
+        chunk_chars: int = 2,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self._responder = responder or RuleResponder()
+        self._first_token = first_token_ms / 1000
+        self._per_token = 1 / tokens_per_second if tokens_per_second > 0 else 0.0
+        self._chunk_chars = max(1, chunk_chars)
+        self._address = (host, port)
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._counter = 0
+        self.requests: List[RecordedRequest] = []
+
+    @property
+    def base_url(self) -> str:
+        if self._server is None:
+            raise RuntimeError("FakeLLMServer 尚未启动")
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "FakeLLMServer":
+        fake = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self) -> None:  # noqa: N802 - http.server naming
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self.send_error(404)
+                    return
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                fake._serve(self, body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                return
+
+        self._server = ThreadingHTTPServer(self._address, _Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-llm", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FakeLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    # --------------------------------------------------------------- serving
+    def _serve(self, handler: BaseHTTPRequestHandler, body: Dict[str, Any]) -> None:
+        messages = body.get("messages") or []
+        tools = body.get("tools") or []
+        stream = bool(body.get("stream"))
+        reply = self._responder(messages)
+        prompt_tokens = sum(estimate_tokens(_message_text(message)) for message in messages)
+        if tools:
+            prompt_tokens += estimate_tokens(json.dumps(tools, ensure_ascii=False))
+        chunks = self._chunks(reply.content or "")
+        calls = [
+            {
+                "index": idx,
+                "id": f"call_{self._next_id()}",
+                "type": "function",
+                "function": {"name": name, "arguments": json.dumps(arguments, ensure_ascii=False)},
+            }
+            for idx, (name, arguments) in enumerate(reply.tool_calls)
+        ]
+        completion_tokens = len(chunks) + sum(estimate_tokens(call["function"]["arguments"]) for call in calls)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        with self._lock:
+            self.requests.append(RecordedRequest(len(messages), len(tools), stream, prompt_tokens, completion_tokens))
+        completion_id = f"chatcmpl-{self._next_id()}"
+        model = body.get("model") or "fake"
+        time.sleep(self._first_token)
+        if not stream:
+            time.sleep(self._per_token * max(0, completion_tokens - 1))
+            message: Dict[str, Any] = {"role": "assistant", "content": reply.content}
+            if calls:
+                message["tool_calls"] = [{key: value for key, value in call.items() if key != "index"} for call in calls]
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "message": message, "finish_reason": "tool_calls" if calls else "stop"}],
+                "usage": usage,
+            }
+            data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            handler.send_response(200)
+            handler.send_header("Content-Type", "application/json")
+            handler.send_header("Content-Length", str(len(data)))
+            handler.end_headers()
+            handler.wfile.write(data)
+            return
+
+        handler.send_response(200)
+        handler.send_header("Content-Type", "text/event-stream")
+        handler.send_header("Cache-Control", "no-cache")
+        handler.send_header("Connection", "close")
+        handler.end_headers()
+
+        def _event(delta: Optional[Dict[str, Any]], finish: Optional[str] = None, with_usage: bool = False) -> None:
+            chunk: Dict[str, Any] = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [] if delta is None else [{"index": 0, "delta": delta, "finish_reason": finish}],
+            }
+            if with_usage:
+                chunk["usage"] = usage
+            handler.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+            handler.wfile.flush()
+
+        for idx, text in enumerate(chunks):
+            if idx:
+                time.sleep(self._per_token)
+            _event({"role": "assistant", "content": text} if idx == 0 else {"content": text})
+        for call in calls:
+            _event({"tool_calls": [call]})
+        _event({}, finish="tool_calls" if calls else "stop")
+        if (body.get("stream_options") or {}).get("include_usage"):
+            _event(None, with_usage=True)
+        handler.wfile.write(b"data: [DONE]\n\n")
+        handler.wfile.flush()
+        handler.close_connection = True
+
+    def _chunks(self, text: str) -> List[str]:
+        size = self._chunk_chars
+        return [text[start : start + size] for start in range(0, len(text), size)]
+
+    def _next_id(self) -> int:
+        with self._lock:
+            self._counter += 1
+            return self._counter
+
+
+def _message_text(message: Dict[str, Any]) -> str:
+    content = message.get("content") or ""
+    if not isinstance(content, str):
+        content = json.dumps(content, ensure_ascii=False)
+    if message.get("tool_calls"):
+        content += json.dumps(message["tool_calls"], ensure_ascii=False)
+    return content
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from core.llm.tokens import estimate_tokens, truncate_to_tokens
+from core.utils.text_search import InvertedIndex, tokenize
+
+RECALL_HEADER = "可能相关的历史对话（按相关度，仅供参考）："
+
+
+@dataclass(slots=True)
+class _Message:
+    message_id: int
+    role: str
+    text: str
+    day: str
+
+
+@dataclass(slots=True)
+class _ChatMemory:
+    index: InvertedIndex
+    messages: List[_Message] = field(default_factory=list)
+
+
+class HistoryRecall:
+    """BM25 retrieval over a chat's full history, archived sessions included.
+
+    Each chat is indexed on its first query from ``HistoryStore.iter_entries``
+    and then kept current through the store's entry listener, so nothing is
+    re-read afterwards. ``recall`` returns the best matching exchanges (a user
+    message with the reply that followed it) rendered within ``max_tokens``.
+    Runs entirely in process; no model or network is involved.
+    """
+
+    def __init__(
+        self,
+        history_store: Any,
+        max_tokens: int = 400,
+        top_k: int = 3,
+        message_tokens: int = 80,
+        min_terms: int = 2,
+    ):
+        self._store = history_store
+        self._max_tokens = max_tokens
+        self._top_k = top_k
+        self._message_tokens = message_tokens
+        self._min_terms = min_terms
+        self._chats: Dict[int, _ChatMemory] = {}
+        self._lock = threading.Lock()
+        history_store.subscribe(self._on_entry)
+
+    def recall(
+        self,
+        chat_id: int,
+        query: str,
+        exclude_message_ids: Iterable[int] = (),
+    ) -> Optional[str]:
+        """Relevant past exchanges for ``query``, or None when nothing matches.
+
+        Messages in ``exclude_message_ids`` (usually the ones already in the
+        prompt) are never returned.
+        """
+        if len(tokenize(query)) < self._min_terms:
+            return None
+        excluded: Set[int] = set(exclude_message_ids)
+        with self._lock:
+            memory = self._memory(chat_id)
+            hits = memory.index.search(query, limit=self._top_k * 4)
+            exchanges: List[List[_Message]] = []
+            seen: Set[int] = set()
+            for hit in hits:
+                exchange = self._exchange(memory.messages, hit.doc_id)
+                ids = {message.message_id for message in exchange}
+                if ids & excluded or ids & seen:
+                    continue
+                seen |= ids
+                exchanges.append(exchange)
+                if len(exchanges) >= self._top_k:
+                    break
+        if not exchanges:
+            return None
+        lines = [RECALL_HEADER]
+        used = estimate_tokens(RECALL_HEADER)
+        for exchange in exchanges:
+            block = "\n".join(
+                f"[{message.day}] {'秘书' if message.role == 'assistant' else '用户'}："
+                f"{truncate_to_tokens(message.text, self._message_tokens)}"
+                for message in exchange
+            )
+            cost = estimate_tokens(block) + 1
+            if used + cost > self._max_tokens:
+                break
+            lines.append(block)
+            used += cost
+        return "\n".join(lines) if len(lines) > 1 else None
+
+    def _memory(self, chat_id: int) -> _ChatMemory:
+        memory = self._chats.get(chat_id)
+        if memory is None:
+            memory = _ChatMemory(InvertedIndex({"text": 1.0}))
+            for entry in self._store.iter_entries(chat_id):
+                self._add(memory, entry)
+            self._chats[chat_id] = memory
+        return memory
+
+    def _on_entry(self, entry: Any) -> None:
+        with self._lock:
+            memory = self._chats.get(entry.chat_id)
+            if memory is not None:
+                # Unbuilt chats pick the entry up from disk on first query.
+                self._add(memory, entry)
+
+    @staticmethod
+    def _add(memory: _ChatMemory, entry: Any) -> None:
+        text = " ".join((entry.text or "").split())
+        if not text:
+            return
+        position = len(memory.messages)
+        memory.messages.append(
+            _Message(
+                message_id=entry.message_id,
+                role="assistant" if entry.direction == "bot" else "user",
+                text=text,
+                day=str(entry.timestamp or "")[:10],
+            )
+        )
+        memory.index.add(position, {"text": text})
+
+    @staticmethod
+    def _exchange(messages: List[_Message], position: int) -> List[_Message]:
+        message = messages[position]
+        if message.role == "user":
+            following = messages[position + 1] if position + 1 < len(messages) else None
+            return [message, following] if following and following.role == "assistant" else [message]
+        previous = messages[position - 1] if position > 0 else None
+        return [previous, message] if previous and previous.role == "user" else [message]
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import re
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from core.utils.timezone import local_now, to_local
+
+Renderer = Callable[[Dict[str, Any]], str]
+
+# Outcomes counted by ``IntentRouter.record``.
+HIT = "hit"
+MISS = "miss"
+LOW_CONFIDENCE = "low_confidence"
+TOOL_ERROR = "tool_error"
+
+_QUESTION_RE = re.compile(r"[?？]|吗$|呢$|怎么|为什么|是否")
+_CN_NUMBERS = {"一": 1, "两": 2, "二": 2, "三": 3, "四": 4, "五": 5, "六": 6, "七": 7, "八": 8, "九": 9, "十": 10, "半": 0.5}
+_DONE_WORDS = ("完成", "做完", "搞定", "弄完", "写完", "结束了")
+_PROGRESS_WORDS = ("在做", "进行中", "推进中", "还在", "继续", "快了", "差不多")
+# A negator shortly before a keyword ("还没完成", "不想继续") or "不了" right
+# after it ("完成不了") turns the meaning around.
+_NEGATED_RE = re.compile(r"[没未不别][^，,。！!]?$")
+
+
+@dataclass(slots=True)
+class IntentMatch:
+    intent: str
+    tool: str
+    arguments: Dict[str, Any]
+    confidence: float
+    render: Renderer
+
+
+@dataclass(slots=True)
+class IntentStats:
+    seen: int = 0
+    counts: Dict[str, int] = field(default_factory=dict)
+    by_intent: Dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        hits = self.counts.get(HIT, 0)
+        return {
+            "seen": self.seen,
+            **self.counts,
+            "hit_rate": round(hits / self.seen, 3) if self.seen else 0.0,
+            "by_intent": dict(self.by_intent),
+        }
+
+
+class IntentRouter:
+    """Recognises a few rigidly phrased messages that need no LLM.
+
+    Each rule is a regular expression mapped to one ``AgentTool`` call and a
+    reply template. A match carries a confidence; the agent only takes the fast
+    path at or above ``threshold`` and otherwise hands the message to the LLM
+    unchanged. Outcomes are counted so the hit rate can be reported.
+    """
+
+    def __init__(self, threshold: float = 0.8, clock: Callable[[], datetime] = local_now):
+        self._threshold = threshold
+        self._clock = clock
+        self._stats = IntentStats()
+        self._lock = threading.Lock()
+
+    @property
+    def threshold(self) -> float:
+        return self._threshold
+
+    def match(self, text: str) -> Optional[IntentMatch]:
+        text = (text or "").strip()
+        if not text or text.startswith("/"):
+            return None
+        for rule in (self._log, self._rest, self._stop_tracker, self._tracker_reply):
+            found = rule(text)
+            if found is not None:
+                return found
+        return None
+
+    def record(self, outcome: str, intent: Optional[str] = None) -> None:
+        with self._lock:
+            self._stats.seen += 1
+            self._stats.counts[outcome] = self._stats.counts.get(outcome, 0) + 1
+            if outcome == HIT and intent:
+                self._stats.by_intent[intent] = self._stats.by_intent.get(intent, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return self._stats.to_dict()
+
+    # ----------------------------------------------------------------- rules
+    def _log(self, text: str) -> Optional[IntentMatch]:
+        found = re.match(r"^(?:记录|日志|记一下|log)\s*[:：]\s*(?P<body>.+)$", text, re.IGNORECASE | re.DOTALL)
+        if not found:
+            return None
+        body = found.group("body").strip()
+        confidence = 0.95 if len(body) >= 2 else 0.5
+        return IntentMatch(
+            "log", "record_log", {"text": body}, confidence, lambda result: result.get("message") or "日志已记录。"
+        )
+
+    def _rest(self, text: str) -> Optional[IntentMatch]:
+        found = re.match(
+            r"^(?:我)?(?:要|想|先|去)?休息\s*(?P<amount>\d+(?:\.\d+)?|[一两二三四五六七八九十半]+)\s*"
+            r"(?P<unit>分钟|分|min|mins|个?小时|h)$",
+            text,
+            re.IGNORECASE,
+        )
+        if not found:
+            return None
+        amount = _parse_amount(found.group("amount"))
+        if amount is None:
+            return None
+        minutes = amount * 60 if found.group("unit").lower() in {"小时", "个小时", "h"} else amount
+        start = to_local(self._clock())
+        end = start + timedelta(minutes=minutes)
+        # Very short or very long breaks are more likely a typo or a plan to discuss.
+        confidence = 0.9 if 5 <= minutes <= 240 else 0.4
+        return IntentMatch(
+            "rest",
+            "rest_propose",
+            {"start": start.isoformat(), "end": end.isoformat(), "session_type": "rest"},
+            confidence,
+            lambda _: f"已安排休息 {start:%H:%M}-{end:%H:%M}，到点提醒你回来。",
+        )
+
+    def _stop_tracker(self, text: str) -> Optional[IntentMatch]:
+        found = re.match(r"^(?:停止|取消|结束|别再)(?:跟踪|追踪)\s*(?P<name>.*)$", text)
+        if not found or _QUESTION_RE.search(text):
+            return None
+        name = found.group("name").strip()
+        arguments = {"task_name": name} if name else {}
+        return IntentMatch(
+            "stop_tracker",
+            "stop_tracker",
+            arguments,
+            0.9,
+            lambda result: f"已停止跟踪：{result.get('task_name') or name or '当前任务'}",
+        )
+
+    def _tracker_reply(self, text: str) -> Optional[IntentMatch]:
+        # Shape produced by TaskTracker.consume_reply for answers to a reminder.
+        found = re.match(r"^跟踪任务 (?P<task>.+?) 的进展反馈：(?P<reply>.+?)\n", text, re.DOTALL)
+        if not found:
+            return None
+        task, reply = found.group("task").strip(), found.group("reply").strip()
+        if _QUESTION_RE.search(reply) or len(reply) > 30:
+            # A question or a long update deserves an actual answer.
+            return IntentMatch("tracker_reply", "record_log", {}, 0.3, lambda _: "")
+        done = _keyword_hit(reply, _DONE_WORDS)
+        progress = _keyword_hit(reply, _PROGRESS_WORDS)
+        if done is None and progress is None:
+            return IntentMatch("tracker_reply", "record_log", {}, 0.5, lambda _: "")
+        if done is False or progress is False:
+            # Negated ("还没完成", "不想继续了"): let the LLM read it properly.
+            return IntentMatch("tracker_reply", "record_log", {}, 0.4, lambda _: "")
+        confidence, verdict = (0.85, "完成") if done else (0.85, "推进中")
+        return IntentMatch(
+            "tracker_reply",
+            "record_log",
+            {"task_name": task, "note": reply},
+            confidence,
+            lambda _: f"已记录「{task}」进展（{verdict}）：{reply}",
+        )
+
+
+def _keyword_hit(text: str, words: Tuple[str, ...]) -> Optional[bool]:
+    """True if a keyword occurs plainly, False if only negated, None if absent."""
+    found = None
+    for word in words:
+        start = text.find(word)
+        while start != -1:
+            end = start + len(word)
+            if _NEGATED_RE.search(text[max(0, start - 2):start]) or text.startswith("不", end):
+                found = False
+            else:
+                return True
+            start = text.find(word, end)
+    return found
+
+
+def _parse_amount(raw: str) -> Optional[float]:
+    try:
+        return float(raw)
+    except ValueError:
+        pass
+    if raw == "半":
+        return 0.5
+    if raw.endswith("半"):
+        base = _parse_amount(raw[:-1])
+        return base + 0.5 if base is not None else None
+    if raw.startswith("十"):
+        return 10 + _CN_NUMBERS.get(raw[1:], 0) if len(raw) <= 2 else None
+    if len(raw) == 2 and raw[1] == "十":
+        return _CN_NUMBERS.get(raw[0], 0) * 10 or None
+    if len(raw) == 3 and raw[1] == "十":
+        tens = _CN_NUMBERS.get(raw[0])
+        ones = _CN_NUMBERS.get(raw[2])
+        return tens * 10 + ones if tens and ones else None
+    value = _CN_NUMBERS.get(raw)
+    return float(value) if value is not None else None
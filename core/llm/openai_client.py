@@ -2,12 +2,18 @@ from __future__ import annotations
 
 import json
 import logging
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, TypeVar
 
 from openai import OpenAI
 
+from core.llm.resilience import CallStats, CircuitBreaker, CircuitOpenError
+
 logger = logging.getLogger(__name__)
+_T = TypeVar("_T")
 
 
 @dataclass
@@ -24,17 +30,195 @@ class ChatResponse:
     usage: Dict[str, Any]
 
 
+@dataclass
+class ToolCallDelta:
+    index: int
+    call_id: str | None = None
+    name: str | None = None
+    arguments: str = ""
+
+
+@dataclass
+class ChatDelta:
+    """One streamed chunk: a content fragment and/or tool-call fragments.
+
+    The last delta of a stream carries the assembled ``response``.
+    """
+
+    content: str | None = None
+    tool_calls: List[ToolCallDelta] = field(default_factory=list)
+    response: ChatResponse | None = None
+
+
+def _usage_dict(usage: Any) -> Dict[str, Any]:
+    """Token counts of a completion, including prompt-cache hits when reported.
+
+    OpenAI reports hits as ``prompt_tokens_details.cached_tokens``; DeepSeek as
+    ``prompt_cache_hit_tokens``.
+    """
+    result = {
+        "prompt_tokens": usage.prompt_tokens,
+        "completion_tokens": usage.completion_tokens,
+        "total_tokens": usage.total_tokens,
+    }
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", None)
+    if cached is None:
+        cached = getattr(usage, "prompt_cache_hit_tokens", None)
+    if cached is not None:
+        result["cached_tokens"] = cached
+    return result
+
+
+def _completion_response(response: Any) -> ChatResponse:
+    choice = response.choices[0].message
+    logger.debug("LLM 输出 content=%s", choice.content)
+    tool_calls = [
+        ToolCall(
+            name=call.function.name,
+            arguments=call.function.arguments,
+            call_id=getattr(call, "id", None),
+        )
+        for call in choice.tool_calls or []
+    ]
+    return ChatResponse(
+        content=choice.content,
+        tool_calls=tool_calls,
+        usage=_usage_dict(response.usage),
+    )
+
+
+def _chunk_delta(chunk: Any) -> Optional[ChatDelta]:
+    """Content/tool-call fragments of one stream chunk, or None if it has none."""
+    if not chunk.choices:
+        return None
+    raw = chunk.choices[0].delta
+    delta = ChatDelta(content=getattr(raw, "content", None))
+    for call in getattr(raw, "tool_calls", None) or []:
+        function = getattr(call, "function", None)
+        delta.tool_calls.append(
+            ToolCallDelta(
+                index=call.index,
+                call_id=getattr(call, "id", None),
+                name=getattr(function, "name", None),
+                arguments=getattr(function, "arguments", None) or "",
+            )
+        )
+    return delta if delta.content or delta.tool_calls else None
+
+
+class _StreamAccumulator:
+    def __init__(self) -> None:
+        self.content: List[str] = []
+        self.calls: Dict[int, Dict[str, Any]] = {}
+        self.usage: Dict[str, Any] = {}
+
+    def add(self, delta: ChatDelta) -> None:
+        if delta.content:
+            self.content.append(delta.content)
+        for call in delta.tool_calls:
+            slot = self.calls.setdefault(call.index, {"id": None, "name": "", "arguments": []})
+            if call.call_id:
+                slot["id"] = call.call_id
+            if call.name:
+                slot["name"] += call.name
+            if call.arguments:
+                slot["arguments"].append(call.arguments)
+
+    def build(self) -> ChatResponse:
+        tool_calls = [
+            ToolCall(name=slot["name"], arguments="".join(slot["arguments"]), call_id=slot["id"])
+            for _, slot in sorted(self.calls.items())
+        ]
+        return ChatResponse(
+            content="".join(self.content) or None,
+            tool_calls=tool_calls,
+            usage=self.usage,
+        )
+
+
+@dataclass
+class _Endpoint:
+    name: str
+    client: Any
+    model: str
+    provider: str
+    breaker: CircuitBreaker
+    stats: CallStats = field(default_factory=CallStats)
+
+
 class OpenAIChatClient:
+    """Chat Completions client with deadlines, circuit breakers and fallbacks.
+
+    ``fallbacks`` are extra endpoints (objects with ``provider``, ``base_url``,
+    ``model`` and ``api_key``) tried in order when the primary fails or its
+    breaker is open. With ``hedge_after_seconds`` a non-streaming call that has
+    not answered by then is also sent to the first fallback, and the first
+    success wins. Each hedged call holds up to two pool threads, so the pool
+    is sized for ``max_concurrent_calls`` turns at once. When every breaker is
+    open ``CircuitOpenError`` is raised without touching the network.
+    """
+
     def __init__(
         self,
         api_key: str,
         base_url: str,
         model: str,
         provider: str = "openai",
+        timeout_seconds: float = 30.0,
+        stream_deadline_seconds: float = 120.0,
+        max_retries: int = 1,
+        fallbacks: Sequence[Any] = (),
+        hedge_after_seconds: float | None = None,
+        max_concurrent_calls: int = 1,
+        breaker_failures: int = 3,
+        breaker_reset_seconds: float = 60.0,
+        client: Any = None,
     ):
-        self._client = OpenAI(api_key=api_key, base_url=base_url or None)
-        self._model = model
-        self._provider = provider
+        def _endpoint(name: str, key: str, url: str, model_name: str, provider_name: str, sdk: Any = None) -> _Endpoint:
+            return _Endpoint(
+                name=name,
+                client=sdk
+                or OpenAI(
+                    api_key=key,
+                    base_url=url or None,
+                    timeout=timeout_seconds,
+                    max_retries=max_retries,
+                ),
+                model=model_name,
+                provider=provider_name,
+                breaker=CircuitBreaker(breaker_failures, breaker_reset_seconds),
+            )
+
+        self._endpoints: List[_Endpoint] = [
+            _endpoint(f"{provider}:{model}", api_key, base_url, model, provider, client)
+        ]
+        for fallback in fallbacks:
+            self._endpoints.append(
+                _endpoint(
+                    f"{fallback.provider}:{fallback.model}",
+                    fallback.api_key,
+                    fallback.base_url,
+                    fallback.model,
+                    fallback.provider,
+                )
+            )
+        self._stream_deadline = stream_deadline_seconds
+        self._hedge_after = hedge_after_seconds if hedge_after_seconds and len(self._endpoints) > 1 else None
+        self._hedge_pool = (
+            ThreadPoolExecutor(max_workers=2 * max(1, max_concurrent_calls), thread_name_prefix="llm-hedge")
+            if self._hedge_after
+            else None
+        )
+        self._stats_lock = threading.Lock()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Latency/error counters and breaker state per endpoint."""
+        with self._stats_lock:
+            return {
+                endpoint.name: {**endpoint.stats.to_dict(), "circuit": endpoint.breaker.state}
+                for endpoint in self._endpoints
+            }
 
     def chat(
         self,
@@ -44,7 +228,7 @@ class OpenAIChatClient:
     ) -> ChatResponse:
         logger.info(
             "调用 OpenAI ChatCompletions，模型=%s，messages=%d，tools=%d",
-            self._model,
+            self._endpoints[0].model,
             len(messages),
             len(tools or []),
         )
@@ -53,34 +237,154 @@ class OpenAIChatClient:
             content = message.get("content", "")
             if role != "tool":
                 logger.debug("Message %d - Role: %s, Content: %s", i, role, content)
-        try:
-            response = self._client.chat.completions.create(
-                model=self._model,
+
+        def _complete(endpoint: _Endpoint) -> ChatResponse:
+            response = endpoint.client.chat.completions.create(
+                model=endpoint.model,
+                messages=messages,
+                tools=tools,
+                temperature=temperature,
+            )
+            return _completion_response(response)
+
+        candidates = self._available()
+        if self._hedge_pool is not None and len(candidates) > 1:
+            return self._hedged(candidates, _complete)
+        last_error: Exception | None = None
+        for endpoint in candidates:
+            try:
+                return self._attempt(endpoint, _complete)
+            except Exception as exc:
+                last_error = exc
+                logger.warning("LLM 端点 %s 调用失败: %s", endpoint.name, exc)
+        assert last_error is not None
+        raise last_error
+
+    def chat_stream(
+        self,
+        messages: List[Dict[str, Any]],
+        tools: Optional[List[Dict[str, Any]]] = None,
+        temperature: float = 0.3,
+    ) -> Iterator[ChatDelta]:
+        """Stream a completion as ``ChatDelta`` items.
+
+        Content and tool-call fragments are yielded as they arrive; the final
+        item has ``response`` set to the same ``ChatResponse`` ``chat`` returns.
+        Endpoints are only switched before the first fragment was yielded.
+        """
+        logger.info(
+            "流式调用 OpenAI ChatCompletions，模型=%s，messages=%d，tools=%d",
+            self._endpoints[0].model,
+            len(messages),
+            len(tools or []),
+        )
+
+        def _open(endpoint: _Endpoint):
+            options: Dict[str, Any] = {}
+            if endpoint.provider == "openai":
+                options["stream_options"] = {"include_usage": True}
+            return endpoint.client.chat.completions.create(
+                model=endpoint.model,
                 messages=messages,
                 tools=tools,
                 temperature=temperature,
+                stream=True,
+                **options,
             )
+
+        last_error: Exception | None = None
+        for endpoint in self._available():
+            started = time.monotonic()
+            try:
+                stream = _open(endpoint)
+            except Exception as exc:
+                self._record(endpoint, started, exc)
+                last_error = exc
+                logger.warning("LLM 端点 %s 流式调用失败: %s", endpoint.name, exc)
+                continue
+            try:
+                response = yield from self._consume(stream, started)
+            except Exception as exc:
+                self._record(endpoint, started, exc)
+                logger.exception("LLM 流式响应中断: %s", exc)
+                raise
+            self._record(endpoint, started)
+            logger.debug("LLM 流式输出 content=%s", response.content)
+            yield ChatDelta(response=response)
+            return
+        assert last_error is not None
+        raise last_error
+
+    def _consume(self, stream: Any, started: float):
+        accumulator = _StreamAccumulator()
+        for chunk in stream:
+            if time.monotonic() - started > self._stream_deadline:
+                close = getattr(stream, "close", None)
+                if callable(close):
+                    close()
+                raise TimeoutError(f"LLM 流式响应超过 {self._stream_deadline:.0f} 秒")
+            usage = getattr(chunk, "usage", None)
+            if usage is not None:
+                accumulator.usage = _usage_dict(usage)
+            delta = _chunk_delta(chunk)
+            if delta is not None:
+                accumulator.add(delta)
+                yield delta
+        return accumulator.build()
+
+    # ------------------------------------------------------------ resilience
+    def _available(self) -> List[_Endpoint]:
+        candidates = []
+        for endpoint in self._endpoints:
+            if endpoint.breaker.allow():
+                candidates.append(endpoint)
+            else:
+                with self._stats_lock:
+                    endpoint.stats.short_circuited += 1
+        if not candidates:
+            raise CircuitOpenError("所有 LLM 端点均处于熔断状态")
+        return candidates
+
+    def _attempt(self, endpoint: _Endpoint, call: Callable[[_Endpoint], _T]) -> _T:
+        started = time.monotonic()
+        try:
+            result = call(endpoint)
         except Exception as exc:
-            logger.exception("LLM 调用失败: %s", exc)
+            self._record(endpoint, started, exc)
             raise
-        choice = response.choices[0].message
-        logger.debug("LLM 输出 content=%s", choice.content)
-        tool_calls = []
-        for call in choice.tool_calls or []:
-            tool_calls.append(
-                ToolCall(
-                    name=call.function.name,
-                    arguments=call.function.arguments,
-                    call_id=getattr(call, "id", None),
-                )
-            )
-        usage = {
-            "prompt_tokens": response.usage.prompt_tokens,
-            "completion_tokens": response.usage.completion_tokens,
-            "total_tokens": response.usage.total_tokens,
-        }
-        return ChatResponse(
-            content=choice.content,
-            tool_calls=tool_calls,
-            usage=usage,
-        )
+        self._record(endpoint, started)
+        return result
+
+    def _record(self, endpoint: _Endpoint, started: float, error: Exception | None = None) -> None:
+        elapsed_ms = (time.monotonic() - started) * 1000
+        with self._stats_lock:
+            endpoint.stats.record(elapsed_ms, error)
+        if error is None:
+            endpoint.breaker.record_success()
+        else:
+            endpoint.breaker.record_failure()
+
+    def _hedged(self, candidates: List[_Endpoint], call: Callable[[_Endpoint], _T]) -> _T:
+        primary, backup, *rest = candidates
+        first = self._hedge_pool.submit(self._attempt, primary, call)
+        pending = {first}
+        done, _ = wait(pending, timeout=self._hedge_after)
+        if done:
+            rest.insert(0, backup)
+        else:
+            logger.info("LLM 端点 %s 超过 %.1fs 未响应，对冲请求 %s", primary.name, self._hedge_after, backup.name)
+            pending.add(self._hedge_pool.submit(self._attempt, backup, call))
+        last_error: BaseException | None = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                last_error = future.exception()
+        for endpoint in rest:
+            try:
+                return self._attempt(endpoint, call)
+            except Exception as exc:
+                last_error = exc
+        assert last_error is not None
+        raise last_error
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from core.llm.tokens import estimate_json_tokens, truncate_to_tokens
+from core.services.task_summary_service import PRIORITY_ORDER
+from core.utils.timezone import local_now, parse_due, to_local
+
+STUB_FIELDS = ("id", "name", "priority", "status", "due_date", "project", "url")
+DUE_SOON = timedelta(hours=24)
+
+
+@dataclass(slots=True)
+class ElisionReport:
+    """What a budgeted payload left out, so the model can ask for it."""
+
+    omitted: List[str] = field(default_factory=list)
+    compacted: List[str] = field(default_factory=list)
+    truncated: List[str] = field(default_factory=list)
+    logs_dropped: int = 0
+
+    def to_dict(self, hint: str) -> Optional[Dict[str, Any]]:
+        if not (self.omitted or self.compacted or self.truncated or self.logs_dropped):
+            return None
+        report: Dict[str, Any] = {"hint": hint}
+        if self.omitted:
+            report["omitted_ids"] = self.omitted
+        if self.compacted:
+            report["compacted_ids"] = self.compacted
+        if self.truncated:
+            report["truncated_ids"] = self.truncated
+        if self.logs_dropped:
+            report["logs_dropped"] = self.logs_dropped
+        return report
+
+
+def _urgency_key(payload: Dict[str, Any], now: datetime) -> Tuple[int, int, str]:
+    due = parse_due(payload.get("due_date"))
+    bucket = 2
+    if due is not None and due <= now + DUE_SOON:
+        bucket = 0 if due <= now else 1
+    return (
+        bucket,
+        PRIORITY_ORDER.get(payload.get("priority"), 99),
+        payload.get("due_date") or "9999-99-99",
+    )
+
+
+def _fit(
+    candidates: Iterable[Tuple[str, Dict[str, Any], Optional[Dict[str, Any]]]],
+    max_tokens: int,
+    report: ElisionReport,
+) -> List[Dict[str, Any]]:
+    """Greedy fill: full item if it fits, else its stub, else omit."""
+    kept: List[Dict[str, Any]] = []
+    used = 2  # the surrounding list brackets
+    for item_id, full, stub in candidates:
+        cost = estimate_json_tokens(full) + 1
+        if used + cost <= max_tokens:
+            kept.append(full)
+            used += cost
+            continue
+        if stub is not None:
+            stub_cost = estimate_json_tokens(stub) + 1
+            if used + stub_cost <= max_tokens:
+                kept.append(stub)
+                used += stub_cost
+                report.compacted.append(item_id)
+                continue
+        report.omitted.append(item_id)
+    return kept
+
+
+def budget_task_payloads(
+    payloads: Sequence[Dict[str, Any]],
+    max_tokens: int,
+    *,
+    max_logs: int = 3,
+    content_tokens: int = 160,
+    log_tokens: int = 80,
+    prioritize: bool = True,
+    now: Optional[datetime] = None,
+) -> Tuple[List[Dict[str, Any]], ElisionReport]:
+    """Fit task payloads into ``max_tokens``.
+
+    With ``prioritize`` overdue and due-soon tasks go first, then priority and
+    due date; otherwise the input order (e.g. search relevance) is kept. Each task
+    keeps its ``max_logs`` latest logs and a shortened body; when even that does
+    not fit it is reduced to its header fields, and finally dropped. Input dicts
+    are never modified.
+    """
+    now = to_local(now) if now else local_now()
+    report = ElisionReport()
+    ordered = (
+        sorted(payloads, key=lambda payload: _urgency_key(payload, now))
+        if prioritize
+        else payloads
+    )
+    candidates = []
+    for payload in ordered:
+        item = dict(payload)
+        content = item.get("content") or ""
+        shortened = truncate_to_tokens(content, content_tokens)
+        if shortened != content:
+            item["content"] = shortened
+            report.truncated.append(item["id"])
+        logs = list(item.get("logs") or [])
+        if len(logs) > max_logs:
+            report.logs_dropped += len(logs) - max_logs
+            logs = logs[-max_logs:] if max_logs > 0 else []
+        item["logs"] = [_shorten_log(log, log_tokens) for log in logs]
+        stub = {key: item.get(key) for key in STUB_FIELDS if key in item}
+        candidates.append((item["id"], item, stub))
+    return _fit(candidates, max_tokens, report), report
+
+
+def budget_log_payloads(
+    logs: Sequence[Dict[str, Any]],
+    max_tokens: int,
+    *,
+    content_tokens: int = 120,
+) -> Tuple[List[Dict[str, Any]], ElisionReport]:
+    """Fit chronologically ordered log payloads, keeping the newest ones."""
+    report = ElisionReport()
+    candidates = []
+    for log in reversed(logs):
+        item = _shorten_log(log, content_tokens)
+        if item is not log:
+            report.truncated.append(item["id"])
+        candidates.append((item["id"], item, None))
+    kept = _fit(candidates, max_tokens, report)
+    kept.reverse()
+    return kept, report
+
+
+def _shorten_log(log: Dict[str, Any], max_tokens: int) -> Dict[str, Any]:
+    content = log.get("content") or ""
+    shortened = truncate_to_tokens(content, max_tokens)
+    if shortened == content:
+        return log
+    return {**log, "content": shortened}
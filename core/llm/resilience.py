@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when every configured LLM endpoint is short-circuited."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker.
+
+    After ``failure_threshold`` failures in a row the circuit opens and calls
+    are refused for ``reset_seconds``. It then half-opens: calls go through
+    again, one success closes it and one more failure re-opens it.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        reset_seconds: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._threshold = max(1, failure_threshold)
+        self._reset_seconds = reset_seconds
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state_locked()
+
+    def _state_locked(self) -> str:
+        if self._opened_at is None:
+            return CLOSED
+        if self._clock() - self._opened_at >= self._reset_seconds:
+            return HALF_OPEN
+        return OPEN
+
+    def allow(self) -> bool:
+        with self._lock:
+            return self._state_locked() != OPEN
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self._threshold:
+                self._opened_at = self._clock()
+
+
+@dataclass(slots=True)
+class CallStats:
+    calls: int = 0
+    errors: int = 0
+    timeouts: int = 0
+    short_circuited: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    last_error: Optional[str] = None
+
+    def record(self, elapsed_ms: float, error: Optional[BaseException] = None) -> None:
+        self.calls += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        if error is not None:
+            self.errors += 1
+            self.last_error = f"{type(error).__name__}: {error}"
+            if is_timeout(error):
+                self.timeouts += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "short_circuited": self.short_circuited,
+            "avg_ms": round(self.total_ms / self.calls, 1) if self.calls else 0.0,
+            "max_ms": round(self.max_ms, 1),
+            "last_error": self.last_error,
+        }
+
+
+def is_timeout(error: BaseException) -> bool:
+    # openai.APITimeoutError and httpx timeouts both carry "Timeout" in the name.
+    return isinstance(error, TimeoutError) or "Timeout" in type(error).__name__
@@ -1,15 +1,62 @@
 from __future__ import annotations
 
+import atexit
+import gzip
 import json
-from datetime import datetime, timezone
+import logging
+import queue
+import random
+import shutil
+import threading
+from datetime import date, datetime, timezone
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
 
 
 class AgentRunLogger:
-    def __init__(self, root_dir: Path):
+    """Writes one JSON line per agent turn to ``<root>/<chat_id>.jsonl``.
+
+    ``log`` only enqueues the record; a daemon thread writes batches every
+    ``flush_interval`` seconds (or ``batch_size`` records). When the queue is
+    full records are dropped and counted rather than blocking the caller.
+    A chat file is rotated once it exceeds ``max_bytes`` or on the first write
+    of a new day; rotated segments are gzip-compressed and only the newest
+    ``backup_count`` are kept.
+
+    With ``redact`` every string longer than ``payload_chars`` (replies, tool
+    results, errors) is shortened, except in a ``sample_rate`` fraction of
+    records which are kept whole.
+    """
+
+    def __init__(
+        self,
+        root_dir: Path,
+        max_bytes: int = 5 * 1024 * 1024,
+        backup_count: int = 5,
+        queue_size: int = 1000,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        redact: bool = False,
+        sample_rate: float = 0.0,
+        payload_chars: int = 500,
+    ):
         self._root = root_dir
         self._root.mkdir(parents=True, exist_ok=True)
+        self._max_bytes = max_bytes
+        self._backup_count = backup_count
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._redact = redact
+        self._sample_rate = sample_rate
+        self._payload_chars = payload_chars
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self.dropped = 0
 
     def log(self, chat_id: int, payload: Dict[str, Any]) -> None:
         record = {
@@ -17,6 +64,97 @@ class AgentRunLogger:
             "chat_id": chat_id,
             **payload,
         }
-        path = self._root / f"{chat_id}.jsonl"
-        with open(path, "a", encoding="utf-8") as file:
-            file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        if self._redact and random.random() >= self._sample_rate:
+            record = _shorten(record, self._payload_chars)
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((chat_id, record))
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self) -> None:
+        """Block until everything logged so far is on disk."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self) -> None:
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout=5)
+
+    # ---------------------------------------------------------------- writer
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                thread = threading.Thread(target=self._run, name="agent-run-logger", daemon=True)
+                thread.start()
+                self._thread = thread
+                atexit.register(self.close)
+
+    def _run(self) -> None:
+        while True:
+            batch: List[Tuple[int, Dict[str, Any]]] = []
+            stop = False
+            try:
+                item = self._queue.get(timeout=self._flush_interval)
+            except queue.Empty:
+                continue
+            while True:
+                if item is _STOP:
+                    stop = True
+                else:
+                    batch.append(item)
+                if len(batch) >= self._batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+            except Exception:
+                logger.exception("Agent 运行日志写入失败")
+            finally:
+                for _ in range(len(batch) + int(stop)):
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _write(self, batch: List[Tuple[int, Dict[str, Any]]]) -> None:
+        grouped: Dict[int, List[str]] = {}
+        for chat_id, record in batch:
+            grouped.setdefault(chat_id, []).append(json.dumps(record, ensure_ascii=False, default=str))
+        for chat_id, lines in grouped.items():
+            path = self._root / f"{chat_id}.jsonl"
+            self._maybe_rotate(chat_id, path)
+            with open(path, "a", encoding="utf-8") as file:
+                file.write("\n".join(lines) + "\n")
+
+    def _maybe_rotate(self, chat_id: int, path: Path) -> None:
+        if not path.exists():
+            return
+        stat = path.stat()
+        if stat.st_size < self._max_bytes and date.fromtimestamp(stat.st_mtime) == date.today():
+            return
+        stamp = datetime.fromtimestamp(stat.st_mtime).strftime("%Y%m%d%H%M%S")
+        target = self._root / f"{chat_id}.{stamp}.jsonl.gz"
+        with open(path, "rb") as source, gzip.open(target, "wb") as compressed:
+            shutil.copyfileobj(source, compressed)
+        path.unlink()
+        segments = sorted(self._root.glob(f"{chat_id}.*.jsonl.gz"))
+        for old in segments[: max(0, len(segments) - self._backup_count)]:
+            old.unlink()
+
+
+def _shorten(value: Any, limit: int) -> Any:
+    if isinstance(value, str) and len(value) > limit:
+        return f"{value[:limit]}…(+{len(value) - limit})"
+    if isinstance(value, dict):
+        return {key: _shorten(item, limit) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_shorten(item, limit) for item in value]
+    return value
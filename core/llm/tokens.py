@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import json
+import re
+from functools import lru_cache
+from typing import Any, Optional
+
+try:  # pragma: no cover - optional dependency
+    import tiktoken
+except ImportError:  # pragma: no cover
+    tiktoken = None  # type: ignore[assignment]
+
+_CJK_RE = re.compile(r"[\u3000-\u303f\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff00-\uffef]")
+_WORD_RE = re.compile(r"[A-Za-z0-9_]+")
+# Rough calibration for the cl100k/o200k vocabularies: one CJK character is
+# about one token, a Latin word about 1.3, other symbols about one each.
+_WORD_FACTOR = 1.3
+
+
+@lru_cache(maxsize=1)
+def _encoding() -> Optional[Any]:
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:  # pragma: no cover - offline / unknown encoding
+        return None
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Token count of ``text``; exact with tiktoken, calibrated estimate without."""
+    if not text:
+        return 0
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    cjk = len(_CJK_RE.findall(text))
+    words = _WORD_RE.findall(text)
+    word_chars = sum(len(word) for word in words)
+    symbols = len(text) - cjk - word_chars - text.count(" ")
+    return cjk + int(len(words) * _WORD_FACTOR + 0.5) + max(0, symbols)
+
+
+def estimate_json_tokens(payload: Any) -> int:
+    return estimate_tokens(json.dumps(payload, ensure_ascii=False, default=str))
+
+
+def truncate_to_tokens(text: Optional[str], max_tokens: int) -> str:
+    """Cut ``text`` to roughly ``max_tokens``, preferring line/sentence bounds."""
+    if not text or estimate_tokens(text) <= max_tokens:
+        return text or ""
+    pieces = [piece for piece in re.split(r"(?<=[\n。！？!?；;])", text) if piece]
+    kept = []
+    used = 0
+    for piece in pieces:
+        cost = estimate_tokens(piece)
+        if used + cost > max_tokens:
+            break
+        kept.append(piece)
+        used += cost
+    if not kept:
+        # A single long sentence: fall back to a proportional character cut.
+        ratio = max_tokens / max(1, estimate_tokens(text))
+        return text[: max(1, int(len(text) * ratio))].rstrip() + "…"
+    return "".join(kept).rstrip() + "…"
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import re
+import threading
+from collections import deque
+from typing import Deque, Dict, FrozenSet, Iterable, List, Mapping, Sequence, Tuple
+
+from core.llm.tools import AgentTool
+
+# Groups a free-text turn only gets when the message mentions them (or the
+# chat used them recently); every other group is always offered to users.
+OPT_IN_KEYWORDS: Mapping[str, str] = {
+    "sync": r"同步|刷新|notion|更新数据|最新数据|拉取|sync",
+}
+
+# Turns the bot generates itself, where the needed groups are known. Shapes
+# follow the prompts of CommandRouter._handle_proactive_event and
+# TaskTracker.consume_reply.
+EVENT_GROUPS: Sequence[Tuple[str, FrozenSet[str]]] = (
+    (r"^系统提醒：用户的.+?未更新", frozenset({"tasks", "state"})),
+    (r"^系统提醒：之前向用户提出的问题", frozenset({"tasks", "logs", "state"})),
+    (r"^跟踪任务 .+? 的进展反馈：", frozenset({"tasks", "logs", "tracking"})),
+)
+
+
+class ToolSelector:
+    """Chooses which tool groups to expose to the model for one turn.
+
+    Messages typed by the user get every group except the opt-in ones in
+    ``opt_in``, which are added only when the message mentions them. Prompts
+    matching one of ``events`` (proactive prompts, tracker replies) are
+    narrowed to that event's groups. Groups the chat used in its last
+    ``recent_turns`` turns are always added. Schema lists are cached per
+    group combination and keep the original tool order, so a repeated
+    combination produces a byte-identical tools block.
+    """
+
+    def __init__(
+        self,
+        tools: Sequence[AgentTool],
+        opt_in: Mapping[str, str] = OPT_IN_KEYWORDS,
+        events: Sequence[Tuple[str, FrozenSet[str]]] = EVENT_GROUPS,
+        recent_turns: int = 3,
+    ):
+        self._tools = list(tools)
+        self._groups = {tool.name: tool.group for tool in self._tools}
+        self._opt_in = {group: re.compile(pattern, re.IGNORECASE) for group, pattern in opt_in.items()}
+        self._events = [(re.compile(pattern), groups) for pattern, groups in events]
+        self._recent_turns = recent_turns
+        self._recent: Dict[int, Deque[FrozenSet[str]]] = {}
+        self._schemas: Dict[FrozenSet[str], Tuple[List[dict], FrozenSet[str]]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def all_groups(self) -> FrozenSet[str]:
+        return frozenset(self._groups.values())
+
+    def select(self, chat_id: int, text: str) -> FrozenSet[str]:
+        text = text or ""
+        event = next((groups for pattern, groups in self._events if pattern.search(text)), None)
+        if event is not None:
+            groups = set(event)
+        else:
+            groups = set(self.all_groups - self._opt_in.keys())
+            groups.update(group for group, pattern in self._opt_in.items() if pattern.search(text))
+        with self._lock:
+            for used in self._recent.get(chat_id, ()):
+                groups |= used
+        return frozenset(groups & self.all_groups)
+
+    def schemas(self, groups: FrozenSet[str]) -> Tuple[List[dict], FrozenSet[str]]:
+        """Tool schemas for ``groups`` and the names of the tools included."""
+        with self._lock:
+            cached = self._schemas.get(groups)
+            if cached is None:
+                chosen = [tool for tool in self._tools if tool.group in groups]
+                cached = (
+                    [tool.to_openai_schema() for tool in chosen],
+                    frozenset(tool.name for tool in chosen),
+                )
+                self._schemas[groups] = cached
+            return cached
+
+    def record_usage(self, chat_id: int, tool_names: Iterable[str]) -> None:
+        used = frozenset(self._groups[name] for name in tool_names if name in self._groups)
+        with self._lock:
+            recent = self._recent.setdefault(chat_id, deque(maxlen=self._recent_turns))
+            recent.append(used)
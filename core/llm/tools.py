@@ -11,8 +11,11 @@ from apps.telegram_bot.rest import RestScheduleService, RestWindow
 from core.utils.timezone import format_beijing, to_beijing
 from apps.telegram_bot.tracker import TaskTracker
 from apps.telegram_bot.user_state import UserStateService
+from core.domain import notion_page_url
+from core.llm.payload_budget import budget_log_payloads, budget_task_payloads
+from core.llm.tokens import estimate_tokens, truncate_to_tokens
 from core.repositories import LogRepository, TaskRepository
-from core.services import LogbookService, StatusGuard, TaskSummaryService
+from core.services import LogbookService, StatusGuard, TaskSearchIndex, TaskSummaryService
 
 Executor = Callable[[Dict[str, Any], int], Dict[str, Any]]
 
@@ -23,6 +26,11 @@ class AgentTool:
     description: str
     parameters: Dict[str, Any]
     executor: Executor
+    # Read-only tools may run concurrently with each other; mutating tools
+    # (the default) always run alone, in the order the model requested them.
+    read_only: bool = False
+    # Capability group used by ToolSelector to decide which schemas to send.
+    group: str = "tasks"
 
     def to_openai_schema(self) -> Dict[str, Any]:
         return {
@@ -57,14 +65,26 @@ def build_default_tools(
     rest_service: RestScheduleService | None = None,
     session_monitor: Any | None = None,
     notion_sync_service: Any | None = None,
+    search_index: TaskSearchIndex | None = None,
+    payload_token_budget: int = 3000,
 ) -> List[AgentTool]:
+    elided_task_hint = "被省略或截断的任务可用 search_task 或 list_logs(task_id=...) 查看完整内容"
+
     def _split_queries(raw: str) -> List[str]:
         normalized = raw.replace("任务", " ")
         for sep in ["和", "、", ",", "，", ";", "；", "\n"]:
             normalized = normalized.replace(sep, " ")
         return [part.strip().lower() for part in normalized.split() if part.strip()]
 
-    def _search_payloads(query: str) -> List[Dict[str, Any]]:
+    def _search_payloads(query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        if search_index is not None:
+            results: List[Dict[str, Any]] = []
+            for hit in search_index.search(query, limit=limit):
+                payload = task_service.get_task_payload(hit.task_id)
+                if payload is not None:
+                    results.append({**payload, "score": hit.score, "matches": hit.snippets})
+            return results
+
         tokens = _split_queries(query)
         if not tokens:
             return []
@@ -91,7 +111,7 @@ def build_default_tools(
             if score > 0:
                 scored.append((score, payload))
         scored.sort(key=lambda item: item[0], reverse=True)
-        return [payload for _, payload in scored[:5]]
+        return [payload for _, payload in scored[:limit]]
 
     task_extract_pattern = re.compile(r"任务\s*([^：:]+)\s*[：:]\s*(.+)")
 
@@ -158,10 +178,18 @@ def build_default_tools(
         return None
 
     def summarize_executor(_: Dict[str, Any], __: int) -> Dict[str, Any]:
-        return {
-            "summary": task_service.build_today_summary(),
-            "tasks": task_service.build_task_payloads(),
-        }
+        summary = truncate_to_tokens(
+            task_service.build_today_summary(), payload_token_budget // 4
+        )
+        tasks, report = budget_task_payloads(
+            task_service.build_task_payloads(),
+            payload_token_budget - estimate_tokens(summary),
+        )
+        result: Dict[str, Any] = {"summary": summary, "tasks": tasks}
+        elided = report.to_dict(elided_task_hint)
+        if elided:
+            result["elided"] = elided
+        return result
 
     def refresh_notion_executor(args: Dict[str, Any], __: int) -> Dict[str, Any]:
         if not notion_sync_service:
@@ -232,7 +260,22 @@ def build_default_tools(
         query = (args.get("query") or "").strip()
         if not query:
             return {"results": []}
-        return {"results": _search_payloads(query)}
+        try:
+            limit = int(args.get("limit", 5))
+        except (TypeError, ValueError):
+            limit = 5
+        limit = max(1, min(10, limit))
+        results, report = budget_task_payloads(
+            _search_payloads(query, limit),
+            payload_token_budget,
+            max_logs=2,
+            prioritize=False,
+        )
+        result: Dict[str, Any] = {"results": results}
+        elided = report.to_dict(elided_task_hint)
+        if elided:
+            result["elided"] = elided
+        return result
 
     def logs_executor(args: Dict[str, Any], __: int) -> Dict[str, Any]:
         if not log_repository:
@@ -242,9 +285,16 @@ def build_default_tools(
         except (TypeError, ValueError):
             limit = 5
         limit = max(1, min(20, limit))
-        entries = log_repository.list_logs()
+        view = log_repository.query_logs(
+            limit=limit,
+            task_id=(args.get("task_id") or "").strip() or None,
+            status=(args.get("status") or "").strip() or None,
+            contains=(args.get("contains") or "").strip() or None,
+            since=_parse_datetime_arg(args.get("since")),
+            until=_parse_datetime_arg(args.get("until")),
+        )
         payload = []
-        for entry in entries[-limit:]:
+        for entry in reversed(view.to_list()):
             payload.append(
                 {
                     "id": entry.id,
@@ -253,10 +303,15 @@ def build_default_tools(
                     "content": entry.content,
                     "task_id": entry.task_id,
                     "task_name": entry.task_name,
-                    "task_url": entry.task_id and f"https://www.notion.so/{entry.task_id.replace('-', '')}",
+                    "task_url": entry.task_id and notion_page_url(entry.task_id),
                 }
             )
-        return {"logs": payload}
+        logs, report = budget_log_payloads(payload, payload_token_budget)
+        result: Dict[str, Any] = {"logs": logs}
+        elided = report.to_dict("被省略或截断的日志可缩小时间范围或按 task_id 过滤后再查")
+        if elided:
+            result["elided"] = elided
+        return result
 
     def update_log_executor(args: Dict[str, Any], __: int) -> Dict[str, Any]:
         log_id = args.get("log_id")
@@ -457,6 +512,7 @@ def build_default_tools(
             description="读取任务与日志数据，返回今日关键任务（按优先级、截止时间排序）。可由 /tasks 命令触发。",
             parameters={"type": "object", "properties": {}},
             executor=summarize_executor,
+            read_only=True,
         )
     ]
     if notion_sync_service:
@@ -474,6 +530,7 @@ def build_default_tools(
                     },
                 },
                 executor=refresh_notion_executor,
+                group="sync",
             )
         )
     tools.extend(
@@ -491,27 +548,34 @@ def build_default_tools(
                     },
                 },
                 executor=log_executor,
+                group="logs",
             ),
             AgentTool(
                 name="check_status_guard",
                 description="返回即将到期或异常任务列表，用于触发强制提醒。",
                 parameters={"type": "object", "properties": {}},
                 executor=focus_executor,
+                read_only=True,
             ),
             AgentTool(
                 name="search_task",
-                description="根据模糊描述在任务库中检索任务，返回任务信息。",
+                description="根据模糊描述在任务库中检索任务（覆盖名称、项目、内容、子任务与日志），按相关度返回任务信息及命中片段。",
                 parameters={
                     "type": "object",
                     "properties": {
                         "query": {
                             "type": "string",
                             "description": "任务名称或描述中的关键词",
-                        }
+                        },
+                        "limit": {
+                            "type": "integer",
+                            "description": "返回条数，默认 5，最多 10",
+                        },
                     },
                     "required": ["query"],
                 },
                 executor=search_executor,
+                read_only=True,
             ),
         ]
     )
@@ -532,6 +596,7 @@ def build_default_tools(
                     },
                 },
                 executor=tracker_executor,
+                group="tracking",
             )
         )
         tools.append(
@@ -545,6 +610,7 @@ def build_default_tools(
                     },
                 },
                 executor=stop_tracker_executor,
+                group="tracking",
             )
         )
     if log_repository:
@@ -558,10 +624,17 @@ def build_default_tools(
                         "limit": {
                             "type": "integer",
                             "description": "需要返回的日志数量，默认 5，最大 20。",
-                        }
+                        },
+                        "task_id": {"type": "string", "description": "仅返回该任务的日志"},
+                        "status": {"type": "string"},
+                        "contains": {"type": "string", "description": "日志内容需包含的关键词"},
+                        "since": {"type": "string", "description": "ISO8601 起始时间"},
+                        "until": {"type": "string", "description": "ISO8601 截止时间"},
                     },
                 },
                 executor=logs_executor,
+                read_only=True,
+                group="logs",
             )
         )
         tools.append(
@@ -579,6 +652,7 @@ def build_default_tools(
                     "required": ["log_id"],
                 },
                 executor=update_log_executor,
+                group="logs",
             )
         )
     if task_repository:
@@ -646,6 +720,7 @@ def build_default_tools(
                     },
                 },
                 executor=report_state_executor,
+                group="state",
             )
         )
     if rest_service:
@@ -664,6 +739,8 @@ def build_default_tools(
                         },
                     },
                     executor=rest_list_executor,
+                    read_only=True,
+                    group="rest",
                 ),
                 AgentTool(
                     name="rest_propose",
@@ -699,6 +776,7 @@ def build_default_tools(
                         "required": ["start", "end"],
                     },
                     executor=rest_propose_executor,
+                    group="rest",
                 ),
                 AgentTool(
                     name="rest_cancel",
@@ -711,6 +789,7 @@ def build_default_tools(
                         "required": ["window_id"],
                     },
                     executor=rest_cancel_executor,
+                    group="rest",
                 ),
             ]
         )
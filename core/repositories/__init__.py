@@ -1,5 +1,13 @@
-from .logs import LogRepository
+from .changes import ChangeFeed, RepositoryChange
+from .logs import LogRepository, LogView
 from .projects import ProjectRepository
 from .tasks import TaskRepository
 
-__all__ = ["TaskRepository", "ProjectRepository", "LogRepository"]
+__all__ = [
+    "TaskRepository",
+    "ProjectRepository",
+    "LogRepository",
+    "LogView",
+    "ChangeFeed",
+    "RepositoryChange",
+]
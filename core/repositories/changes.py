@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+UPSERT = "upsert"
+DELETE = "delete"
+RESET = "reset"
+
+
+@dataclass(frozen=True, slots=True)
+class RepositoryChange:
+    """One mutation of a repository.
+
+    ``kind`` is ``upsert``/``delete`` for the listed ``ids``; ``reset`` means the
+    whole repository was reloaded and ``ids`` is empty.
+    """
+
+    kind: str
+    ids: Tuple[str, ...] = ()
+    generation: int = 0
+
+
+Listener = Callable[[RepositoryChange], None]
+
+
+class ChangeFeed:
+    """Generation counter plus synchronous change listeners for a repository."""
+
+    def __init__(self) -> None:
+        self._generation = 0
+        self._listeners: List[Listener] = []
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def subscribe(self, listener: Listener) -> Callable[[], None]:
+        with self._lock:
+            self._listeners.append(listener)
+
+        def _unsubscribe() -> None:
+            with self._lock:
+                if listener in self._listeners:
+                    self._listeners.remove(listener)
+
+        return _unsubscribe
+
+    def publish(self, kind: str, ids: Iterable[str] = ()) -> None:
+        with self._lock:
+            self._generation += 1
+            change = RepositoryChange(kind, tuple(ids), self._generation)
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(change)
+            except Exception:  # pragma: no cover - listeners must not break writes
+                logger.exception("变更监听器执行失败：%s", listener)
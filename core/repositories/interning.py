@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import sys
+import threading
+from typing import Dict, Iterable, List, Optional
+
+
+class StringPool:
+    """Shares one instance per distinct categorical value.
+
+    Every value also gets a small integer code, so indexes can key on ints while
+    the domain objects keep exposing the plain string view. Safe to share
+    between threads: new values are added under a lock.
+    """
+
+    def __init__(self) -> None:
+        self._codes: Dict[str, int] = {}
+        self._values: List[str] = []
+        self._lock = threading.Lock()
+
+    def intern(self, value: Optional[str]) -> Optional[str]:
+        if value is None:
+            return None
+        code = self._codes.get(value)
+        if code is None:
+            with self._lock:
+                code = self._codes.get(value)
+                if code is None:
+                    value = sys.intern(value)
+                    # Append first so a reader never sees a code without a value.
+                    self._values.append(value)
+                    code = len(self._values) - 1
+                    self._codes[value] = code
+        return self._values[code]
+
+    def intern_all(self, values: Iterable[str]) -> List[str]:
+        return [self.intern(value) for value in values]
+
+    def code(self, value: str) -> int:
+        self.intern(value)
+        return self._codes[value]
+
+    def lookup(self, value: str) -> Optional[int]:
+        """Code of an already interned value, without adding unknown ones."""
+        return self._codes.get(value)
+
+    def value(self, code: int) -> str:
+        return self._values[code]
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+# Shared by the task and log repositories so that task names referenced from
+# log entries and subtask lists point at the same string objects.
+shared_pool = StringPool()
@@ -1,15 +1,56 @@
 from __future__ import annotations
 
+import bisect
 import json
+import threading
+from datetime import datetime
+from itertools import chain, islice
 from pathlib import Path
 from dataclasses import asdict
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from core.domain import LogEntry
+from core.repositories.changes import DELETE, RESET, UPSERT, ChangeFeed, Listener
+from core.repositories.interning import shared_pool
+from core.utils.memory import footprint
+from core.utils.sorting import remove_sorted
+from core.utils.telemetry import telemetry
+from core.utils.timezone import to_local
 from data_pipeline.storage import paths
 
 
+class LogView:
+    """Lazily evaluated slice of a log query; rows are produced on iteration."""
+
+    def __init__(
+        self,
+        source: Callable[[], Iterator[LogEntry]],
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ):
+        self._source = source
+        self._offset = max(0, offset)
+        self._limit = limit
+
+    def __iter__(self) -> Iterator[LogEntry]:
+        stop = None if self._limit is None else self._offset + max(0, self._limit)
+        return islice(self._source(), self._offset, stop)
+
+    def first(self) -> Optional[LogEntry]:
+        return next(iter(self), None)
+
+    def to_list(self) -> List[LogEntry]:
+        return list(self)
+
+
 class LogRepository:
+    """Notion logs plus locally recorded ones, loaded lazily from JSON.
+
+    Safe to share between update workers: lazy loads, index builds and writes
+    happen under one re-entrant lock. Change listeners run after the lock is
+    released.
+    """
+
     def __init__(
         self,
         processed_path: Path | None = None,
@@ -25,11 +66,28 @@ class LogRepository:
         self._custom_cache: Dict[str, LogEntry] = {}
         self._primary_loaded = False
         self._custom_loaded = False
+        self._indexed = False
+        self._next_seq = 0
+        self._seq: Dict[str, int] = {}
+        self._by_task: Dict[Optional[str], List[Tuple[int, str]]] = {}
+        self._by_status: Dict[int, List[Tuple[int, str]]] = {}
+        self._timeline: List[Tuple[float, int, str]] = []
+        self._changes = ChangeFeed()
+        self._lock = threading.RLock()
+
+    @property
+    def generation(self) -> int:
+        """Bumped on every change so callers can key derived data on it."""
+        return self._changes.generation
+
+    def subscribe(self, listener: Listener) -> Callable[[], None]:
+        """Call ``listener`` after every change; returns an unsubscribe hook."""
+        return self._changes.subscribe(listener)
 
     @staticmethod
     def _read_json(path: Path) -> Dict[str, Dict]:
         try:
-            with path.open("r", encoding="utf-8") as file:
+            with telemetry.span(f"repo_load:{path.stem}"), path.open("r", encoding="utf-8") as file:
                 return json.load(file)
         except (FileNotFoundError, json.JSONDecodeError):
             return {}
@@ -37,29 +95,41 @@ class LogRepository:
     def _load_primary(self) -> None:
         if self._primary_loaded:
             return
-        self._primary_cache = {}
-        if self._primary_path.exists():
-            raw = self._read_json(self._primary_path)
-            for log_id, payload in raw.items():
-                payload = dict(payload)
-                payload.pop("id", None)
-                self._primary_cache[log_id] = LogEntry(id=log_id, **payload)
-        self._primary_loaded = True
+        with self._lock:
+            if self._primary_loaded:
+                return
+            cache: Dict[str, LogEntry] = {}
+            if self._primary_path.exists():
+                raw = self._read_json(self._primary_path)
+                for log_id, payload in raw.items():
+                    cache[log_id] = self._hydrate(log_id, payload)
+            self._primary_cache = cache
+            self._primary_loaded = True
 
     def _load_custom(self) -> None:
         if self._custom_loaded:
             return
-        self._custom_cache = {}
-        if self._custom_path.exists():
-            raw = self._read_json(self._custom_path)
-            for log_id, payload in raw.items():
-                payload = dict(payload)
-                payload.pop("id", None)
-                self._custom_cache[log_id] = LogEntry(id=log_id, **payload)
-        else:
-            self._custom_path.parent.mkdir(parents=True, exist_ok=True)
-            self._custom_path.write_text("{}", encoding="utf-8")
-        self._custom_loaded = True
+        with self._lock:
+            if self._custom_loaded:
+                return
+            cache: Dict[str, LogEntry] = {}
+            if self._custom_path.exists():
+                raw = self._read_json(self._custom_path)
+                for log_id, payload in raw.items():
+                    cache[log_id] = self._hydrate(log_id, payload)
+            else:
+                self._custom_path.parent.mkdir(parents=True, exist_ok=True)
+                self._custom_path.write_text("{}", encoding="utf-8")
+            self._custom_cache = cache
+            self._custom_loaded = True
+
+    @staticmethod
+    def _hydrate(log_id: str, payload: Dict) -> LogEntry:
+        payload = dict(payload)
+        payload.pop("id", None)
+        entry = LogEntry(id=log_id, **payload)
+        _intern_entry(entry)
+        return entry
 
     def _write_primary(self) -> None:
         if not self._primary_loaded:
@@ -83,32 +153,187 @@ class LogRepository:
                 indent=4,
             )
 
-    def refresh(self) -> None:
-        self._primary_loaded = False
-        self._custom_loaded = False
-        self._primary_cache.clear()
-        self._custom_cache.clear()
+    # ----------------------------------------------------------------- indexes
+    def _ensure_indexes(self) -> None:
         self._load_primary()
         self._load_custom()
+        if self._indexed:
+            return
+        with self._lock:
+            # Read-only tools may race here after a cold start or a RESET.
+            if self._indexed:
+                return
+            self._load_primary()
+            self._load_custom()
+            self._next_seq = 0
+            self._seq = {}
+            self._by_task = {}
+            self._by_status = {}
+            self._timeline = []
+            for entry in chain(self._primary_cache.values(), self._custom_cache.values()):
+                self._index_entry(entry)
+            self._timeline.sort()
+            self._indexed = True
+
+    def _index_entry(self, entry: LogEntry, sort: bool = False) -> None:
+        seq = self._seq.get(entry.id)
+        if seq is None:
+            seq = self._next_seq
+            self._next_seq += 1
+            self._seq[entry.id] = seq
+        key = (seq, entry.id)
+        bisect.insort(self._by_task.setdefault(entry.task_id, []), key)
+        bisect.insort(self._by_status.setdefault(shared_pool.code(entry.status), []), key)
+        timestamp = _entry_timestamp(entry)
+        if timestamp is not None:
+            if sort:
+                bisect.insort(self._timeline, (timestamp, seq, entry.id))
+            else:
+                self._timeline.append((timestamp, seq, entry.id))
+
+    def _unindex_entry(self, entry: LogEntry) -> None:
+        seq = self._seq.get(entry.id)
+        if seq is None:
+            return
+        key = (seq, entry.id)
+        for bucket in (
+            self._by_task.get(entry.task_id),
+            self._by_status.get(shared_pool.code(entry.status)),
+        ):
+            if bucket:
+                remove_sorted(bucket, key)
+        timestamp = _entry_timestamp(entry)
+        if timestamp is not None:
+            remove_sorted(self._timeline, (timestamp, seq, entry.id))
+
+    def _lookup(self, log_id: str) -> Optional[LogEntry]:
+        return self._custom_cache.get(log_id) or self._primary_cache.get(log_id)
+
+    # ------------------------------------------------------------------ reads
+    def refresh(self) -> None:
+        with self._lock:
+            self._primary_loaded = False
+            self._custom_loaded = False
+            self._indexed = False
+            self._primary_cache = {}
+            self._custom_cache = {}
+            self._load_primary()
+            self._load_custom()
+        self._changes.publish(RESET)
+
+    def memory_report(self) -> Dict[str, int]:
+        return footprint(self.list_logs())
 
     def list_logs(self) -> List[LogEntry]:
         self._load_primary()
         self._load_custom()
-        return list(self._primary_cache.values()) + list(self._custom_cache.values())
+        with self._lock:
+            return list(self._primary_cache.values()) + list(self._custom_cache.values())
 
-    def delete_log(self, log_id: str) -> bool:
+    def get_log(self, log_id: str) -> Optional[LogEntry]:
         self._load_custom()
-        if log_id in self._custom_cache:
-            self._custom_cache.pop(log_id, None)
-            self._write_custom()
-            return True
         self._load_primary()
-        if log_id not in self._primary_cache:
-            return False
-        self._primary_cache.pop(log_id, None)
-        self._write_primary()
+        return self._lookup(log_id)
+
+    def query_logs(
+        self,
+        *,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        task_id: Optional[str] = None,
+        status: Optional[str] = None,
+        contains: Optional[str] = None,
+        newest_first: bool = True,
+    ) -> LogView:
+        """Filter logs through the task/status/time indexes.
+
+        Order follows ``list_logs()`` (Notion logs, then local logs), reversed
+        when ``newest_first`` is set. Entries are resolved only while the view is
+        iterated, so ``limit`` bounds the work done.
+        """
+        self._ensure_indexes()
+        since_ts = to_local(since).timestamp() if since else None
+        until_ts = to_local(until).timestamp() if until else None
+        needle = contains.lower() if contains else None
+        # Looked up rather than interned: an unknown status matches nothing
+        # and must not grow the shared pool.
+        status_code = shared_pool.lookup(status) if status is not None else None
+
+        def _candidates() -> Iterable[LogEntry]:
+            # Key lists are copied under the lock; writers insort into them.
+            with self._lock:
+                if task_id is not None:
+                    keys = list(self._by_task.get(task_id, []))
+                elif status is not None:
+                    keys = list(self._by_status.get(status_code, [])) if status_code is not None else []
+                elif since_ts is not None or until_ts is not None:
+                    lo = 0
+                    hi = len(self._timeline)
+                    if since_ts is not None:
+                        lo = bisect.bisect_left(self._timeline, (since_ts,))
+                    if until_ts is not None:
+                        hi = bisect.bisect_right(self._timeline, (until_ts, float("inf")))
+                    keys = sorted((seq, log_id) for _, seq, log_id in self._timeline[lo:hi])
+                else:
+                    primary = list(self._primary_cache.values())
+                    custom = list(self._custom_cache.values())
+                    if newest_first:
+                        return chain(reversed(custom), reversed(primary))
+                    return chain(primary, custom)
+            return self._resolve(reversed(keys) if newest_first else iter(keys))
+
+        def _source() -> Iterator[LogEntry]:
+            for entry in _candidates():
+                if task_id is not None and entry.task_id != task_id:
+                    continue
+                if status is not None and entry.status != status:
+                    continue
+                if since_ts is not None or until_ts is not None:
+                    timestamp = _entry_timestamp(entry)
+                    if timestamp is None:
+                        continue
+                    if since_ts is not None and timestamp < since_ts:
+                        continue
+                    if until_ts is not None and timestamp > until_ts:
+                        continue
+                if needle and needle not in (entry.content or "").lower():
+                    continue
+                yield entry
+
+        return LogView(_source, offset=offset, limit=limit)
+
+    def _resolve(self, keys: Iterable[Tuple[int, str]]) -> Iterator[LogEntry]:
+        for _, log_id in keys:
+            entry = self._lookup(log_id)
+            if entry:
+                yield entry
+
+    # ----------------------------------------------------------------- writes
+    def delete_log(self, log_id: str) -> bool:
+        with self._lock:
+            self._load_custom()
+            if log_id in self._custom_cache:
+                entry = self._custom_cache.pop(log_id)
+                self._forget(entry)
+                self._write_custom()
+            else:
+                self._load_primary()
+                if log_id not in self._primary_cache:
+                    return False
+                entry = self._primary_cache.pop(log_id)
+                self._forget(entry)
+                self._write_primary()
+        self._changes.publish(DELETE, [log_id])
         return True
 
+    def _forget(self, entry: LogEntry) -> None:
+        if not self._indexed:
+            return
+        self._unindex_entry(entry)
+        self._seq.pop(entry.id, None)
+
     def update_log(
         self,
         log_id: str,
@@ -116,33 +341,62 @@ class LogRepository:
         task_id: Optional[str] = None,
         task_name: Optional[str] = None,
     ) -> Optional[LogEntry]:
-        self._load_custom()
-        target_cache = None
-        entry = self._custom_cache.get(log_id)
-        if entry:
-            target_cache = "custom"
-        else:
-            self._load_primary()
-            entry = self._primary_cache.get(log_id)
+        with self._lock:
+            self._load_custom()
+            target_cache = None
+            entry = self._custom_cache.get(log_id)
             if entry:
-                target_cache = "primary"
-        if not entry:
-            return None
-        if content:
-            entry.content = content
-        if task_id is not None:
-            entry.task_id = task_id
-        if task_name is not None:
-            entry.task_name = task_name
-        if target_cache == "custom":
-            self._custom_cache[log_id] = entry
-            self._write_custom()
-        else:
-            self._primary_cache[log_id] = entry
-            self._write_primary()
+                target_cache = "custom"
+            else:
+                self._load_primary()
+                entry = self._primary_cache.get(log_id)
+                if entry:
+                    target_cache = "primary"
+            if not entry:
+                return None
+            if self._indexed:
+                self._unindex_entry(entry)
+            if content:
+                entry.content = content
+            if task_id is not None:
+                entry.task_id = shared_pool.intern(task_id)
+            if task_name is not None:
+                entry.task_name = shared_pool.intern(task_name)
+            if self._indexed:
+                self._index_entry(entry, sort=True)
+            if target_cache == "custom":
+                self._custom_cache[log_id] = entry
+                self._write_custom()
+            else:
+                self._primary_cache[log_id] = entry
+                self._write_primary()
+        self._changes.publish(UPSERT, [log_id])
         return entry
 
     def add_local_log(self, entry: LogEntry) -> None:
-        self._load_custom()
-        self._custom_cache[entry.id] = entry
-        self._write_custom()
+        with self._lock:
+            self._load_custom()
+            _intern_entry(entry)
+            self._custom_cache[entry.id] = entry
+            if self._indexed:
+                self._index_entry(entry, sort=True)
+            self._write_custom()
+        self._changes.publish(UPSERT, [entry.id])
+
+
+def _intern_entry(entry: LogEntry) -> None:
+    entry.status = shared_pool.intern(entry.status)
+    entry.task_id = shared_pool.intern(entry.task_id)
+    entry.task_name = shared_pool.intern(entry.task_name)
+
+
+def _entry_timestamp(entry: LogEntry) -> Optional[float]:
+    for raw in (entry.created_at, entry.name):
+        if not raw:
+            continue
+        try:
+            parsed = datetime.fromisoformat(raw.replace("Z", "+00:00"))
+        except ValueError:
+            continue
+        return to_local(parsed).timestamp()
+    return None
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 import json
+import threading
 from pathlib import Path
 from typing import Dict, List
 
 from core.domain import Project
+from core.utils.telemetry import telemetry
 from data_pipeline.storage import paths
 
 
@@ -15,11 +17,12 @@ class ProjectRepository:
         )
         self._cache: Dict[str, Project] = {}
         self._loaded = False
+        self._lock = threading.Lock()
 
     @staticmethod
     def _read_json(path: Path) -> Dict[str, Dict]:
         try:
-            with path.open("r", encoding="utf-8") as file:
+            with telemetry.span(f"repo_load:{path.stem}"), path.open("r", encoding="utf-8") as file:
                 return json.load(file)
         except (FileNotFoundError, json.JSONDecodeError):
             return {}
@@ -27,18 +30,20 @@ class ProjectRepository:
     def _load(self) -> None:
         if self._loaded:
             return
-        if not self._processed_path.exists():
-            self._cache = {}
+        with self._lock:
+            if self._loaded:
+                return
+            cache: Dict[str, Project] = {}
+            if self._processed_path.exists():
+                raw = self._read_json(self._processed_path)
+                for project_id, payload in raw.items():
+                    cache[project_id] = Project(id=project_id, **payload)
+            self._cache = cache
             self._loaded = True
-            return
-        raw = self._read_json(self._processed_path)
-        for project_id, payload in raw.items():
-            self._cache[project_id] = Project(id=project_id, **payload)
-        self._loaded = True
 
     def refresh(self) -> None:
-        self._loaded = False
-        self._cache.clear()
+        with self._lock:
+            self._loaded = False
         self._load()
 
     def list_active_projects(self) -> List[Project]:
@@ -1,17 +1,34 @@
 from __future__ import annotations
 
+import bisect
 import json
+import threading
+from datetime import datetime, timezone
+from itertools import chain
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 from uuid import uuid4
 
 from dataclasses import asdict
 
-from core.domain import Task
+from core.domain import NOTION_PAGE_BASE_URL, Task
+from core.repositories.changes import DELETE, RESET, UPSERT, ChangeFeed, Listener
+from core.repositories.interning import shared_pool
+from core.utils.memory import footprint
+from core.utils.sorting import remove_sorted
+from core.utils.telemetry import telemetry
+from core.utils.timezone import parse_due, to_local
 from data_pipeline.storage import paths
 
 
 class TaskRepository:
+    """Notion tasks plus locally created ones, loaded lazily from JSON.
+
+    Lazy loads, the due-date index and writes are serialised by a re-entrant
+    lock so update workers can share one instance; change listeners run after
+    it is released.
+    """
+
     def __init__(
         self,
         processed_path: Path | None = None,
@@ -23,11 +40,25 @@ class TaskRepository:
         self._custom_cache: Dict[str, Task] = {}
         self._primary_loaded = False
         self._custom_loaded = False
+        self._changes = ChangeFeed()
+        self._due_indexed = False
+        self._due_at: Dict[str, float] = {}
+        self._due_timeline: List[Tuple[float, str]] = []
+        self._lock = threading.RLock()
+
+    @property
+    def generation(self) -> int:
+        """Bumped on every change so callers can key derived data on it."""
+        return self._changes.generation
+
+    def subscribe(self, listener: Listener) -> Callable[[], None]:
+        """Call ``listener`` after every change; returns an unsubscribe hook."""
+        return self._changes.subscribe(listener)
 
     @staticmethod
     def _read_json(path: Path) -> Dict[str, Dict]:
         try:
-            with path.open("r", encoding="utf-8") as file:
+            with telemetry.span(f"repo_load:{path.stem}"), path.open("r", encoding="utf-8") as file:
                 return json.load(file)
         except (FileNotFoundError, json.JSONDecodeError):
             return {}
@@ -35,27 +66,35 @@ class TaskRepository:
     def _load_primary(self) -> None:
         if self._primary_loaded:
             return
-        self._primary_cache = {}
-        if self._primary_path.exists():
-            raw = self._read_json(self._primary_path)
-            for task_id, payload in raw.items():
-                payload = self._normalize_payload(task_id, payload, is_custom=False)
-                self._primary_cache[task_id] = Task(id=task_id, **payload)
-        self._primary_loaded = True
+        with self._lock:
+            if self._primary_loaded:
+                return
+            cache: Dict[str, Task] = {}
+            if self._primary_path.exists():
+                raw = self._read_json(self._primary_path)
+                for task_id, payload in raw.items():
+                    payload = self._normalize_payload(task_id, payload, is_custom=False)
+                    cache[task_id] = Task(id=task_id, **payload)
+            self._primary_cache = cache
+            self._primary_loaded = True
 
     def _load_custom(self) -> None:
         if self._custom_loaded:
             return
-        self._custom_cache = {}
-        if self._custom_path.exists():
-            raw = self._read_json(self._custom_path)
-            for task_id, payload in raw.items():
-                payload = self._normalize_payload(task_id, payload, is_custom=True)
-                self._custom_cache[task_id] = Task(id=task_id, **payload)
-        else:
-            self._custom_path.parent.mkdir(parents=True, exist_ok=True)
-            self._custom_path.write_text("{}", encoding="utf-8")
-        self._custom_loaded = True
+        with self._lock:
+            if self._custom_loaded:
+                return
+            cache: Dict[str, Task] = {}
+            if self._custom_path.exists():
+                raw = self._read_json(self._custom_path)
+                for task_id, payload in raw.items():
+                    payload = self._normalize_payload(task_id, payload, is_custom=True)
+                    cache[task_id] = Task(id=task_id, **payload)
+            else:
+                self._custom_path.parent.mkdir(parents=True, exist_ok=True)
+                self._custom_path.write_text("{}", encoding="utf-8")
+            self._custom_cache = cache
+            self._custom_loaded = True
 
     def _save_custom(self) -> None:
         if not self._custom_loaded:
@@ -85,22 +124,40 @@ class TaskRepository:
         payload.setdefault("project_name", "")
         payload.setdefault("project_id", None)
         payload.setdefault("due_date", None)
-        if not payload.get("page_url") and not is_custom:
-            payload["page_url"] = f"https://www.notion.so/{task_id.replace('-', '')}"
-        elif is_custom and "page_url" not in payload:
+        payload.setdefault("page_url", None)
+        payload["from_notion"] = not is_custom
+        if not is_custom and _derivable_page_url(task_id, payload["page_url"]):
+            # Task.url rebuilds it from the ID on demand.
             payload["page_url"] = None
+        for key in ("name", "priority", "status", "project_id", "project_name"):
+            payload[key] = shared_pool.intern(payload.get(key))
+        payload["subtask_names"] = shared_pool.intern_all(payload["subtask_names"])
         return payload
 
     def refresh(self) -> None:
-        self._primary_loaded = False
-        self._custom_loaded = False
-        self._primary_cache.clear()
-        self._custom_cache.clear()
+        with self._lock:
+            self._primary_loaded = False
+            self._custom_loaded = False
+            self._primary_cache = {}
+            self._custom_cache = {}
+            self._due_indexed = False
+        self._changes.publish(RESET)
+
+    def source_stamp(self) -> Dict[str, int]:
+        """Modification times of the backing files, for caches stored on disk."""
+        return {
+            "processed": _mtime_ns(self._primary_path),
+            "custom": _mtime_ns(self._custom_path),
+        }
+
+    def memory_report(self) -> Dict[str, int]:
+        return footprint(self.list_active_tasks())
 
     def list_active_tasks(self) -> List[Task]:
         self._load_primary()
         self._load_custom()
-        return list(self._primary_cache.values()) + list(self._custom_cache.values())
+        with self._lock:
+            return list(self._primary_cache.values()) + list(self._custom_cache.values())
 
     def get_task(self, task_id: str) -> Optional[Task]:
         self._load_primary()
@@ -109,19 +166,85 @@ class TaskRepository:
         self._load_custom()
         return self._custom_cache.get(task_id)
 
+    def tasks_due_between(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> List[Tuple[datetime, Task]]:
+        """Tasks whose due moment falls in ``[start, end]``, earliest first.
+
+        Date-only due dates count as due at the end of that local day.
+        """
+        self._ensure_due_index()
+        with self._lock:
+            lo = 0
+            hi = len(self._due_timeline)
+            if start is not None:
+                lo = bisect.bisect_left(self._due_timeline, to_local(start).timestamp(), key=_due_key)
+            if end is not None:
+                hi = bisect.bisect_right(self._due_timeline, to_local(end).timestamp(), key=_due_key)
+            window = self._due_timeline[lo:hi]
+        result: List[Tuple[datetime, Task]] = []
+        for timestamp, task_id in window:
+            task = self.get_task(task_id)
+            if task:
+                result.append((_from_timestamp(timestamp), task))
+        return result
+
+    def next_due_after(self, moment: datetime) -> Optional[datetime]:
+        """Earliest due moment strictly after ``moment``."""
+        self._ensure_due_index()
+        with self._lock:
+            index = bisect.bisect_right(
+                self._due_timeline, to_local(moment).timestamp(), key=_due_key
+            )
+            if index >= len(self._due_timeline):
+                return None
+            return _from_timestamp(self._due_timeline[index][0])
+
+    def _ensure_due_index(self) -> None:
+        self._load_primary()
+        self._load_custom()
+        if self._due_indexed:
+            return
+        with self._lock:
+            if self._due_indexed:
+                return
+            self._load_primary()
+            self._load_custom()
+            due_at: Dict[str, float] = {}
+            for task in chain(self._primary_cache.values(), self._custom_cache.values()):
+                timestamp = _due_timestamp(task.due_date)
+                if timestamp is not None:
+                    due_at[task.id] = timestamp
+            self._due_at = due_at
+            self._due_timeline = sorted((ts, task_id) for task_id, ts in due_at.items())
+            self._due_indexed = True
+
+    def _reindex_due(self, task_id: str, task: Optional[Task]) -> None:
+        if not self._due_indexed:
+            return
+        previous = self._due_at.pop(task_id, None)
+        if previous is not None:
+            remove_sorted(self._due_timeline, (previous, task_id))
+        timestamp = _due_timestamp(task.due_date) if task else None
+        if timestamp is not None:
+            self._due_at[task_id] = timestamp
+            bisect.insort(self._due_timeline, (timestamp, task_id))
+
     def find_by_name(self, name: str) -> Optional[Task]:
         if not name:
             return None
         lowered = name.lower()
-        for cache_loader, cache in (
-            (self._load_primary, self._primary_cache),
-            (self._load_custom, self._custom_cache),
-        ):
-            cache_loader()
-            exact = next((task for task in cache.values() if task.name.lower() == lowered), None)
+        self._load_primary()
+        self._load_custom()
+        with self._lock:
+            caches = (list(self._primary_cache.values()), list(self._custom_cache.values()))
+        for cache in caches:
+            exact = next((task for task in cache if task.name.lower() == lowered), None)
             if exact:
                 return exact
-            contains = next((task for task in cache.values() if lowered in task.name.lower()), None)
+            contains = next((task for task in cache if lowered in task.name.lower()), None)
             if contains:
                 return contains
         return None
@@ -141,22 +264,25 @@ class TaskRepository:
         project_name: str = "",
         due_date: Optional[str] = None,
     ) -> Task:
-        self._load_custom()
         task_id = str(uuid4())
         payload = {
-            "name": name,
-            "priority": priority,
-            "status": status,
+            "name": shared_pool.intern(name),
+            "priority": shared_pool.intern(priority),
+            "status": shared_pool.intern(status),
             "content": content,
             "project_id": None,
-            "project_name": project_name,
+            "project_name": shared_pool.intern(project_name),
             "due_date": due_date,
             "subtask_names": [],
             "page_url": None,
         }
         task = Task(id=task_id, **payload)
-        self._custom_cache[task_id] = task
-        self._save_custom()
+        with self._lock:
+            self._load_custom()
+            self._custom_cache[task_id] = task
+            self._save_custom()
+            self._reindex_due(task_id, task)
+        self._changes.publish(UPSERT, [task_id])
         return task
 
     def update_custom_task(
@@ -170,34 +296,68 @@ class TaskRepository:
         due_date: Optional[str] = None,
         project_name: Optional[str] = None,
     ) -> Optional[Task]:
-        self._load_custom()
-        task = self._custom_cache.get(task_id)
-        if not task:
-            return None
-        if name:
-            task.name = name
-        if content is not None:
-            task.content = content
-        if status:
-            task.status = status
-        if priority:
-            task.priority = priority
-        if due_date is not None:
-            task.due_date = due_date
-        if project_name is not None:
-            task.project_name = project_name
-        self._custom_cache[task_id] = task
-        self._save_custom()
+        with self._lock:
+            self._load_custom()
+            task = self._custom_cache.get(task_id)
+            if not task:
+                return None
+            if name:
+                task.name = shared_pool.intern(name)
+            if content is not None:
+                task.content = content
+            if status:
+                task.status = shared_pool.intern(status)
+            if priority:
+                task.priority = shared_pool.intern(priority)
+            if due_date is not None:
+                task.due_date = due_date
+            if project_name is not None:
+                task.project_name = shared_pool.intern(project_name)
+            self._custom_cache[task_id] = task
+            self._save_custom()
+            self._reindex_due(task_id, task)
+        self._changes.publish(UPSERT, [task_id])
         return task
 
     def delete_custom_task(self, task_id: str) -> bool:
-        self._load_custom()
-        if task_id not in self._custom_cache:
-            return False
-        self._custom_cache.pop(task_id, None)
-        self._save_custom()
+        with self._lock:
+            self._load_custom()
+            if task_id not in self._custom_cache:
+                return False
+            self._custom_cache.pop(task_id, None)
+            self._save_custom()
+            self._reindex_due(task_id, None)
+        self._changes.publish(DELETE, [task_id])
         return True
 
     def is_custom_task(self, task_id: str) -> bool:
         self._load_custom()
         return task_id in self._custom_cache
+
+
+def _derivable_page_url(task_id: str, page_url: Optional[str]) -> bool:
+    if not page_url:
+        return True
+    return page_url.startswith(NOTION_PAGE_BASE_URL) and page_url.endswith(
+        task_id.replace("-", "")
+    )
+
+
+def _due_timestamp(due_date: Optional[str]) -> Optional[float]:
+    due = parse_due(due_date)
+    return due.timestamp() if due else None
+
+
+def _due_key(item: Tuple[float, str]) -> float:
+    return item[0]
+
+
+def _from_timestamp(timestamp: float) -> datetime:
+    return to_local(datetime.fromtimestamp(timestamp, tz=timezone.utc))
+
+
+def _mtime_ns(path: Path) -> int:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return 0
@@ -1,5 +1,12 @@
 from .logbook_service import LogbookService
 from .status_guard import StatusGuard
+from .task_search import TaskSearchIndex, TaskSearchResult
 from .task_summary_service import TaskSummaryService
 
-__all__ = ["TaskSummaryService", "LogbookService", "StatusGuard"]
+__all__ = [
+    "TaskSummaryService",
+    "LogbookService",
+    "StatusGuard",
+    "TaskSearchIndex",
+    "TaskSearchResult",
+]
@@ -54,13 +54,15 @@ class LogbookService:
             matched_task = self._task_repo.ensure_task(inferred_name, content)
         resolved_task_id = matched_task.id
         resolved_task_name = matched_task.name
+        now = beijing_now()
         entry = LogEntry(
             id=str(uuid4()),
-            name=format_beijing(beijing_now()),
+            name=format_beijing(now),
             status="Captured",
             content=normalized,
             task_id=resolved_task_id,
             task_name=resolved_task_name,
+            created_at=now.isoformat(),
         )
         self._log_repo.add_local_log(entry)
         display = f"{entry.name} ｜ 任务: {resolved_task_name}\n{normalized}"
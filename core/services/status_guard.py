@@ -1,32 +1,60 @@
 from __future__ import annotations
 
 from datetime import datetime, timedelta
-from typing import List
+from typing import List, Optional
 
-from core.domain import Intervention
+from core.domain import Intervention, Task
 from core.repositories import TaskRepository
+from core.utils.timezone import format_local, local_now, to_local
+
+DUE_SOON_WINDOW = timedelta(hours=24)
+CLOSED_STATUSES = {"Done"}
 
 
 class StatusGuard:
-    def __init__(self, task_repository: TaskRepository):
+    def __init__(
+        self,
+        task_repository: TaskRepository,
+        due_soon_window: timedelta = DUE_SOON_WINDOW,
+    ):
         self._task_repo = task_repository
+        self._window = due_soon_window
 
-    def evaluate(self) -> List[Intervention]:
+    def evaluate(self, now: Optional[datetime] = None) -> List[Intervention]:
+        """Overdue and due-soon tasks, read from the repository's due timeline."""
+        now = to_local(now) if now else local_now()
         interventions: List[Intervention] = []
-        now = datetime.now()
-        for task in self._task_repo.list_active_tasks():
-            if not task.due_date:
-                continue
-            try:
-                due = datetime.fromisoformat(task.due_date)
-            except ValueError:
+        for due, task in self._task_repo.tasks_due_between(end=now + self._window):
+            if task.status in CLOSED_STATUSES:
                 continue
-            if due - now <= timedelta(hours=24) and task.status != "Done":
-                interventions.append(
-                    Intervention(
-                        level="warning",
-                        message=f"任务《{task.name}》即将到期，别再拖。",
-                        reason="due_soon",
-                    )
-                )
+            interventions.append(self._build_intervention(task, due, now))
         return interventions
+
+    def next_transition(self, now: Optional[datetime] = None) -> Optional[datetime]:
+        """Next moment at which a task becomes due soon or overdue."""
+        now = to_local(now) if now else local_now()
+        candidates: List[datetime] = []
+        becomes_overdue = self._task_repo.next_due_after(now)
+        if becomes_overdue:
+            candidates.append(becomes_overdue)
+        becomes_due_soon = self._task_repo.next_due_after(now + self._window)
+        if becomes_due_soon:
+            candidates.append(becomes_due_soon - self._window)
+        return min(candidates) if candidates else None
+
+    @staticmethod
+    def _build_intervention(task: Task, due: datetime, now: datetime) -> Intervention:
+        deadline = format_local(due)
+        if due <= now:
+            return Intervention(
+                level="critical",
+                message=f"任务《{task.name}》已逾期（截止 {deadline}），立刻处理。",
+                reason="overdue",
+                task_id=task.id,
+            )
+        return Intervention(
+            level="warning",
+            message=f"任务《{task.name}》即将到期（截止 {deadline}），别再拖。",
+            reason="due_soon",
+            task_id=task.id,
+        )
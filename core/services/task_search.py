@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+from core.domain import Task
+from core.repositories import LogRepository, RepositoryChange, TaskRepository
+from core.repositories.changes import DELETE, RESET
+from core.utils.text_search import InvertedIndex, snippet
+
+FIELD_BOOSTS = {
+    "name": 3.0,
+    "project": 1.5,
+    "subtasks": 1.2,
+    "content": 1.0,
+    "logs": 0.8,
+}
+
+
+@dataclass(slots=True)
+class TaskSearchResult:
+    task_id: str
+    score: float
+    snippets: Dict[str, str] = field(default_factory=dict)
+
+
+class TaskSearchIndex:
+    """BM25 index over active tasks and their logs.
+
+    Built lazily on the first query and kept in sync through the repositories'
+    change listeners: task and log writes re-index only the affected tasks, a
+    repository reset (Notion sync) triggers a rebuild on the next query.
+    """
+
+    def __init__(
+        self,
+        task_repository: TaskRepository,
+        log_repository: LogRepository | None = None,
+    ):
+        self._task_repo = task_repository
+        self._log_repo = log_repository
+        self._index = InvertedIndex(FIELD_BOOSTS)
+        self._documents: Dict[str, Dict[str, str]] = {}
+        self._log_tasks: Dict[str, Optional[str]] = {}
+        self._lock = threading.RLock()
+        self._stale = True
+        task_repository.subscribe(self._on_task_change)
+        if log_repository is not None:
+            log_repository.subscribe(self._on_log_change)
+
+    # ------------------------------------------------------------------ query
+    def search(self, query: str, limit: int = 5) -> List[TaskSearchResult]:
+        with self._lock:
+            self._ensure_built()
+            hits = self._index.search(query, limit=limit)
+            results: List[TaskSearchResult] = []
+            for hit in hits:
+                document = self._documents.get(hit.doc_id, {})
+                snippets: Dict[str, str] = {}
+                for name in FIELD_BOOSTS:
+                    text = snippet(document.get(name), hit.terms)
+                    if text:
+                        snippets[name] = text
+                results.append(TaskSearchResult(hit.doc_id, round(hit.score, 4), snippets))
+            return results
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._ensure_built()
+            return len(self._index)
+
+    # --------------------------------------------------------------- building
+    def _ensure_built(self) -> None:
+        if not self._stale:
+            return
+        self._index.clear()
+        self._documents.clear()
+        self._log_tasks.clear()
+        for task in self._task_repo.list_active_tasks():
+            self._index_task(task)
+        self._stale = False
+
+    def _index_task(self, task: Task) -> None:
+        logs: List[str] = []
+        if self._log_repo is not None:
+            for entry in self._log_repo.query_logs(task_id=task.id, newest_first=False):
+                self._log_tasks[entry.id] = task.id
+                if entry.content:
+                    logs.append(entry.content)
+        document = {
+            "name": task.name or "",
+            "project": task.project_name or "",
+            "subtasks": " / ".join(task.subtask_names),
+            "content": task.content or "",
+            "logs": "\n".join(logs),
+        }
+        self._documents[task.id] = document
+        self._index.add(task.id, document)
+
+    def _reindex(self, task_ids: Set[Optional[str]]) -> None:
+        for task_id in task_ids:
+            if not task_id:
+                continue
+            task = self._task_repo.get_task(task_id)
+            if task is None:
+                self._drop(task_id)
+            else:
+                self._index_task(task)
+
+    def _drop(self, task_id: str) -> None:
+        self._index.remove(task_id)
+        self._documents.pop(task_id, None)
+
+    # -------------------------------------------------------------- listeners
+    def _on_task_change(self, change: RepositoryChange) -> None:
+        with self._lock:
+            if self._stale:
+                return
+            if change.kind == RESET:
+                self._stale = True
+            elif change.kind == DELETE:
+                for task_id in change.ids:
+                    self._drop(task_id)
+            else:
+                self._reindex(set(change.ids))
+
+    def _on_log_change(self, change: RepositoryChange) -> None:
+        with self._lock:
+            if self._stale:
+                return
+            if change.kind == RESET:
+                self._stale = True
+                return
+            affected: Set[Optional[str]] = set()
+            for log_id in change.ids:
+                affected.add(self._log_tasks.pop(log_id, None))
+                if change.kind != DELETE and self._log_repo is not None:
+                    entry = self._log_repo.get_log(log_id)
+                    if entry is not None:
+                        affected.add(entry.task_id)
+            self._reindex(affected)
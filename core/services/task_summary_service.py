@@ -1,12 +1,15 @@
 from __future__ import annotations
 
+import threading
 from collections import defaultdict
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple, TypeVar
 
-from core.domain import Task
+from core.domain import Task, notion_page_url
 from core.repositories import LogRepository, ProjectRepository, TaskRepository
 
 PRIORITY_ORDER = {"Urgent": 0, "High": 1, "Medium": 2, "Low": 3}
+_T = TypeVar("_T")
+
 MD_SPECIAL = ["\\", "_", "*", "[", "]", "(", ")", "~", "`", ">", "#", "+", "-", "=", "|", "{", "}", ".", "!"]
 
 
@@ -20,6 +23,41 @@ class TaskSummaryService:
         self._task_repo = task_repository
         self._project_repo = project_repository
         self._log_repo = log_repository
+        self._memo: Dict[str, Tuple[Hashable, Any]] = {}
+        self._memo_lock = threading.Lock()
+
+    # ------------------------------------------------------------ memoisation
+    def _generations(self, include_logs: bool) -> Optional[Tuple[int, int]]:
+        """Data generation of the repositories, or None if one cannot report it."""
+        task_gen = getattr(self._task_repo, "generation", None)
+        if task_gen is None:
+            return None
+        if not include_logs or self._log_repo is None:
+            return (task_gen, 0)
+        log_gen = getattr(self._log_repo, "generation", None)
+        if log_gen is None:
+            return None
+        return (task_gen, log_gen)
+
+    def _memoized(self, name: str, include_logs: bool, builder: Callable[[], _T]) -> _T:
+        key = self._generations(include_logs)
+        if key is None:
+            return builder()
+        with self._memo_lock:
+            cached = self._memo.get(name)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        value = builder()
+        with self._memo_lock:
+            self._memo[name] = (key, value)
+        return value
+
+    def _sorted_active_tasks(self) -> List[Task]:
+        return self._memoized(
+            "sorted_tasks",
+            False,
+            lambda: self._sort_tasks(self._task_repo.list_active_tasks()),
+        )
 
     def _sort_tasks(self, tasks: List[Task]) -> List[Task]:
         return sorted(
@@ -31,39 +69,47 @@ class TaskSummaryService:
             ),
         )
 
-    def _build_logs_map(self) -> Dict[str, List[Dict[str, str]]]:
-        logs_map: Dict[str, List[Dict[str, str]]] = defaultdict(list)
+    def _build_logs_map(self, tasks: List[Task]) -> Dict[str, List[Dict[str, str]]]:
+        logs_map: Dict[str, List[Dict[str, str]]] = {}
         if not self._log_repo:
             return logs_map
-        for log in self._log_repo.list_logs():
-            if log.task_id:
-                logs_map[log.task_id].append(
-                    {
-                        "id": log.id,
-                        "name": log.name,
-                        "status": log.status,
-                        "content": log.content,
-                    }
-                )
+        for task in tasks:
+            logs = [
+                {
+                    "id": log.id,
+                    "name": log.name,
+                    "status": log.status,
+                    "content": log.content,
+                }
+                for log in self._log_repo.query_logs(task_id=task.id, newest_first=False)
+            ]
+            if logs:
+                logs_map[task.id] = logs
         return logs_map
 
+    def _latest_log_content(self, task_id: str) -> str:
+        if not self._log_repo:
+            return ""
+        latest = self._log_repo.query_logs(task_id=task_id, limit=1).first()
+        return latest.content if latest else ""
+
     def build_today_summary(self, limit: int = 10) -> str:
-        tasks = self._task_repo.list_active_tasks()
+        return self._memoized(
+            f"today_summary:{limit}", True, lambda: self._render_today_summary(limit)
+        )
+
+    def _render_today_summary(self, limit: int) -> str:
+        tasks = self._sorted_active_tasks()
         if not tasks:
             return "_今日暂无待办，保持节奏，找事做。_"
-        logs_map = self._build_logs_map()
         items: List[str] = []
-        for task in self._sort_tasks(tasks)[:limit]:
-            url = task.page_url or f"https://www.notion.so/{task.id.replace('-', '')}"
+        for task in tasks[:limit]:
+            url = task.url or notion_page_url(task.id)
             due = self._escape(task.due_date or "未设")
             priority = self._escape(task.priority)
             status = self._escape(task.status)
             content = self._escape(task.content or "")
-            latest_log = (
-                logs_map.get(task.id, [{}])[-1].get("content", "")
-                if logs_map.get(task.id)
-                else ""
-            )
+            latest_log = self._latest_log_content(task.id)
             log_text = f"｜最新：{self._escape(latest_log[:60])}" if latest_log else ""
             name = self._escape(task.name)
             line = f"- [{name}]({url}) ｜状态:{status} ｜优先级:{priority} ｜截止:{due} {log_text}\n  内容: {content}"
@@ -86,10 +132,26 @@ class TaskSummaryService:
         return grouped
 
     def build_task_payloads(self) -> List[Dict[str, Any]]:
-        tasks = self._task_repo.list_active_tasks()
-        logs_map = self._build_logs_map()
+        """Serialised active tasks, sorted by priority and due date.
+
+        The result is cached until the task or log repository changes; the list
+        is a fresh copy but the payload dicts are shared and must not be mutated.
+        """
+        return list(self._memoized("payloads", True, self._render_task_payloads))
+
+    def get_task_payload(self, task_id: str) -> Optional[Dict[str, Any]]:
+        index = self._memoized(
+            "payload_index",
+            True,
+            lambda: {payload["id"]: payload for payload in self.build_task_payloads()},
+        )
+        return index.get(task_id)
+
+    def _render_task_payloads(self) -> List[Dict[str, Any]]:
+        tasks = self._sorted_active_tasks()
+        logs_map = self._memoized("logs_map", True, lambda: self._build_logs_map(tasks))
         payloads: List[Dict[str, Any]] = []
-        for task in self._sort_tasks(tasks):
+        for task in tasks:
             payloads.append(
                 {
                     "id": task.id,
@@ -101,7 +163,7 @@ class TaskSummaryService:
                     "project": task.project_name,
                     "content": task.content,
                     "subtasks": task.subtask_names,
-                    "url": task.page_url,
+                    "url": task.url,
                     "logs": logs_map.get(task.id, []),
                 }
             )
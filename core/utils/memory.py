@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import sys
+from dataclasses import fields, is_dataclass
+from typing import Any, Dict, Iterable, Set
+
+
+def deep_sizeof(obj: Any, seen: Set[int] | None = None) -> int:
+    """Approximate retained size of ``obj`` in bytes.
+
+    Objects already present in ``seen`` are skipped, so passing the same set
+    for a whole collection counts shared (interned) strings only once.
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, int, float, bool)) or obj is None:
+        return size
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += deep_sizeof(key, seen) + deep_sizeof(value, seen)
+        return size
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        for item in obj:
+            size += deep_sizeof(item, seen)
+        return size
+    if is_dataclass(obj):
+        for item in fields(obj):
+            size += deep_sizeof(getattr(obj, item.name), seen)
+        return size
+    if hasattr(obj, "__dict__"):
+        size += deep_sizeof(vars(obj), seen)
+    return size
+
+
+def footprint(entities: Iterable[Any]) -> Dict[str, int]:
+    seen: Set[int] = set()
+    count = 0
+    total = 0
+    for entity in entities:
+        count += 1
+        total += deep_sizeof(entity, seen)
+    return {
+        "entities": count,
+        "bytes": total,
+        "bytes_per_entity": total // count if count else 0,
+    }
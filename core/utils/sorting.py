@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+import bisect
+from typing import Any, List
+
+
+def remove_sorted(items: List[Any], key: Any) -> bool:
+    """Remove ``key`` from the sorted list ``items`` by bisection."""
+    index = bisect.bisect_left(items, key)
+    if index < len(items) and items[index] == key:
+        items.pop(index)
+        return True
+    return False
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, List, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_KEYS = ("prompt_tokens", "completion_tokens", "cached_tokens")
+
+
+class Histogram:
+    """Latency samples for one span name.
+
+    Only the newest ``window`` samples are kept for percentiles, so the
+    numbers follow recent behaviour; ``count`` and ``total_ms`` are lifetime.
+    """
+
+    def __init__(self, window: int = 500):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.total_ms = 0.0
+
+    def add(self, value_ms: float) -> None:
+        self._samples.append(value_ms)
+        self.count += 1
+        self.total_ms += value_ms
+
+    def percentile(self, q: float) -> float:
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        rank = max(1, math.ceil(q * len(ordered)))
+        return ordered[rank - 1]
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "p50_ms": round(self.percentile(0.5), 1),
+            "p95_ms": round(self.percentile(0.95), 1),
+            "max_ms": round(max(self._samples, default=0.0), 1),
+        }
+
+
+class Telemetry:
+    """Process-wide timing spans and token counters.
+
+    ``span`` times a block into the histogram of that name (``turn``,
+    ``llm_call``, ``tool:<name>``, ``telegram_send``, ``repo_load:<file>`` …).
+    Token counters are keyed by scope such as ``chat:<id>`` or ``tool:<name>``.
+    """
+
+    def __init__(self, window: int = 500):
+        self._window = window
+        self._timings: Dict[str, Histogram] = {}
+        self._tokens: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        self._reporter: Optional[threading.Thread] = None
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, (time.perf_counter() - started) * 1000)
+
+    def observe(self, name: str, value_ms: float) -> None:
+        with self._lock:
+            histogram = self._timings.get(name)
+            if histogram is None:
+                histogram = self._timings[name] = Histogram(self._window)
+            histogram.add(value_ms)
+
+    def add_tokens(self, scope: str, counts: Mapping[str, Any]) -> None:
+        with self._lock:
+            bucket = self._tokens.setdefault(scope, {})
+            for key, value in counts.items():
+                if isinstance(value, int) and value:
+                    bucket[key] = bucket.get(key, 0) + value
+
+    def add_usage(self, chat_id: int, usage: Optional[Mapping[str, Any]]) -> None:
+        """Count the prompt/completion/cached tokens of one LLM response."""
+        if usage:
+            self.add_tokens(f"chat:{chat_id}", {key: usage.get(key) for key in _TOKEN_KEYS})
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "timings": {name: hist.to_dict() for name, hist in self._timings.items()},
+                "tokens": {scope: dict(counts) for scope, counts in self._tokens.items()},
+            }
+
+    def report_lines(self) -> List[str]:
+        snapshot = self.snapshot()
+        lines: List[str] = []
+        for name, data in sorted(snapshot["timings"].items()):
+            lines.append(
+                f"{name}: n={data['count']} p50={data['p50_ms']:.0f}ms"
+                f" p95={data['p95_ms']:.0f}ms max={data['max_ms']:.0f}ms"
+            )
+        for scope, counts in sorted(snapshot["tokens"].items()):
+            parts = " ".join(f"{key}={value}" for key, value in sorted(counts.items()))
+            lines.append(f"{scope}: {parts}")
+        return lines
+
+    def reset(self) -> None:
+        with self._lock:
+            self._timings.clear()
+            self._tokens.clear()
+
+    def start_reporter(self, interval_seconds: int) -> Optional[threading.Thread]:
+        """Log the report every ``interval_seconds``; returns the worker thread."""
+        if interval_seconds <= 0 or self._reporter is not None:
+            return self._reporter
+
+        def _loop() -> None:
+            while True:
+                time.sleep(interval_seconds)
+                lines = self.report_lines()
+                if lines:
+                    logger.info("[Telemetry] %s", " | ".join(lines))
+
+        self._reporter = threading.Thread(target=_loop, name="TelemetryReporter", daemon=True)
+        self._reporter.start()
+        return self._reporter
+
+
+# Shared by the agent, the Telegram client and the repositories so one /stats
+# view covers the whole turn.
+telemetry = Telemetry()
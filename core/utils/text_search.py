@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Hashable, Iterable, List, Mapping, Optional, Tuple
+
+_CJK = r"\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff"
+_TOKEN_RE = re.compile(f"[{_CJK}]+|[a-z0-9]+")
+_CJK_RE = re.compile(f"[{_CJK}]")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Latin/digit words plus overlapping bigrams of CJK runs.
+
+    A single CJK character on its own is kept as a unigram so that one-character
+    queries still match.
+    """
+    if not text:
+        return []
+    tokens: List[str] = []
+    for run in _TOKEN_RE.findall(text.lower()):
+        if not _CJK_RE.match(run):
+            tokens.append(run)
+        elif len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[idx : idx + 2] for idx in range(len(run) - 1))
+    return tokens
+
+
+@dataclass(slots=True)
+class SearchHit:
+    doc_id: Hashable
+    score: float
+    terms: List[str] = field(default_factory=list)
+
+
+class InvertedIndex:
+    """In-memory BM25F index over documents made of named text fields.
+
+    ``boosts`` weights each field's term frequency before saturation, so a term
+    in a heavily boosted field (e.g. a title) counts more than the same term in
+    a long body. Documents can be added, replaced and removed at any time.
+    """
+
+    def __init__(
+        self,
+        boosts: Mapping[str, float],
+        k1: float = 1.2,
+        b: float = 0.75,
+    ):
+        self._boosts = dict(boosts)
+        self._k1 = k1
+        self._b = b
+        # term -> doc_id -> field -> term frequency
+        self._postings: Dict[str, Dict[Hashable, Dict[str, int]]] = {}
+        self._lengths: Dict[Hashable, Dict[str, int]] = {}
+        self._doc_terms: Dict[Hashable, List[str]] = {}
+        self._total_lengths: Dict[str, int] = {name: 0 for name in self._boosts}
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def __contains__(self, doc_id: Hashable) -> bool:
+        return doc_id in self._lengths
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self._lengths.clear()
+        self._doc_terms.clear()
+        self._total_lengths = {name: 0 for name in self._boosts}
+
+    def add(self, doc_id: Hashable, fields: Mapping[str, Optional[str]]) -> None:
+        self.remove(doc_id)
+        lengths: Dict[str, int] = {}
+        terms: Dict[str, None] = {}
+        for name in self._boosts:
+            tokens = tokenize(fields.get(name))
+            lengths[name] = len(tokens)
+            self._total_lengths[name] += len(tokens)
+            for term, count in Counter(tokens).items():
+                self._postings.setdefault(term, {}).setdefault(doc_id, {})[name] = count
+                terms[term] = None
+        self._lengths[doc_id] = lengths
+        self._doc_terms[doc_id] = list(terms)
+
+    def remove(self, doc_id: Hashable) -> bool:
+        lengths = self._lengths.pop(doc_id, None)
+        if lengths is None:
+            return False
+        for name, length in lengths.items():
+            self._total_lengths[name] -= length
+        for term in self._doc_terms.pop(doc_id, ()):
+            docs = self._postings.get(term)
+            if docs is not None:
+                docs.pop(doc_id, None)
+                if not docs:
+                    del self._postings[term]
+        return True
+
+    def search(self, query: str, limit: int = 5) -> List[SearchHit]:
+        terms = list(dict.fromkeys(tokenize(query)))
+        total_docs = len(self._lengths)
+        if not terms or not total_docs:
+            return []
+        averages = {
+            name: (self._total_lengths[name] / total_docs) or 1.0 for name in self._boosts
+        }
+        scores: Dict[Hashable, float] = {}
+        matched: Dict[Hashable, List[str]] = {}
+        for term in terms:
+            docs = self._postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1 + (total_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            for doc_id, frequencies in docs.items():
+                lengths = self._lengths[doc_id]
+                weighted = 0.0
+                for name, count in frequencies.items():
+                    norm = 1 - self._b + self._b * lengths[name] / averages[name]
+                    weighted += self._boosts[name] * count / norm
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * weighted / (self._k1 + weighted)
+                matched.setdefault(doc_id, []).append(term)
+        ranked: List[Tuple[Hashable, float]] = sorted(
+            scores.items(), key=lambda item: item[1], reverse=True
+        )
+        return [SearchHit(doc_id, score, matched[doc_id]) for doc_id, score in ranked[:limit]]
+
+
+def snippet(text: Optional[str], terms: Iterable[str], width: int = 60) -> Optional[str]:
+    """Window of ``text`` around the first occurrence of any of ``terms``."""
+    if not text:
+        return None
+    lowered = text.lower()
+    positions = [lowered.find(term) for term in terms]
+    positions = [pos for pos in positions if pos >= 0]
+    if not positions:
+        return None
+    start = max(0, min(positions) - width // 3)
+    end = min(len(text), start + width)
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if end < len(text) else ""
+    return f"{prefix}{text[start:end].strip()}{suffix}"
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, time, timedelta, timezone
+from typing import Optional
 
 CURRENT_TZ = timezone(timedelta(hours=8))
 
@@ -24,6 +25,19 @@ def local_now() -> datetime:
     return datetime.now(tz=CURRENT_TZ)
 
 
+def parse_due(value: Optional[str]) -> Optional[datetime]:
+    """Local due moment of a Notion due date; a bare date is due by the end of that day."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if len(value) <= 10:
+        parsed = datetime.combine(parsed.date(), time.max)
+    return to_local(parsed)
+
+
 # Backward compatibility aliases
 to_beijing = to_local
 format_beijing = format_local
@@ -64,6 +64,7 @@ class LogsProcessor:
             "content": md_text,
             "task_id": task_id,
             "task_name": task_name,
+            "created_at": item.get("created_time"),
         }
 
     def _fetch_page_markdown(self, page_id: str) -> str:
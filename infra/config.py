@@ -19,6 +19,17 @@ class TelegramSettings:
     token: str
     poll_timeout: int
     admin_ids: Tuple[int, ...]
+    workers: int = 4
+    max_pending_updates: int = 100
+    runtime: str = "threads"
+    webhook_url: str = ""
+    webhook_secret: str = ""
+    webhook_host: str = "0.0.0.0"
+    webhook_port: int = 8443
+    send_rate_global: float = 30.0
+    send_rate_per_chat: float = 1.0
+    checkpoint_durability: str = "batched"
+    checkpoint_flush_seconds: float = 2.0
 
 
 @dataclass(frozen=True)
@@ -39,6 +50,14 @@ class NotionSettings:
     api_version: str
 
 
+@dataclass(frozen=True)
+class LLMEndpoint:
+    provider: str
+    base_url: str
+    model: str
+    api_key: str | None
+
+
 @dataclass(frozen=True)
 class LLMSettings:
     provider: str
@@ -47,6 +66,20 @@ class LLMSettings:
     api_key: str | None
     temperature: float
     enabled: bool
+    tool_payload_tokens: int = 3000
+    stream: bool = True
+    history_tokens: int = 2000
+    intent_threshold: float = 0.8
+    timeout_seconds: float = 30.0
+    stream_deadline_seconds: float = 120.0
+    max_retries: int = 1
+    breaker_failures: int = 3
+    breaker_reset_seconds: float = 60.0
+    hedge_after_seconds: float | None = None
+    max_concurrent_turns: int = 4
+    fallbacks: tuple[LLMEndpoint, ...] = ()
+    run_log_redact: bool = False
+    run_log_sample_rate: float = 0.0
 
 
 @dataclass(frozen=True)
@@ -74,6 +107,7 @@ class Settings:
     tracker_follow_up: int
     proactivity: ProactivitySettings
     timezone_offset_hours: int
+    telemetry_report_seconds: int = 600
 
 
 def _default_root() -> Path:
@@ -147,6 +181,32 @@ def load_settings(
             token=telegram_token,
             poll_timeout=poll_timeout,
             admin_ids=admin_ids,
+            workers=int(telegram_cfg.get("workers") or os.getenv("TELEGRAM_WORKERS", "4")),
+            max_pending_updates=int(
+                telegram_cfg.get("max_pending_updates")
+                or os.getenv("TELEGRAM_MAX_PENDING_UPDATES", "100")
+            ),
+            runtime=str(telegram_cfg.get("runtime") or os.getenv("TELEGRAM_RUNTIME", "threads")).lower(),
+            webhook_url=(telegram_cfg.get("webhook_url") or os.getenv("TELEGRAM_WEBHOOK_URL", "")).strip(),
+            webhook_secret=(
+                telegram_cfg.get("webhook_secret") or os.getenv("TELEGRAM_WEBHOOK_SECRET", "")
+            ).strip(),
+            webhook_host=telegram_cfg.get("webhook_host") or os.getenv("TELEGRAM_WEBHOOK_HOST", "0.0.0.0"),
+            webhook_port=int(telegram_cfg.get("webhook_port") or os.getenv("TELEGRAM_WEBHOOK_PORT", "8443")),
+            send_rate_global=float(
+                telegram_cfg.get("send_rate_global") or os.getenv("TELEGRAM_SEND_RATE_GLOBAL", "30")
+            ),
+            send_rate_per_chat=float(
+                telegram_cfg.get("send_rate_per_chat") or os.getenv("TELEGRAM_SEND_RATE_PER_CHAT", "1")
+            ),
+            checkpoint_durability=str(
+                telegram_cfg.get("checkpoint_durability")
+                or os.getenv("TELEGRAM_CHECKPOINT_DURABILITY", "batched")
+            ).lower(),
+            checkpoint_flush_seconds=float(
+                telegram_cfg.get("checkpoint_flush_seconds")
+                or os.getenv("TELEGRAM_CHECKPOINT_FLUSH_SECONDS", "2")
+            ),
         )
     elif require_telegram:
         raise RuntimeError("TELEGRAM_BOT_TOKEN is not configured.")
@@ -188,6 +248,66 @@ def load_settings(
         llm_cfg.get("temperature")
         or os.getenv("LLM_TEMPERATURE", "0.3")
     )
+    tool_payload_tokens = int(
+        llm_cfg.get("tool_payload_tokens")
+        or os.getenv("LLM_TOOL_PAYLOAD_TOKENS", "3000")
+    )
+    history_tokens = int(
+        llm_cfg.get("history_tokens")
+        or os.getenv("LLM_HISTORY_TOKENS", "2000")
+    )
+    intent_threshold = float(
+        llm_cfg.get("intent_threshold")
+        or os.getenv("LLM_INTENT_THRESHOLD", "0.8")
+    )
+    timeout_seconds = float(
+        llm_cfg.get("timeout_seconds")
+        or os.getenv("LLM_TIMEOUT_SECONDS", "30")
+    )
+    stream_deadline_seconds = float(
+        llm_cfg.get("stream_deadline_seconds")
+        or os.getenv("LLM_STREAM_DEADLINE_SECONDS", "120")
+    )
+    max_retries_value = llm_cfg.get("max_retries")
+    if max_retries_value is None:
+        max_retries_value = os.getenv("LLM_MAX_RETRIES", "1")
+    max_retries = int(max_retries_value)
+    breaker_failures = int(
+        llm_cfg.get("breaker_failures")
+        or os.getenv("LLM_BREAKER_FAILURES", "3")
+    )
+    breaker_reset_seconds = float(
+        llm_cfg.get("breaker_reset_seconds")
+        or os.getenv("LLM_BREAKER_RESET_SECONDS", "60")
+    )
+    hedge_value = llm_cfg.get("hedge_after_seconds") or os.getenv("LLM_HEDGE_AFTER_SECONDS")
+    hedge_after_seconds = float(hedge_value) if hedge_value else None
+    max_concurrent_turns = int(
+        llm_cfg.get("max_concurrent_turns")
+        or os.getenv("LLM_MAX_CONCURRENT_TURNS", "4")
+    )
+    fallbacks = tuple(
+        LLMEndpoint(
+            provider=item.get("provider") or provider,
+            base_url=item.get("base_url") or base_url,
+            model=item["model"],
+            api_key=(item.get("api_key") or api_key or "").strip() or None,
+        )
+        for item in llm_cfg.get("fallbacks", [])
+        if item.get("model")
+    )
+    redact_value = llm_cfg.get("run_log_redact")
+    if redact_value is None:
+        redact_value = os.getenv("LLM_RUN_LOG_REDACT", "false").strip().lower() in {"1", "true", "yes", "on"}
+    run_log_redact = bool(redact_value)
+    run_log_sample_rate = float(
+        llm_cfg.get("run_log_sample_rate")
+        or os.getenv("LLM_RUN_LOG_SAMPLE_RATE", "0")
+    )
+    stream_value = llm_cfg.get("stream")
+    if stream_value is None:
+        stream_value = os.getenv("LLM_STREAM", "true").strip().lower() in {"1", "true", "yes", "on"}
+    stream = bool(stream_value)
     llm_settings = LLMSettings(
         provider=provider,
         base_url=base_url,
@@ -195,6 +315,20 @@ def load_settings(
         api_key=api_key.strip() if isinstance(api_key, str) else None,
         temperature=temperature,
         enabled=bool(api_key),
+        tool_payload_tokens=tool_payload_tokens,
+        stream=stream,
+        history_tokens=history_tokens,
+        intent_threshold=intent_threshold,
+        timeout_seconds=timeout_seconds,
+        stream_deadline_seconds=stream_deadline_seconds,
+        max_retries=max_retries,
+        breaker_failures=breaker_failures,
+        breaker_reset_seconds=breaker_reset_seconds,
+        hedge_after_seconds=hedge_after_seconds,
+        max_concurrent_turns=max(1, max_concurrent_turns),
+        fallbacks=fallbacks,
+        run_log_redact=run_log_redact,
+        run_log_sample_rate=run_log_sample_rate,
     )
 
     tracker_cfg = config.get("tracker", {})
@@ -242,6 +376,9 @@ def load_settings(
         general_cfg.get("timezone_offset_hours")
         or os.getenv("TIMEZONE_OFFSET_HOURS", "8")
     )
+    telemetry_report_seconds = int(
+        general_cfg.get("telemetry_report_seconds", os.getenv("TELEMETRY_REPORT_SECONDS", "600"))
+    )
 
     settings = Settings(
         telegram=telegram_settings,
@@ -265,6 +402,7 @@ def load_settings(
         tracker_follow_up=tracker_follow_up,
         proactivity=proactivity_settings,
         timezone_offset_hours=timezone_offset,
+        telemetry_report_seconds=telemetry_report_seconds,
     )
     try:
         from core.utils import timezone as tz
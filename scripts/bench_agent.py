@@ -0,0 +1,289 @@
+"""Replay conversations through CommandRouter against a local fake LLM.
+
+Measures end-to-end turn latency, LLM prompt size, per-stage timings from
+``core.utils.telemetry`` and allocated memory blocks, without network access.
+
+    python scripts/bench_agent.py --fixture databases/telegram_history/agent_runs/123.jsonl
+    python scripts/bench_agent.py --tasks 500 --logs 2000 --repeat 3 --json > run.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from itertools import count
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from apps.telegram_bot.handlers import CommandRouter
+from apps.telegram_bot.history import HistoryStore
+from core.llm.agent import LLMAgent
+from core.llm.context_builder import AgentContextBuilder
+from core.llm.conversation_window import ConversationWindow
+from core.llm.fake_server import FakeLLMServer
+from core.llm.history_recall import HistoryRecall
+from core.llm.intents import IntentRouter
+from core.llm.openai_client import OpenAIChatClient
+from core.llm.tool_selector import ToolSelector
+from core.llm.tools import build_default_tools
+from core.repositories import LogRepository, ProjectRepository, TaskRepository
+from core.services import LogbookService, StatusGuard, TaskSearchIndex, TaskSummaryService
+from core.utils.telemetry import Histogram, telemetry
+
+SAMPLE_CONVERSATION = [
+    "今天有什么任务？",
+    "帮我找一下周报相关的任务",
+    "回顾一下最近的日志",
+    "记录：完成了接口联调",
+    "我有点累，先休息一下",
+    "下午应该先做哪件事？",
+    "休息 20 分钟",
+    "晚上还有什么安排？",
+]
+
+
+class BenchTelegramClient:
+    """Records outgoing messages in the history store instead of calling Telegram."""
+
+    def __init__(self, history: HistoryStore, latency_ms: float = 0.0):
+        self._history = history
+        self._latency = latency_ms / 1000
+        self._ids = count(1_000_000)
+        self.sent = 0
+
+    def send_message(self, chat_id: int, text: str, parse_mode: Optional[str] = "Markdown",
+                     record_history: bool = True, **kwargs: Any) -> Dict[str, Any]:
+        with telemetry.span("telegram_send"):
+            time.sleep(self._latency)
+        message = {"message_id": next(self._ids), "chat": {"id": chat_id}, "date": int(time.time()), "text": text}
+        self.sent += 1
+        if record_history:
+            self._history.append_bot(message)
+        return message
+
+    def edit_message_text(self, chat_id: int, message_id: int, text: str, parse_mode: Optional[str] = "Markdown",
+                          record_history: bool = False, **kwargs: Any) -> Dict[str, Any]:
+        with telemetry.span("telegram_edit"):
+            time.sleep(self._latency)
+        message = {"message_id": message_id, "chat": {"id": chat_id}, "date": int(time.time()), "text": text}
+        if record_history:
+            self._history.append_bot(message)
+        return message
+
+    def send_chat_action(self, chat_id: int, action: str = "typing") -> None:
+        return None
+
+
+def load_fixture(path: Optional[Path]) -> List[Dict[str, Any]]:
+    """Turns to replay as ``{"chat_id", "text"}``.
+
+    Accepts ``agent_runs`` logs (``user_text``) as well as JSON lines carrying
+    ``text`` or ``body``; without a fixture the built-in sample is used.
+    """
+    if path is None:
+        return [{"chat_id": 1, "text": text} for text in SAMPLE_CONVERSATION]
+    turns: List[Dict[str, Any]] = []
+    with path.open("r", encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            text = record.get("user_text") or record.get("text") or record.get("body")
+            if text:
+                turns.append({"chat_id": int(record.get("chat_id") or 1), "text": str(text)})
+    return turns
+
+
+def seed_repositories(data_dir: Path, tasks: int, logs: int, seed: int = 7) -> None:
+    """Write synthetic processed task/log JSON of the requested size."""
+    rng = random.Random(seed)
+    statuses = ["Todo", "In Progress", "Undecomposed", "Done"]
+    priorities = ["High", "Medium", "Low"]
+    projects = [f"项目{idx}" for idx in range(max(1, tasks // 20))]
+    task_payload = {}
+    for idx in range(tasks):
+        project = rng.choice(projects)
+        task_payload[f"task-{idx:05d}"] = {
+            "name": f"{rng.choice(['周报', '接口', '论文', '复盘', '设计', '测试'])}任务{idx}",
+            "priority": rng.choice(priorities),
+            "status": rng.choice(statuses),
+            "content": "需要完成的内容描述。" * rng.randint(1, 8),
+            "project_id": f"proj-{projects.index(project)}",
+            "project_name": project,
+            "due_date": f"2030-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "subtask_names": [f"子任务{n}" for n in range(rng.randint(0, 4))],
+        }
+    task_ids = list(task_payload)
+    log_payload = {}
+    for idx in range(logs):
+        task_id = rng.choice(task_ids) if task_ids else None
+        log_payload[f"log-{idx:06d}"] = {
+            "name": f"日志{idx}",
+            "status": rng.choice(["Done", "In Progress"]),
+            "content": "今天推进了一部分工作，遇到了一些问题。" * rng.randint(1, 5),
+            "task_id": task_id,
+            "task_name": task_payload[task_id]["name"] if task_id else "",
+            "created_at": f"2030-01-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00+08:00",
+        }
+    data_dir.mkdir(parents=True, exist_ok=True)
+    for name, payload in (("processed_tasks", task_payload), ("processed_logs", log_payload), ("processed_projects", {})):
+        (data_dir / f"{name}.json").write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+
+
+def build_router(workdir: Path, base_url: str, stream: bool, telegram_ms: float):
+    data_dir = workdir / "json"
+    history = HistoryStore(workdir / "history")
+    task_repo = TaskRepository(data_dir / "processed_tasks.json", data_dir / "agent_tasks.json")
+    log_repo = LogRepository(data_dir / "processed_logs.json", data_dir / "agent_logs.json")
+    project_repo = ProjectRepository(data_dir / "processed_projects.json")
+    task_service = TaskSummaryService(task_repo, project_repo, log_repo)
+    logbook_service = LogbookService(log_repo, task_repo)
+    status_guard = StatusGuard(task_repo)
+    tools = build_default_tools(
+        task_service,
+        logbook_service,
+        status_guard,
+        task_repository=task_repo,
+        log_repository=log_repo,
+        history_store=history,
+        search_index=TaskSearchIndex(task_repo, log_repo),
+    )
+    agent = LLMAgent(
+        context_builder=AgentContextBuilder(
+            history,
+            ROOT / "docs" / "user_profile_doc.md",
+            window=ConversationWindow(),
+            recall=HistoryRecall(history),
+        ),
+        task_service=task_service,
+        logbook_service=logbook_service,
+        status_guard=status_guard,
+        tools=tools,
+        llm_client=OpenAIChatClient(api_key="bench", base_url=base_url, model="fake", max_retries=0),
+        intent_router=IntentRouter(),
+        tool_selector=ToolSelector(tools),
+    )
+    client = BenchTelegramClient(history, latency_ms=telegram_ms)
+    router = CommandRouter(
+        client=client,
+        history_store=history,
+        agent=agent,
+        task_repo=task_repo,
+        log_repo=log_repo,
+        stream_replies=stream,
+        stream_edit_interval=0.2,
+    )
+    return router, client
+
+
+def replay(
+    turns: Iterable[Dict[str, Any]],
+    repeat: int = 1,
+    tasks: int = 200,
+    logs: int = 1000,
+    first_token_ms: float = 200.0,
+    tokens_per_second: float = 50.0,
+    telegram_ms: float = 0.0,
+    stream: bool = False,
+) -> Dict[str, Any]:
+    """Run every turn ``repeat`` times and return the aggregated measurements."""
+    turns = list(turns)
+    telemetry.reset()
+    wall = Histogram(window=100_000)
+    prompt = Histogram(window=100_000)
+    blocks: List[int] = []
+    with tempfile.TemporaryDirectory(prefix="agent-bench-") as tmp, FakeLLMServer(
+        first_token_ms=first_token_ms, tokens_per_second=tokens_per_second
+    ) as server:
+        workdir = Path(tmp)
+        seed_repositories(workdir / "json", tasks, logs)
+        router, _ = build_router(workdir, server.base_url, stream, telegram_ms)
+        ids = count(1)
+        for _ in range(repeat):
+            for turn in turns:
+                update_id = next(ids)
+                update = {
+                    "update_id": update_id,
+                    "message": {
+                        "message_id": update_id,
+                        "chat": {"id": turn["chat_id"]},
+                        "from": {"id": turn["chat_id"]},
+                        "date": int(time.time()),
+                        "text": turn["text"],
+                    },
+                }
+                seen = len(server.requests)
+                before = sys.getallocatedblocks()
+                started = time.perf_counter()
+                router.handle(update)
+                wall.add((time.perf_counter() - started) * 1000)
+                blocks.append(sys.getallocatedblocks() - before)
+                for request in server.requests[seen:]:
+                    prompt.add(request.prompt_tokens)
+        llm_requests = len(server.requests)
+    snapshot = telemetry.snapshot()
+    return {
+        "turns": wall.count,
+        "llm_requests": llm_requests,
+        "turn_ms": wall.to_dict(),
+        "prompt_tokens": {
+            "count": prompt.count,
+            "p50": prompt.percentile(0.5),
+            "p95": prompt.percentile(0.95),
+            "max": prompt.percentile(1.0),
+        },
+        "alloc_blocks_per_turn": round(sum(blocks) / len(blocks), 1) if blocks else 0.0,
+        "stages": snapshot["timings"],
+        "tokens": snapshot["tokens"],
+    }
+
+
+def _print_report(result: Dict[str, Any]) -> None:
+    turn = result["turn_ms"]
+    prompt = result["prompt_tokens"]
+    print(f"turns={result['turns']} llm_requests={result['llm_requests']}")
+    print(f"turn:  p50={turn['p50_ms']:.0f}ms p95={turn['p95_ms']:.0f}ms max={turn['max_ms']:.0f}ms")
+    print(f"prompt tokens: p50={prompt['p50']:.0f} p95={prompt['p95']:.0f} max={prompt['max']:.0f}")
+    print(f"allocated blocks per turn: {result['alloc_blocks_per_turn']}")
+    for name, data in sorted(result["stages"].items()):
+        print(f"  {name:<28} n={data['count']:<5} p50={data['p50_ms']:.1f}ms p95={data['p95_ms']:.1f}ms")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fixture", type=Path, help="JSONL with user_text/text/body per line (e.g. agent_runs logs)")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--tasks", type=int, default=200, help="synthetic tasks to seed")
+    parser.add_argument("--logs", type=int, default=1000, help="synthetic logs to seed")
+    parser.add_argument("--first-token-ms", type=float, default=200.0)
+    parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--telegram-ms", type=float, default=0.0, help="simulated Telegram API latency")
+    parser.add_argument("--stream", action="store_true", help="stream replies through LiveMessage")
+    parser.add_argument("--json", action="store_true", help="print the raw result as JSON")
+    args = parser.parse_args(argv)
+    result = replay(
+        load_fixture(args.fixture),
+        repeat=args.repeat,
+        tasks=args.tasks,
+        logs=args.logs,
+        first_token_ms=args.first_token_ms,
+        tokens_per_second=args.tokens_per_second,
+        telegram_ms=args.telegram_ms,
+        stream=args.stream,
+    )
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        _print_report(result)
+
+
+if __name__ == "__main__":
+    main()
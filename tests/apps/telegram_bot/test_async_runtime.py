@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from apps.telegram_bot.async_runtime import AsyncBotRuntime, BlockingTelegramClient, loop_timer_factory
+from apps.telegram_bot.clients import AsyncTelegramBotClient
+from core.llm.async_openai_client import AsyncOpenAIChatClient, BlockingChatClient
+from core.llm.fake_server import FakeLLMServer
+
+
+class _History:
+    def __init__(self):
+        self.checkpoints = []
+
+    def record_update_checkpoint(self, update_id):
+        self.checkpoints.append(update_id)
+
+
+class _Router:
+    def __init__(self):
+        self.handled = []
+        self.threads = set()
+
+    def handle(self, update):
+        if update["message"]["chat"]["id"] == 1:
+            time.sleep(0.05)
+        self.handled.append(update["update_id"])
+        self.threads.add(threading.current_thread().name)
+
+
+def _update(update_id, chat_id):
+    return {"update_id": update_id, "message": {"message_id": update_id, "chat": {"id": chat_id}, "text": "hi"}}
+
+
+def test_async_runtime_orders_per_chat_and_checkpoints_watermark():
+    history, router = _History(), _Router()
+
+    async def _scenario():
+        runtime = AsyncBotRuntime(None, history, router, ThreadPoolExecutor(max_workers=4), max_pending=10)
+        for update_id, chat_id in [(1, 1), (2, 2), (3, 1), (4, 2)]:
+            await runtime.submit(_update(update_id, chat_id))
+        while len(router.handled) < 4 or history.checkpoints[-1:] != [4]:
+            await asyncio.sleep(0.01)
+
+    asyncio.run(asyncio.wait_for(_scenario(), timeout=5))
+    assert router.handled.index(1) < router.handled.index(3)
+    assert router.handled.index(2) < router.handled.index(1)  # chat 2 did not wait for chat 1
+    assert history.checkpoints == sorted(history.checkpoints)
+
+
+def test_async_polling_deletes_the_webhook_before_get_updates():
+    calls = []
+
+    class _Client:
+        async def delete_webhook(self):
+            calls.append("deleteWebhook")
+
+        async def get_updates(self, offset=None, timeout=25):
+            calls.append("getUpdates")
+            raise asyncio.CancelledError
+
+    class _PollingHistory(_History):
+        def last_update_id(self):
+            return None
+
+    async def _scenario():
+        runtime = AsyncBotRuntime(_Client(), _PollingHistory(), _Router(), ThreadPoolExecutor(max_workers=1))
+        try:
+            await runtime.run_forever()
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(_scenario())
+    assert calls == ["deleteWebhook", "getUpdates"]
+
+
+def test_loop_timers_fire_in_executor_and_can_be_cancelled():
+    fired = []
+
+    async def _scenario():
+        factory = loop_timer_factory(asyncio.get_running_loop(), ThreadPoolExecutor(max_workers=1))
+        keep = factory(0.01, fired.append, ("kept",))
+        dropped = factory(0.01, fired.append, ("dropped",))
+        keep.start()
+        dropped.start()
+        dropped.cancel()
+        await asyncio.sleep(0.1)
+
+    asyncio.run(_scenario())
+    assert fired == ["kept"]
+
+
+def test_blocking_chat_client_runs_requests_on_the_loop():
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        with FakeLLMServer(first_token_ms=0, tokens_per_second=0) as server:
+            client = BlockingChatClient(
+                AsyncOpenAIChatClient(api_key="test", base_url=server.base_url, model="fake", max_retries=0),
+                loop,
+            )
+            response = client.chat(messages=[{"role": "user", "content": "今天有什么任务？"}], tools=[])
+            deltas = list(client.chat_stream(messages=[{"role": "user", "content": "你好"}]))
+        assert [call.name for call in response.tool_calls] == ["today_tasks"]
+        assert deltas[-1].response.content
+        assert client.stats()["openai:fake"]["calls"] == 2
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+
+
+def test_replies_arrive_when_every_handler_thread_is_busy():
+    class _Response:
+        status_code = 200
+
+        def json(self):
+            return {"ok": True, "result": {"message_id": 1, "chat": {"id": 0}, "text": "ok"}}
+
+    class _Session:
+        def post(self, url, data=None, timeout=None):
+            time.sleep(0.01)
+            return _Response()
+
+    class _Store:
+        def __init__(self):
+            self.recorded = []
+
+        def append_bot(self, message):
+            self.recorded.append(message)
+
+    class _ReplyingRouter(_Router):
+        def __init__(self, client):
+            super().__init__()
+            self.client = client
+
+        def handle(self, update):
+            self.client.send_message(update["message"]["chat"]["id"], "收到")
+            self.handled.append(update["update_id"])
+
+    history, store = _History(), _Store()
+
+    async def _scenario():
+        loop = asyncio.get_running_loop()
+        handlers = ThreadPoolExecutor(max_workers=2)
+        # Even as the loop's default executor, the handler pool must not be
+        # needed by the client requests the handlers are blocked on.
+        loop.set_default_executor(handlers)
+        client = AsyncTelegramBotClient("token", store, session=_Session())
+        router = _ReplyingRouter(BlockingTelegramClient(client, loop))
+        runtime = AsyncBotRuntime(client, history, router, handlers, max_pending=10)
+        for update_id in range(1, 7):
+            await runtime.submit(_update(update_id, update_id))
+        while len(router.handled) < 6:
+            await asyncio.sleep(0.01)
+        await client.close()
+
+    asyncio.run(asyncio.wait_for(_scenario(), timeout=5))
+    assert len(store.recorded) == 6
@@ -6,7 +6,7 @@ from typing import List, Optional
 
 from apps.telegram_bot.handlers.commands import CommandRouter
 from apps.telegram_bot.history.history_store import HistoryStore
-from core.domain import Task
+from core.domain import Intervention, Task
 
 
 class DummyClient:
@@ -92,7 +92,7 @@ class DummyTracker:
         self.entries.clear()
 
 
-def _build_router(tmp_path, tracker=None):
+def _build_router(tmp_path, tracker=None, admin_ids=()):
     client = DummyClient()
     history = HistoryStore(root_dir=tmp_path / "history")
     tasks = [
@@ -124,6 +124,7 @@ def _build_router(tmp_path, tracker=None):
         history_store=history,
         task_repo=repo,
         tracker=tracker,
+        admin_ids=admin_ids,
     )
     return router, client, repo
 
@@ -235,3 +236,39 @@ def test_board_command_alias_of_next(tmp_path):
     router._handle_next(chat_id=1)
     next_text = client.messages[-1]["text"]
     assert board_text == next_text
+
+
+def test_replayed_update_is_not_handled_twice(tmp_path):
+    router, client, _ = _build_router(tmp_path)
+    update = {
+        "update_id": 7,
+        "message": {"message_id": 70, "date": 1700000000, "chat": {"id": 1}, "text": "/tasks"},
+    }
+    router.handle(update)
+    handled = len(client.messages)
+    assert handled > 0
+    # Same update fetched again after a crash before the checkpoint flush.
+    router.handle(update)
+    assert len(client.messages) == handled
+
+
+def test_deadline_alerts_go_only_to_admins(tmp_path):
+    alert = [Intervention(level="warning", message="任务 A 已逾期", reason="overdue")]
+    router, client, _ = _build_router(tmp_path / "open")
+    router.handle({"update_id": 1, "message": {"message_id": 1, "chat": {"id": 5}, "text": "/tasks"}})
+    client.messages.clear()
+    router.broadcast_interventions(alert)
+    assert client.messages == []
+
+    router, client, _ = _build_router(tmp_path / "admins", admin_ids=(42,))
+    router.broadcast_interventions(alert)
+    assert [message["chat_id"] for message in client.messages] == [42]
+
+
+def test_stats_is_limited_to_admins(tmp_path):
+    router, client, _ = _build_router(tmp_path, admin_ids=(42,))
+    router.handle({"update_id": 1, "message": {"message_id": 1, "chat": {"id": 5}, "text": "/stats"}})
+    router.handle({"update_id": 2, "message": {"message_id": 2, "chat": {"id": 42}, "text": "/stats"}})
+    replies = {message["chat_id"]: message["text"] for message in client.messages}
+    assert replies[5] == "该命令仅限管理员使用。"
+    assert replies[42].startswith("运行统计：")
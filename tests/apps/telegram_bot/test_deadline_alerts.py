@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import json
+from datetime import timedelta
+from typing import List
+
+from apps.telegram_bot.deadline_alerts import DeadlineAlertScheduler
+from core.repositories import TaskRepository
+from core.services import StatusGuard
+from core.utils.timezone import local_now
+
+
+class FakeTimer:
+    def __init__(self, delay, callback, args):
+        self.delay = delay
+        self._callback = callback
+        self._args = args
+        self.cancelled = False
+
+    def start(self) -> None:
+        pass
+
+    def fire(self) -> None:
+        if not self.cancelled:
+            self._callback(*self._args)
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+
+def test_scheduler_pushes_each_alert_once(tmp_path):
+    now = local_now()
+    processed = tmp_path / "processed_tasks.json"
+    processed.write_text(
+        json.dumps(
+            {
+                "late": {
+                    "name": "Late",
+                    "priority": "High",
+                    "status": "Todo",
+                    "due_date": (now - timedelta(hours=1)).isoformat(),
+                },
+                "next": {
+                    "name": "Next",
+                    "priority": "High",
+                    "status": "Todo",
+                    "due_date": (now + timedelta(hours=26)).isoformat(),
+                },
+            }
+        ),
+        encoding="utf-8",
+    )
+    repo = TaskRepository(processed_path=processed, custom_path=tmp_path / "agent_tasks.json")
+    timers: List[FakeTimer] = []
+    pushed: List[List[str]] = []
+
+    def factory(delay, callback, args):
+        timer = FakeTimer(delay, callback, args)
+        timers.append(timer)
+        return timer
+
+    scheduler = DeadlineAlertScheduler(
+        StatusGuard(repo),
+        repo,
+        handler=lambda items: pushed.append([item.task_id for item in items]),
+        timer_factory=factory,
+        storage_path=tmp_path / "deadline_alerts.json",
+    )
+    scheduler.start()
+    timers[-1].fire()
+    assert pushed == [["late"]]
+    # "next" enters the 24h window in two hours.
+    assert 2 * 3600 <= timers[-1].delay <= 2 * 3600 + 1
+
+    timers[-1].fire()
+    assert pushed == [["late"]]
+
+    task = repo.create_custom_task("Urgent", due_date=(now + timedelta(hours=1)).isoformat())
+    assert timers[-1].delay == 2.0
+    timers[-1].fire()
+    assert pushed == [["late"], [task.id]]
+
+    restarted = DeadlineAlertScheduler(
+        StatusGuard(repo),
+        repo,
+        handler=lambda items: pushed.append([item.task_id for item in items]),
+        timer_factory=factory,
+        storage_path=tmp_path / "deadline_alerts.json",
+    )
+    assert restarted.check_now() == []
+    scheduler.stop()
+    restarted.stop()
+
+
+def test_failed_alert_is_retried_on_the_next_check(tmp_path, write_json, task_payload):
+    now = local_now()
+    processed = write_json(
+        tmp_path / "processed_tasks.json",
+        {"late": task_payload("Late", due_date=(now - timedelta(hours=1)).isoformat())},
+    )
+    repo = TaskRepository(processed_path=processed, custom_path=tmp_path / "agent_tasks.json")
+    pushed: List[List[str]] = []
+
+    def handler(items):
+        if not pushed:
+            pushed.append([])
+            raise RuntimeError("telegram down")
+        pushed.append([item.task_id for item in items])
+
+    scheduler = DeadlineAlertScheduler(
+        StatusGuard(repo),
+        repo,
+        handler=handler,
+        timer_factory=FakeTimer,
+        storage_path=tmp_path / "deadline_alerts.json",
+    )
+    scheduler.check_now()
+    # Nothing was delivered, so nothing is recorded as sent.
+    assert not (tmp_path / "deadline_alerts.json").exists()
+    scheduler.check_now()
+    assert pushed == [[], ["late"]]
+    assert scheduler.check_now() == []
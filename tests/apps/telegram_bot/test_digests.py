@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import json
+from datetime import timedelta
+
+import pytest
+
+from apps.telegram_bot.digests import TaskDigestService
+from core.repositories import TaskRepository
+from core.utils.timezone import local_now
+
+
+@pytest.fixture
+def repo(tmp_path, write_json, task_payload):
+    late = (local_now() - timedelta(days=1)).isoformat()
+    processed = write_json(
+        tmp_path / "processed_tasks.json",
+        {
+            "aaaa-1": task_payload("Write docs", priority="Low", project_name="Docs"),
+            "bbbb-2": task_payload("Fix bug", priority="High", due_date=late),
+            "cccc-3": task_payload("Plan sprint"),
+        },
+    )
+    return TaskRepository(processed_path=processed, custom_path=tmp_path / "agent_tasks.json")
+
+
+def test_digest_views_follow_incremental_changes(repo, tmp_path, monkeypatch):
+    digests = TaskDigestService(repo, storage_path=tmp_path / "task_digests.json")
+    view = digests.today(limit=2)
+    assert view.task_ids == ["bbbb-2", "cccc-3"]
+    assert digests.today(limit=2) is view
+
+    def _fail():
+        raise AssertionError("full rebuild not expected")
+
+    monkeypatch.setattr(digests, "_rebuild", _fail)
+    task = repo.create_custom_task("Hotfix", priority="Urgent", project_name="Ops")
+    assert digests.today(limit=2).task_ids == [task.id, "bbbb-2"]
+    grouped = digests.projects(per_project_limit=1)
+    assert grouped.text.index("Ops") < grouped.text.index("Main") < grouped.text.index("Docs")
+    assert digests.overdue().task_ids == ["bbbb-2"]
+
+    repo.delete_custom_task(task.id)
+    assert digests.light(limit=5).task_ids == ["bbbb-2", "cccc-3", "aaaa-1"]
+
+
+def test_digest_snapshot_reused_while_sources_unchanged(repo, tmp_path, monkeypatch):
+    storage = tmp_path / "task_digests.json"
+    TaskDigestService(repo, storage_path=storage).today()
+    assert storage.exists()
+
+    monkeypatch.setattr(TaskDigestService, "_rebuild", lambda self: pytest.fail("snapshot ignored"))
+    restored = TaskDigestService(repo, storage_path=storage)
+    assert restored.today(limit=3).task_ids == ["bbbb-2", "cccc-3", "aaaa-1"]
+
+
+def test_overdue_skips_done_tasks_and_dates_due_later_today(tmp_path, write_json, task_payload):
+    now = local_now()
+    yesterday = (now - timedelta(days=1)).date().isoformat()
+    processed = write_json(
+        tmp_path / "processed_tasks.json",
+        {
+            "aaaa-1": task_payload("Late", due_date=yesterday),
+            "bbbb-2": task_payload("Shipped", due_date=yesterday, status="Done"),
+            "cccc-3": task_payload("Due today", due_date=now.date().isoformat()),
+        },
+    )
+    repo = TaskRepository(processed_path=processed, custom_path=tmp_path / "agent_tasks.json")
+    assert TaskDigestService(repo).overdue().task_ids == ["aaaa-1"]
+
+
+def test_incremental_changes_persist_once_per_debounce_window(repo, tmp_path):
+    storage = tmp_path / "task_digests.json"
+    timers = []
+
+    class _Timer:
+        def __init__(self, delay, callback, args):
+            self.callback = callback
+            timers.append(self)
+
+        def start(self):
+            pass
+
+        def cancel(self):
+            pass
+
+    digests = TaskDigestService(repo, storage_path=storage, timer_factory=_Timer)
+    digests.today()
+    written = storage.stat().st_mtime_ns
+    first = repo.create_custom_task("Hotfix", priority="Urgent")
+    second = repo.create_custom_task("Followup", priority="Low")
+    assert storage.stat().st_mtime_ns == written
+    assert len(timers) == 1
+
+    timers[0].callback()
+    assert set(json.loads(storage.read_text(encoding="utf-8"))["order"]) >= {first.id, second.id}
+    repo.delete_custom_task(second.id)
+    digests.close()
+    assert second.id not in json.loads(storage.read_text(encoding="utf-8"))["order"]
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import threading
+
+from apps.telegram_bot.dispatcher import UpdateDispatcher
+
+
+def _update(update_id: int, chat_id: int) -> dict:
+    return {"update_id": update_id, "message": {"message_id": update_id, "chat": {"id": chat_id}, "text": "hi"}}
+
+
+def test_dispatcher_runs_chats_in_parallel_and_checkpoints_in_order():
+    release_slow = threading.Event()
+    fast_done = threading.Event()
+    handled = []
+    checkpoints = []
+
+    def _handle(update: dict) -> None:
+        chat_id = update["message"]["chat"]["id"]
+        if update["update_id"] == 1:
+            # Chat 1 is stuck until chat 2 has been served.
+            assert release_slow.wait(timeout=5)
+        handled.append(update["update_id"])
+        if update["update_id"] == 3:
+            fast_done.set()
+
+    dispatcher = UpdateDispatcher(_handle, checkpoint=checkpoints.append, workers=2)
+    try:
+        dispatcher.submit(_update(1, chat_id=0))
+        dispatcher.submit(_update(2, chat_id=0))
+        dispatcher.submit(_update(3, chat_id=1))
+        assert fast_done.wait(timeout=5)
+        # Update 3 finished, but 1 is still running: no checkpoint yet.
+        assert checkpoints == []
+        release_slow.set()
+        assert dispatcher.join(timeout=5)
+    finally:
+        dispatcher.stop()
+    assert handled.index(1) < handled.index(2)
+    assert handled[0] == 3
+    assert checkpoints[-1] == 3
+    assert checkpoints == sorted(checkpoints)
+
+
+def test_dispatcher_survives_handler_errors():
+    checkpoints = []
+
+    def _handle(update: dict) -> None:
+        raise RuntimeError("boom")
+
+    dispatcher = UpdateDispatcher(_handle, checkpoint=checkpoints.append, workers=1)
+    try:
+        dispatcher.submit(_update(5, chat_id=9))
+        assert dispatcher.join(timeout=5)
+    finally:
+        dispatcher.stop()
+    assert checkpoints == [5]
+
+
+class _StopPolling(BaseException):
+    pass
+
+
+def test_polling_does_not_confirm_updates_that_are_still_queued():
+    from apps.telegram_bot.bot import BotRuntime
+
+    release = threading.Event()
+    handled = []
+    offsets = []
+
+    class _Server:
+        """Telegram keeps every update at or above the last offset."""
+
+        def __init__(self):
+            self.pending = [_update(1, chat_id=0), _update(2, chat_id=0)]
+
+        def delete_webhook(self):
+            pass
+
+        def get_updates(self, offset=None, timeout=25):
+            offsets.append(offset)
+            if len(offsets) > 3:
+                raise _StopPolling
+            self.pending = [u for u in self.pending if offset is None or u["update_id"] >= offset]
+            return list(self.pending)
+
+    class _History:
+        def __init__(self):
+            self.checkpoint = None
+
+        def last_update_id(self):
+            return self.checkpoint
+
+        def record_update_checkpoint(self, update_id):
+            self.checkpoint = update_id
+
+    def _handle(update):
+        assert release.wait(timeout=5)
+        handled.append(update["update_id"])
+
+    history = _History()
+    dispatcher = UpdateDispatcher(_handle, checkpoint=history.record_update_checkpoint, workers=1)
+    runtime = BotRuntime(client=_Server(), history=history, router=None, dispatcher=dispatcher)
+    try:
+        try:
+            runtime.run_forever()
+        except _StopPolling:
+            pass
+        # Nothing was handled yet, so Telegram was never told to drop anything.
+        assert offsets[:3] == [None, None, None]
+        release.set()
+        assert dispatcher.join(timeout=5)
+    finally:
+        dispatcher.stop()
+    assert handled == [1, 2]
+    assert history.checkpoint == 2
@@ -48,3 +48,49 @@ def test_append_bot_message(tmp_path: Path):
     history = store.get_history(1)
     assert history[-1].direction == "bot"
     assert history[-1].text == "pong"
+
+
+class _ManualTimer:
+    def __init__(self, delay, callback, args):
+        self.callback, self.args = callback, args
+        self.started = self.cancelled = False
+
+    def start(self):
+        self.started = True
+
+    def cancel(self):
+        self.cancelled = True
+
+
+def _saved_checkpoint(root: Path):
+    return json.loads((root / "metadata.json").read_text(encoding="utf-8")).get("last_update_id")
+
+
+def test_batched_checkpoint_is_flushed_by_timer_and_close(tmp_path: Path):
+    timers = []
+
+    def _factory(delay, callback, args):
+        timers.append(_ManualTimer(delay, callback, args))
+        return timers[-1]
+
+    store = HistoryStore(root_dir=tmp_path, durability="batched", flush_interval=5, timer_factory=_factory)
+    store.record_update_checkpoint(1)
+    store.record_update_checkpoint(2)
+    assert len(timers) == 1 and timers[0].started
+    assert store.last_update_id() == 2
+    assert _saved_checkpoint(tmp_path) is None
+
+    timers[0].callback(*timers[0].args)
+    assert _saved_checkpoint(tmp_path) == 2
+    store.record_update_checkpoint(3)
+    store.close()
+    assert timers[1].cancelled
+    assert _saved_checkpoint(tmp_path) == 3
+    assert HistoryStore(root_dir=tmp_path).last_update_id() == 3
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_always_durability_writes_every_checkpoint(tmp_path: Path):
+    store = HistoryStore(root_dir=tmp_path, durability="always")
+    store.record_update_checkpoint(7)
+    assert _saved_checkpoint(tmp_path) == 7
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from apps.telegram_bot.live_message import STREAM_CURSOR, LiveMessage, ProgressReporter
+
+
+class FakeClient:
+    def __init__(self):
+        self.sent = []
+        self.edits = []
+        self.actions = []
+
+    def send_chat_action(self, chat_id, action="typing"):
+        self.actions.append((chat_id, action))
+
+    def send_message(self, chat_id, text, parse_mode="Markdown", record_history=True, **kwargs):
+        self.sent.append({"text": text, "parse_mode": parse_mode, "record_history": record_history})
+        return {"message_id": 42}
+
+    def edit_message_text(self, chat_id, message_id, text, parse_mode="Markdown", record_history=False, **kwargs):
+        if parse_mode == "Markdown" and "*" in text:
+            raise RuntimeError("can't parse entities")
+        self.edits.append({"text": text, "parse_mode": parse_mode, "record_history": record_history})
+
+
+def test_live_message_throttles_edits_and_records_only_final_text():
+    client = FakeClient()
+    clock = [0.0]
+    live = LiveMessage(client, chat_id=7, min_interval=1.0, clock=lambda: clock[0])
+    live.start()
+    assert client.actions == [(7, "typing")]
+    assert client.sent[0]["record_history"] is False
+
+    clock[0] = 0.5
+    live.update("先")
+    assert client.edits == []
+    clock[0] = 1.2
+    live.update("先做")
+    clock[0] = 1.5
+    live.update("先做任务")
+    assert [edit["text"] for edit in client.edits] == ["先做" + STREAM_CURSOR]
+    assert client.edits[0]["record_history"] is False
+
+    assert live.finish("先做任务 *A") is True
+    final = client.edits[-1]
+    assert final == {"text": "先做任务 *A", "parse_mode": None, "record_history": True}
+
+
+def test_live_message_finish_reports_missing_placeholder():
+    class Broken(FakeClient):
+        def send_message(self, *args, **kwargs):
+            raise RuntimeError("network down")
+
+    live = LiveMessage(Broken(), chat_id=7)
+    live.start()
+    live.update("partial")
+    assert live.finish("done") is False
+
+
+def test_progress_reporter_edits_one_message_and_writes_final_status():
+    client = FakeClient()
+    clock = [0.0]
+    reporter = ProgressReporter(client, 7, "同步中", min_interval=2.0, max_lines=2, clock=lambda: clock[0])
+    reporter.start()
+    for step, now in enumerate([1.0, 2.5, 3.0, 3.5], start=1):
+        clock[0] = now
+        reporter.report(f"步骤 {step}")
+    reporter.finish("✅ 完成")
+
+    assert [sent["text"] for sent in client.sent] == ["同步中"]
+    assert [edit["text"] for edit in client.edits] == [
+        "同步中\n步骤 1\n步骤 2",
+        "同步中\n…\n步骤 3\n步骤 4\n✅ 完成",
+    ]
+    assert client.edits[-1]["record_history"] is True
+
+
+def test_progress_reporter_sends_status_when_placeholder_failed():
+    class Flaky(FakeClient):
+        def send_message(self, chat_id, text, parse_mode="Markdown", record_history=True, **kwargs):
+            if text == "同步中":
+                raise RuntimeError("network down")
+            return super().send_message(chat_id, text, parse_mode, record_history)
+
+    client = Flaky()
+    reporter = ProgressReporter(client, 7, "同步中")
+    reporter.start()
+    reporter.report("步骤 1")
+    reporter.finish("⚠️ 失败")
+    assert client.edits == []
+    assert client.sent[-1]["text"] == "同步中\n步骤 1\n⚠️ 失败"
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import requests
+
+from apps.telegram_bot.clients import TelegramAPIError
+from apps.telegram_bot.outbound import PRIORITY_REMINDER, OutboundQueue
+
+
+class GatedClient:
+    """Fake client whose first request blocks until ``gate`` is set."""
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.calls = []
+
+    def send_message(self, chat_id, text, **kwargs):
+        self._call(("send", chat_id, text))
+        return {"message_id": len(self.calls)}
+
+    def edit_message_text(self, chat_id, message_id, text, **kwargs):
+        self._call(("edit", message_id, text))
+        return {"message_id": message_id}
+
+    def _call(self, record):
+        if not self.calls:
+            assert self.gate.wait(timeout=5)
+        self.calls.append(record)
+
+
+def test_replies_overtake_queued_reminders_and_edits_coalesce():
+    client = GatedClient()
+    outbound = OutboundQueue(client, global_rate=1000, chat_rate=1000, chat_burst=100)
+    try:
+        first = outbound.send_message(1, "first")
+        time.sleep(0.05)  # let the sender pick it up and block
+        outbound.send_message(2, "reminder", priority=PRIORITY_REMINDER)
+        outbound.edit_message_text(3, 9, "draft 1")
+        last_edit = outbound.edit_message_text(3, 9, "draft 2")
+        reply = outbound.send_message(4, "reply")
+        client.gate.set()
+        assert first.result(timeout=5) == {"message_id": 1}
+        assert last_edit.result(timeout=5) == {"message_id": 9}
+        reply.result(timeout=5)
+    finally:
+        outbound.close()
+    assert client.calls == [
+        ("send", 1, "first"),
+        ("edit", 9, "draft 2"),
+        ("send", 4, "reply"),
+        ("send", 2, "reminder"),
+    ]
+
+
+def test_retry_after_holds_the_chat_then_delivers():
+    attempts = []
+
+    class FloodedClient:
+        def send_message(self, chat_id, text, **kwargs):
+            attempts.append(time.monotonic())
+            if len(attempts) == 1:
+                raise TelegramAPIError("Too Many Requests", status_code=429, retry_after=0.2)
+            return {"message_id": 5}
+
+    outbound = OutboundQueue(FloodedClient())
+    try:
+        assert outbound.send_message(1, "hi").result(timeout=5) == {"message_id": 5}
+    finally:
+        outbound.close()
+    assert len(attempts) == 2
+    assert attempts[1] - attempts[0] >= 0.2
+
+
+def test_per_chat_bucket_spaces_out_messages_and_client_errors_fail_fast():
+    sent = []
+
+    class Client:
+        def send_message(self, chat_id, text, **kwargs):
+            if text == "bad":
+                raise TelegramAPIError("can't parse entities", status_code=400)
+            sent.append(time.monotonic())
+            return {}
+
+    outbound = OutboundQueue(Client(), chat_rate=10, chat_burst=1)
+    try:
+        futures = [outbound.send_message(1, f"m{idx}") for idx in range(3)]
+        for future in futures:
+            future.result(timeout=5)
+        failed = outbound.send_message(2, "bad")
+        assert isinstance(failed.exception(timeout=5), TelegramAPIError)
+    finally:
+        outbound.close()
+    assert sent[2] - sent[0] >= 0.18
+
+
+def test_send_is_not_retried_after_a_read_timeout_but_is_after_connection_errors():
+    attempts = []
+
+    class FlakyClient:
+        def send_message(self, chat_id, text, **kwargs):
+            attempts.append(text)
+            if text == "slow":
+                raise requests.ReadTimeout("read timed out")
+            if attempts.count(text) == 1:
+                raise requests.ConnectionError("connection refused")
+            return {"message_id": 7}
+
+    outbound = OutboundQueue(FlakyClient())
+    try:
+        timed_out = outbound.send_message(1, "slow")
+        assert isinstance(timed_out.exception(timeout=5), requests.ReadTimeout)
+        assert outbound.send_message(2, "offline").result(timeout=5) == {"message_id": 7}
+    finally:
+        outbound.close()
+    assert attempts == ["slow", "offline", "offline"]
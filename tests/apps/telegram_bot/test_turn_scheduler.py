@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import threading
+
+from apps.telegram_bot.turn_scheduler import TurnScheduler
+
+
+def test_proactive_prompts_coalesce_behind_running_turn():
+    ran = []
+    release = threading.Event()
+    started = threading.Event()
+
+    def runner(chat_id, prompt):
+        ran.append((chat_id, prompt))
+        if len(ran) == 1:
+            started.set()
+            release.wait(2)
+
+    scheduler = TurnScheduler(runner)
+    worker = threading.Thread(target=scheduler.submit_proactive, args=(1, "state", "A"))
+    worker.start()
+    assert started.wait(2)
+    assert scheduler.submit_proactive(1, "question", "Q1") is False
+    assert scheduler.submit_proactive(1, "question", "Q2") is False
+    assert scheduler.submit_proactive(1, "state", "S") is False
+    release.set()
+    worker.join(2)
+
+    assert ran == [(1, "A"), (1, "Q2\nS")]
+    stats = scheduler.stats()
+    assert stats["proactive_turns"] == 2
+    assert stats["coalesced"] == 2
+
+
+def test_user_turn_supersedes_proactive_prompts():
+    ran = []
+    inside = threading.Event()
+    release = threading.Event()
+    scheduler = TurnScheduler(lambda chat_id, prompt: ran.append(prompt))
+
+    def user_turn():
+        inside.set()
+        release.wait(2)
+        return "reply"
+
+    result = []
+    worker = threading.Thread(target=lambda: result.append(scheduler.run_user_turn(1, user_turn)))
+    worker.start()
+    assert inside.wait(2)
+    assert scheduler.submit_proactive(1, "state", "stale") is False
+    # Other chats are not blocked.
+    assert scheduler.submit_proactive(2, "state", "other chat") is True
+    release.set()
+    worker.join(2)
+
+    assert result == ["reply"]
+    assert ran == ["other chat"]
+    assert scheduler.stats()["dropped"] == 1
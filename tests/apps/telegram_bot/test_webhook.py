@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import requests
+
+from apps.telegram_bot.dispatcher import UpdateDispatcher
+from apps.telegram_bot.webhook import SECRET_HEADER, WebhookServer
+
+
+class _FakeClient:
+    def __init__(self):
+        self.sent = []
+
+    def send_message(self, chat_id, text, **kwargs):
+        self.sent.append((chat_id, text))
+
+
+def _post(server: WebhookServer, payload: dict, secret: str = "s3cret", path: str = "/telegram"):
+    return requests.post(
+        f"http://127.0.0.1:{server.port}{path}",
+        json=payload,
+        headers={SECRET_HEADER: secret},
+        timeout=5,
+    )
+
+
+def test_webhook_verifies_secret_and_dedupes_updates():
+    client = _FakeClient()
+    checkpoints = []
+
+    def _handle(update):
+        message = update["message"]
+        client.send_message(message["chat"]["id"], f"echo:{message['text']}")
+
+    dispatcher = UpdateDispatcher(_handle, checkpoint=checkpoints.append, workers=2)
+    server = WebhookServer(dispatcher.submit, secret_token="s3cret", host="127.0.0.1", port=0).start()
+    update = {"update_id": 10, "message": {"message_id": 1, "chat": {"id": 5}, "text": "hi"}}
+    try:
+        assert _post(server, update, secret="wrong").status_code == 403
+        assert _post(server, update, path="/other").status_code == 404
+        assert _post(server, update).status_code == 200
+        assert _post(server, update).status_code == 200  # Telegram retry
+        assert dispatcher.join(timeout=5)
+    finally:
+        server.stop()
+        dispatcher.stop()
+    assert client.sent == [(5, "echo:hi")]
+    assert checkpoints == [10]
+
+
+class _StopPolling(BaseException):
+    pass
+
+
+def test_polling_clears_a_leftover_webhook_first(monkeypatch):
+    from apps.telegram_bot import bot
+
+    calls = []
+
+    class _PollingClient:
+        def delete_webhook(self):
+            calls.append("deleteWebhook")
+            if len(calls) == 1:
+                raise requests.ConnectionError("offline")
+
+        def get_updates(self, offset=None, timeout=25):
+            calls.append("getUpdates")
+            raise _StopPolling
+
+    class _History:
+        def last_update_id(self):
+            return None
+
+    monkeypatch.setattr(bot.time, "sleep", lambda seconds: None)
+    runtime = bot.BotRuntime(client=_PollingClient(), history=_History(), router=None)
+    try:
+        runtime.run_forever()
+    except _StopPolling:
+        pass
+    assert calls == ["deleteWebhook", "deleteWebhook", "getUpdates"]
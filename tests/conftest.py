@@ -1,7 +1,43 @@
+import json
 import sys
 from pathlib import Path
 
+import pytest
+
 
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+
+def _write_json(path: Path, payload: dict) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload), encoding="utf-8")
+    return path
+
+
+def _task_payload(name: str, **overrides) -> dict:
+    payload = {
+        "name": name,
+        "priority": "Medium",
+        "status": "Todo",
+        "content": "",
+        "project_id": "proj1",
+        "project_name": "Main",
+        "due_date": None,
+        "subtask_names": [],
+    }
+    payload.update(overrides)
+    return payload
+
+
+@pytest.fixture
+def write_json():
+    """``write_json(path, payload)`` writes a processed Notion export."""
+    return _write_json
+
+
+@pytest.fixture
+def task_payload():
+    """``task_payload(name, **overrides)`` builds one processed task record."""
+    return _task_payload
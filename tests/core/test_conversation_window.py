@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from apps.telegram_bot.history.history_store import HistoryEntry
+from core.llm.conversation_window import SUMMARY_HEADER, ConversationWindow
+
+
+def _entry(message_id: int, text: str, direction: str = "user") -> HistoryEntry:
+    return HistoryEntry(
+        chat_id=1,
+        message_id=message_id,
+        direction=direction,
+        text=text,
+        timestamp="2025-01-01T00:00:00",
+        reply_to=None,
+        raw={},
+    )
+
+
+def test_window_respects_budget_and_truncates_long_messages():
+    window = ConversationWindow(max_tokens=32, message_tokens=20)
+    entries = [_entry(1, "早上好"), _entry(2, "很长的消息。" * 50), _entry(3, "收到", "bot")]
+    summary, messages = window.fit(1, entries, complete=True)
+    assert messages[-1].role == "assistant" and messages[-1].content == "收到"
+    assert all(len(message.content) < 100 for message in messages)
+    assert messages[-2].content.endswith("…")
+    assert summary is not None and summary.startswith(SUMMARY_HEADER)
+    assert "早上好" in summary
+
+
+def test_summary_rolls_forward_and_keeps_commitments():
+    window = ConversationWindow(max_tokens=20, message_tokens=10, summary_tokens=40)
+    entries = [_entry(1, "明天 10 点前提交周报")]
+    entries += [_entry(idx, f"闲聊内容第{'一二三四五六七八'[idx - 2]}句") for idx in range(2, 10)]
+    summary, _ = window.fit(1, entries, complete=True)
+    assert "周报" in summary
+    # Unchanged window: the cached summary is reused verbatim.
+    assert window.fit(1, entries, complete=True)[0] is summary
+
+    later = entries + [_entry(10, "好的"), _entry(11, "继续")]
+    rolled, _ = window.fit(1, later[-8:], complete=False)
+    assert rolled != summary
+    assert "周报" in rolled
+
+
+def test_cleared_history_drops_summary():
+    window = ConversationWindow(max_tokens=10, message_tokens=5)
+    entries = [_entry(idx, f"消息{idx}") for idx in range(1, 8)]
+    assert window.fit(1, entries, complete=True)[0] is not None
+    summary, messages = window.fit(1, [_entry(50, "新的开始")], complete=True)
+    assert summary is None
+    assert [message.content for message in messages] == ["新的开始"]
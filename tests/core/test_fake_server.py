@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from core.llm.fake_server import FakeLLMServer, RuleResponder
+from core.llm.openai_client import OpenAIChatClient
+
+
+def _client(server: FakeLLMServer) -> OpenAIChatClient:
+    return OpenAIChatClient(api_key="test", base_url=server.base_url, model="fake", max_retries=0)
+
+
+def test_fake_server_scripts_tool_calls_and_replies():
+    with FakeLLMServer(RuleResponder(reply_chars=12), first_token_ms=0, tokens_per_second=0) as server:
+        client = _client(server)
+        first = client.chat(messages=[{"role": "user", "content": "今天有什么任务？"}], tools=[])
+        assert [call.name for call in first.tool_calls] == ["today_tasks"]
+        final = client.chat(
+            messages=[
+                {"role": "user", "content": "今天有什么任务？"},
+                {"role": "tool", "tool_call_id": "call_1", "content": "{}"},
+            ]
+        )
+        assert final.content and len(final.content) == 12
+        assert final.usage["prompt_tokens"] > 0
+    assert len(server.requests) == 2
+
+
+def test_fake_server_streams_chunks_with_usage():
+    with FakeLLMServer(RuleResponder(reply_chars=10), first_token_ms=0, tokens_per_second=0, chunk_chars=3) as server:
+        deltas = list(_client(server).chat_stream(messages=[{"role": "user", "content": "你好"}]))
+    fragments = [delta.content for delta in deltas if delta.content]
+    assert fragments == ["好的，", "我已经", "根据当", "前"]
+    assert deltas[-1].response.content == "".join(fragments)
+    assert deltas[-1].response.usage["completion_tokens"] == 4
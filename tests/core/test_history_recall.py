@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from apps.telegram_bot.history.history_store import HistoryStore
+from core.llm.history_recall import RECALL_HEADER, HistoryRecall
+
+
+def _user(store: HistoryStore, message_id: int, text: str) -> None:
+    store.append_user(
+        {
+            "update_id": message_id,
+            "message": {"message_id": message_id, "date": 1700000000, "chat": {"id": 1}, "text": text},
+        }
+    )
+
+
+def _bot(store: HistoryStore, message_id: int, text: str) -> None:
+    store.append_bot({"message_id": message_id, "date": 1700000000, "chat": {"id": 1}, "text": text})
+
+
+def test_recall_finds_archived_exchange_and_tracks_new_entries(tmp_path: Path):
+    store = HistoryStore(root_dir=tmp_path)
+    recall = HistoryRecall(store)
+    _user(store, 1, "我答应导师周五前交开题报告")
+    _bot(store, 2, "已记下：周五前提交开题报告。")
+    _user(store, 3, "今天天气不错")
+    store.clear_chat(1)
+    _user(store, 4, "随便聊聊")
+
+    found = recall.recall(1, "开题报告什么时候交？")
+    assert found is not None and found.startswith(RECALL_HEADER)
+    assert "导师" in found and "已记下" in found
+    assert "天气" not in found
+
+    # Entries appended after the index was built are searchable right away.
+    _user(store, 5, "健身房会员卡放在抽屉里")
+    assert "抽屉" in recall.recall(1, "会员卡在哪里")
+    assert recall.recall(1, "会员卡在哪里", exclude_message_ids=[5]) is None
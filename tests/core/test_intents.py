@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from core.llm.agent import LLMAgent
+from core.llm.intents import IntentRouter
+from core.llm.tools import AgentTool
+from core.utils.timezone import CURRENT_TZ
+
+
+def _router() -> IntentRouter:
+    return IntentRouter(clock=lambda: datetime(2025, 1, 6, 14, 0, tzinfo=CURRENT_TZ))
+
+
+def test_router_recognises_structured_messages():
+    router = _router()
+    log = router.match("记录：完成了开题报告初稿")
+    assert (log.tool, log.arguments) == ("record_log", {"text": "完成了开题报告初稿"})
+
+    rest = router.match("休息半小时")
+    assert rest.tool == "rest_propose" and rest.confidence >= router.threshold
+    assert rest.arguments["end"].startswith("2025-01-06T14:30")
+    assert router.match("休息 30 分钟").arguments == rest.arguments
+
+    stop = router.match("停止跟踪 周报")
+    assert stop.arguments == {"task_name": "周报"}
+    assert router.match("停止跟踪周报吗？") is None
+
+    reply = router.match("跟踪任务 周报 的进展反馈：写完了\n请结合任务链接 x 的状态，给出下一步建议。")
+    assert reply.arguments == {"task_name": "周报", "note": "写完了"}
+    vague = router.match("跟踪任务 周报 的进展反馈：不太顺利，下一步该怎么拆？\n请结合…")
+    assert vague.confidence < router.threshold
+
+    for negated in ("还没完成", "没搞定", "完成不了", "不想继续了"):
+        match = router.match(f"跟踪任务 周报 的进展反馈：{negated}\n请结合…")
+        assert match.confidence < router.threshold, negated
+        assert match.arguments == {}
+
+    assert router.match("今天有什么安排") is None
+    assert router.match("休息 600 分钟").confidence < router.threshold
+
+
+def test_agent_fast_path_skips_llm_and_reports_hit_rate():
+    class ExplodingClient:
+        def chat(self, **_):
+            raise AssertionError("LLM must not be called")
+
+    calls = []
+
+    def record(args, chat_id):
+        calls.append(args)
+        return {"message": f"日志已保存：{args['text']}"}
+
+    def refuse(args, chat_id):
+        return {"status": "error", "message": "no matching tracking"}
+
+    agent = LLMAgent(
+        context_builder=None,
+        task_service=None,
+        logbook_service=None,
+        status_guard=None,
+        tools=[AgentTool("record_log", "", {}, record), AgentTool("stop_tracker", "", {}, refuse)],
+        llm_client=ExplodingClient(),
+        intent_router=_router(),
+    )
+    assert agent.handle(1, "记录：调通接口") == ["日志已保存：调通接口"]
+    assert calls == [{"text": "调通接口"}]
+
+    # A failing tool falls through to the LLM (here: the rule fallback on error).
+    agent.handle(1, "停止跟踪 周报")
+    stats = agent.intent_stats()
+    assert stats["seen"] == 2 and stats["hit"] == 1 and stats["tool_error"] == 1
+    assert stats["hit_rate"] == 0.5
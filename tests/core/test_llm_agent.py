@@ -1,8 +1,10 @@
 from pathlib import Path
+from types import SimpleNamespace
 
 from apps.telegram_bot.history.history_store import HistoryStore
 from core.llm.agent import LLMAgent
 from core.llm.context_builder import AgentContextBuilder
+from core.llm.openai_client import OpenAIChatClient
 from core.llm.tools import build_default_tools
 from core.services.logbook_service import LogRecordResult
 
@@ -37,7 +39,7 @@ class DummyLogbookService:
         return LogRecordResult(message=f"日志已保存：{text}", task_name=None, stored=True)
 
 
-def _build_agent(tmp_path: Path) -> LLMAgent:
+def _build_agent(tmp_path: Path, llm_client=None) -> LLMAgent:
     history = HistoryStore(root_dir=tmp_path / "history")
     profile = tmp_path / "profile.md"
     profile.write_text("测试用户，讨厌拖延。", encoding="utf-8")
@@ -52,7 +54,7 @@ def _build_agent(tmp_path: Path) -> LLMAgent:
         logbook_service=logbook_service,
         status_guard=status_guard,
         tools=tools,
-        llm_client=None,
+        llm_client=llm_client,
     )
 
 
@@ -66,3 +68,108 @@ def test_llm_agent_fallback_log(tmp_path):
     agent = _build_agent(tmp_path)
     responses = agent.handle(chat_id=1, user_text="#log 进度更新")
     assert "日志已保存" in responses[0]
+
+
+def _chunk(content=None, tool_calls=None, usage=None):
+    choices = [] if content is None and tool_calls is None else [
+        SimpleNamespace(delta=SimpleNamespace(content=content, tool_calls=tool_calls))
+    ]
+    return SimpleNamespace(choices=choices, usage=usage)
+
+
+def _tool_delta(index, call_id=None, name=None, arguments=None):
+    return SimpleNamespace(
+        index=index, id=call_id, function=SimpleNamespace(name=name, arguments=arguments)
+    )
+
+
+class _FakeCompletions:
+    def __init__(self, streams):
+        self._streams = list(streams)
+
+    def create(self, **kwargs):
+        assert kwargs["stream"] is True
+        return iter(self._streams.pop(0))
+
+
+def _streaming_client(streams) -> OpenAIChatClient:
+    sdk = SimpleNamespace(chat=SimpleNamespace(completions=_FakeCompletions(streams)))
+    return OpenAIChatClient(api_key="test", base_url="", model="test", client=sdk)
+
+
+def test_llm_agent_streams_partial_text_across_tool_calls(tmp_path):
+    usage = SimpleNamespace(prompt_tokens=10, completion_tokens=5, total_tokens=15)
+    client = _streaming_client(
+        [
+            [
+                _chunk(tool_calls=[_tool_delta(0, "call-1", "today_", "{")]),
+                _chunk(tool_calls=[_tool_delta(0, None, "tasks", "}")]),
+                _chunk(usage=usage),
+            ],
+            [_chunk("先做"), _chunk("测试任务 A。"), _chunk(usage=usage)],
+        ]
+    )
+    agent = _build_agent(tmp_path, llm_client=client)
+    partials = []
+    responses = agent.handle(chat_id=1, user_text="今天做什么", on_partial=partials.append)
+    assert responses == ["先做测试任务 A。"]
+    assert partials == ["先做", "先做测试任务 A。"]
+
+
+def test_llm_agent_runs_read_only_tools_concurrently(tmp_path):
+    import threading
+
+    from core.llm.openai_client import ToolCall
+    from core.llm.tools import AgentTool
+
+    barrier = threading.Barrier(2, timeout=2)
+    order = []
+
+    def reader(name):
+        def _execute(_, __):
+            barrier.wait()  # deadlocks (and times out) if run sequentially
+            order.append(name)
+            return {"name": name}
+
+        return _execute
+
+    def writer(_, __):
+        order.append("write")
+        return {"ok": True}
+
+    agent = _build_agent(tmp_path)
+    agent._tools = {
+        "read_a": AgentTool("read_a", "", {}, reader("read_a"), read_only=True),
+        "read_b": AgentTool("read_b", "", {}, reader("read_b"), read_only=True),
+        "write": AgentTool("write", "", {}, writer),
+    }
+    calls = [ToolCall("read_a", "{}"), ToolCall("read_b", "{}"), ToolCall("write", "{}")]
+    observations, results = agent._execute_tool_calls(calls, chat_id=1)
+
+    assert [obs["tool_call_id"] for obs in observations] == ["call-0", "call-1", "call-2"]
+    assert [result["status"] for result in results] == ["ok", "ok", "ok"]
+    assert all("duration_ms" in result for result in results)
+    assert order[-1] == "write"
+
+
+def test_context_prefix_is_stable_and_volatile_data_trails(tmp_path):
+    agent = _build_agent(tmp_path)
+    builder = agent._context_builder
+    first = builder.build_messages(1, "你好")
+    second = builder.build_messages(1, "现在几点")
+    assert first[0] == second[0]
+    assert "当前北京时间：" not in first[0]["content"]
+    assert first[-2]["role"] == "system" and first[-2]["content"].startswith("当前北京时间")
+    assert first[-1] == {"role": "user", "content": "你好"}
+
+
+def test_stream_usage_reports_cached_prompt_tokens():
+    usage = SimpleNamespace(
+        prompt_tokens=100,
+        completion_tokens=5,
+        total_tokens=105,
+        prompt_tokens_details=SimpleNamespace(cached_tokens=64),
+    )
+    client = _streaming_client([[_chunk("好"), _chunk(usage=usage)]])
+    final = list(client.chat_stream(messages=[]))[-1].response
+    assert final.usage["cached_tokens"] == 64
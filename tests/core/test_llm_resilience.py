@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from core.llm.openai_client import OpenAIChatClient
+from core.llm.resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+def _response(text):
+    message = SimpleNamespace(content=text, tool_calls=None)
+    usage = SimpleNamespace(prompt_tokens=1, completion_tokens=1, total_tokens=2)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+
+class _Completions:
+    def __init__(self, behaviour):
+        self.behaviour = behaviour
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        return self.behaviour()
+
+
+def _sdk(behaviour):
+    completions = _Completions(behaviour)
+    return SimpleNamespace(chat=SimpleNamespace(completions=completions)), completions
+
+
+def test_breaker_opens_and_half_opens():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=10, clock=lambda: now[0])
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow()
+    now[0] = 11
+    assert breaker.state == HALF_OPEN and breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+def test_client_fails_over_and_short_circuits():
+    def boom():
+        raise TimeoutError("read timeout")
+
+    primary_sdk, primary = _sdk(boom)
+    backup_sdk, backup = _sdk(lambda: _response("备用"))
+    fallback = SimpleNamespace(provider="deepseek", base_url="", model="backup", api_key="k")
+    client = OpenAIChatClient(
+        api_key="k", base_url="", model="main", client=primary_sdk, fallbacks=[fallback], breaker_failures=2
+    )
+    client._endpoints[1].client = backup_sdk
+
+    for _ in range(3):
+        assert client.chat(messages=[]).content == "备用"
+    # The primary breaker opened after two failures and was skipped afterwards.
+    assert primary.calls == 2 and backup.calls == 3
+    stats = client.stats()["openai:main"]
+    assert stats["timeouts"] == 2 and stats["short_circuited"] == 1 and stats["circuit"] == OPEN
+
+    client._endpoints[1].breaker.record_failure()
+    client._endpoints[1].breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        client.chat(messages=[])
+
+
+def test_hedged_request_returns_first_success():
+    release = threading.Event()
+
+    def slow():
+        release.wait(2)
+        return _response("慢")
+
+    primary_sdk, _ = _sdk(slow)
+    backup_sdk, _ = _sdk(lambda: _response("快"))
+    fallback = SimpleNamespace(provider="openai", base_url="", model="backup", api_key="k")
+    client = OpenAIChatClient(
+        api_key="k", base_url="", model="main", client=primary_sdk, fallbacks=[fallback], hedge_after_seconds=0.05
+    )
+    client._endpoints[1].client = backup_sdk
+    try:
+        assert client.chat(messages=[]).content == "快"
+    finally:
+        release.set()
+
+
+def test_concurrent_hedged_turns_do_not_queue_behind_each_other():
+    release = threading.Event()
+
+    def slow():
+        release.wait(5)
+        return _response("慢")
+
+    primary_sdk, _ = _sdk(slow)
+    backup_sdk, _ = _sdk(lambda: _response("快"))
+    fallback = SimpleNamespace(provider="openai", base_url="", model="backup", api_key="k")
+    client = OpenAIChatClient(
+        api_key="k",
+        base_url="",
+        model="main",
+        client=primary_sdk,
+        fallbacks=[fallback],
+        hedge_after_seconds=0.05,
+        max_concurrent_calls=2,
+    )
+    client._endpoints[1].client = backup_sdk
+    answers = []
+    turns = [threading.Thread(target=lambda: answers.append(client.chat(messages=[]).content)) for _ in range(2)]
+    try:
+        for turn in turns:
+            turn.start()
+        for turn in turns:
+            turn.join(timeout=2)
+        assert answers == ["快", "快"]
+    finally:
+        release.set()
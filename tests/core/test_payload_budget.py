@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+from core.llm.payload_budget import budget_log_payloads, budget_task_payloads
+from core.llm.tokens import estimate_json_tokens, estimate_tokens, truncate_to_tokens
+from core.utils.timezone import local_now
+
+
+def _payload(task_id: str, priority: str, due_date=None, content: str = "", logs=None) -> dict:
+    return {
+        "id": task_id,
+        "name": f"任务 {task_id}",
+        "priority": priority,
+        "status": "Todo",
+        "due_date": due_date,
+        "project": "Main",
+        "content": content,
+        "subtasks": [],
+        "url": None,
+        "logs": logs or [],
+    }
+
+
+def test_truncate_to_tokens_keeps_sentence_bounds():
+    text = "第一步：整理需求。第二步：拆分任务。第三步：排期上线。"
+    shortened = truncate_to_tokens(text, 12)
+    assert shortened.endswith("…")
+    assert shortened.startswith("第一步")
+    assert estimate_tokens(shortened) <= estimate_tokens(text)
+
+
+def test_budget_task_payloads_prioritises_and_reports_elisions():
+    now = local_now()
+    logs = [{"id": f"log-{idx}", "content": f"进展 {idx}"} for idx in range(5)]
+    payloads = [
+        _payload("low", "Low", content="说明" * 400),
+        _payload("overdue", "Low", due_date=(now - timedelta(hours=2)).isoformat(), logs=logs),
+        _payload("urgent", "Urgent"),
+    ]
+    original = [dict(item) for item in payloads]
+
+    kept, report = budget_task_payloads(payloads, 10_000, now=now)
+    assert [item["id"] for item in kept] == ["overdue", "urgent", "low"]
+    assert [log["id"] for log in kept[0]["logs"]] == ["log-2", "log-3", "log-4"]
+    assert report.logs_dropped == 2
+    assert report.truncated == ["low"]
+    assert payloads == original
+
+    tight, report = budget_task_payloads(payloads, 200, now=now)
+    assert estimate_json_tokens(tight) <= 200
+    elided = report.to_dict("hint")
+    assert elided["hint"] == "hint"
+    assert set(report.compacted + report.omitted) & {"overdue", "urgent", "low"}
+
+
+def test_budget_log_payloads_keeps_newest():
+    logs = [{"id": f"log-{idx}", "content": "记录" * 30} for idx in range(10)]
+    kept, report = budget_log_payloads(logs, 250)
+    assert kept[-1]["id"] == "log-9"
+    assert "log-0" in report.omitted
+    assert sorted(report.omitted + [log["id"] for log in kept]) == [log["id"] for log in logs]
+
+
+def test_bare_due_date_is_not_overdue_until_the_day_ends():
+    now = local_now().replace(hour=12, minute=0, second=0, microsecond=0)
+    payloads = [
+        _payload("today", "High", due_date=now.date().isoformat()),
+        _payload("late", "Low", due_date=(now - timedelta(hours=1)).isoformat()),
+    ]
+    kept, _ = budget_task_payloads(payloads, 10_000, now=now)
+    assert [item["id"] for item in kept] == ["late", "today"]
@@ -0,0 +1,179 @@
+import json
+import threading
+from datetime import datetime
+
+from core.domain import LogEntry
+from core.repositories import LogRepository, TaskRepository
+from core.repositories.interning import StringPool, shared_pool
+
+
+def test_task_repository_interns_categorical_fields(tmp_path, write_json, task_payload):
+    processed = tmp_path / "processed_tasks.json"
+    write_json(
+        processed,
+        {
+            "aaaa-1": task_payload("A"),
+            "bbbb-2": task_payload("B", subtask_names=["A"]),
+        },
+    )
+    repo = TaskRepository(processed_path=processed, custom_path=tmp_path / "agent_tasks.json")
+    first, second = repo.list_active_tasks()
+    assert first.status is second.status
+    assert first.project_name is second.project_name
+    assert second.subtask_names[0] is first.name
+
+
+def test_string_pool_gives_each_new_value_its_own_code():
+    pool = StringPool()
+    barrier = threading.Barrier(8)
+    results = {}
+
+    def _intern(worker: int) -> None:
+        barrier.wait()
+        for idx in range(200):
+            value = f"status-{worker}-{idx}"
+            results[value] = (pool.intern(value), pool.code(value))
+
+    threads = [threading.Thread(target=_intern, args=(worker,)) for worker in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(interned == value for value, (interned, _) in results.items())
+    assert len({code for _, code in results.values()}) == len(results) == len(pool)
+    assert all(pool.value(code) == value for value, (_, code) in results.items())
+
+
+def test_task_repository_derives_notion_urls(tmp_path, write_json, task_payload):
+    processed = tmp_path / "processed_tasks.json"
+    write_json(
+        processed,
+        {
+            "aaaa-1": task_payload("A", page_url="https://www.notion.so/A-aaaa1"),
+            "bbbb-2": task_payload("B", page_url="https://example.com/b"),
+        },
+    )
+    repo = TaskRepository(processed_path=processed, custom_path=tmp_path / "agent_tasks.json")
+    derived = repo.get_task("aaaa-1")
+    assert derived.page_url is None
+    assert derived.url == "https://www.notion.so/aaaa1"
+    assert repo.get_task("bbbb-2").url == "https://example.com/b"
+    custom = repo.create_custom_task("本地任务")
+    assert custom.url is None
+
+
+def test_memory_report_counts_entities(tmp_path, write_json):
+    processed = tmp_path / "processed_logs.json"
+    write_json(
+        processed,
+        {
+            f"log-{idx}": {
+                "name": f"2025-01-0{idx} 10:00",
+                "status": "Captured",
+                "content": "进展",
+                "task_id": "aaaa-1",
+                "task_name": "A",
+            }
+            for idx in range(1, 4)
+        },
+    )
+    repo = LogRepository(processed_path=processed, custom_path=tmp_path / "agent_logs.json")
+    report = repo.memory_report()
+    assert report["entities"] == 3
+    assert 0 < report["bytes_per_entity"] <= report["bytes"]
+
+
+def _build_log_repo(tmp_path, write_json) -> LogRepository:
+    processed = tmp_path / "processed_logs.json"
+    write_json(
+        processed,
+        {
+            "log-1": {
+                "name": "周报",
+                "status": "Done",
+                "content": "整理周报",
+                "task_id": "task-a",
+                "task_name": "A",
+                "created_at": "2025-01-01T09:00:00+08:00",
+            },
+            "log-2": {
+                "name": "2025-01-02 10:00",
+                "status": "Captured",
+                "content": "修复 bug",
+                "task_id": "task-b",
+                "task_name": "B",
+            },
+            "log-3": {
+                "name": "2025-01-03 10:00",
+                "status": "Captured",
+                "content": "继续修复",
+                "task_id": "task-a",
+                "task_name": "A",
+            },
+        },
+    )
+    return LogRepository(processed_path=processed, custom_path=tmp_path / "agent_logs.json")
+
+
+def test_query_logs_filters_and_orders(tmp_path, write_json):
+    repo = _build_log_repo(tmp_path, write_json)
+    assert [log.id for log in repo.query_logs(limit=2)] == ["log-3", "log-2"]
+    assert [log.id for log in repo.query_logs(task_id="task-a", newest_first=False)] == ["log-1", "log-3"]
+    assert [log.id for log in repo.query_logs(status="Captured", contains="修复", offset=1)] == ["log-2"]
+    pooled = len(shared_pool)
+    assert list(repo.query_logs(status="LLM 编的状态")) == []
+    assert len(shared_pool) == pooled
+    since = datetime.fromisoformat("2025-01-02T00:00:00+08:00")
+    assert [log.id for log in repo.query_logs(since=since)] == ["log-3", "log-2"]
+
+    repo.add_local_log(
+        LogEntry(
+            id="log-4",
+            name="2025-01-04 10:00",
+            status="Captured",
+            content="新增",
+            task_id="task-a",
+            task_name="A",
+        )
+    )
+    repo.update_log("log-1", task_id="task-b")
+    assert [log.id for log in repo.query_logs(task_id="task-a")] == ["log-4", "log-3"]
+    assert repo.delete_log("log-3")
+    assert repo.query_logs(task_id="task-a").first().id == "log-4"
+    assert [log.id for log in repo.query_logs(task_id="task-b")] == ["log-2", "log-1"]
+
+
+def test_concurrent_local_logs_are_all_persisted(tmp_path, write_json):
+    repo = _build_log_repo(tmp_path, write_json)
+    start = threading.Barrier(4)
+
+    def _writer(worker: int) -> None:
+        start.wait()
+        for idx in range(25):
+            repo.add_local_log(LogEntry(f"w{worker}-{idx}", "2025-01-04 10:00", "Captured", "并发", "task-c", "C"))
+
+    threads = [threading.Thread(target=_writer, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stored = json.loads((tmp_path / "agent_logs.json").read_text(encoding="utf-8"))
+    assert len(stored) == 100
+    assert len(repo.list_logs()) == 103
+
+
+def test_concurrent_cold_queries_build_the_index_once(tmp_path, write_json):
+    repo = _build_log_repo(tmp_path, write_json)
+    start = threading.Barrier(8)
+    results = []
+
+    def _query() -> None:
+        start.wait()
+        results.append([log.id for log in repo.query_logs(task_id="task-a", newest_first=False)])
+
+    threads = [threading.Thread(target=_query) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [["log-1", "log-3"]] * 8
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import gzip
+import json
+from pathlib import Path
+
+from core.llm.run_logger import AgentRunLogger
+
+
+def _lines(path: Path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_run_logger_writes_in_background_and_rotates(tmp_path: Path):
+    run_logger = AgentRunLogger(tmp_path, max_bytes=400, backup_count=2, flush_interval=0.05)
+    for idx in range(3):
+        run_logger.log(7, {"user_text": f"消息{idx}", "responses": ["好" * 100]})
+        run_logger.flush()
+    run_logger.close()
+
+    segments = sorted(tmp_path.glob("7.*.jsonl.gz"))
+    assert 1 <= len(segments) <= 2
+    with gzip.open(segments[0], "rt", encoding="utf-8") as file:
+        assert json.loads(file.readline())["chat_id"] == 7
+    assert _lines(tmp_path / "7.jsonl")[-1]["user_text"] == "消息2"
+
+
+def test_run_logger_redacts_bulky_payloads(tmp_path: Path):
+    run_logger = AgentRunLogger(tmp_path, redact=True, payload_chars=10, flush_interval=0.05)
+    run_logger.log(1, {"stages": [{"stage": "intent", "result": {"content": "x" * 50}}]})
+    run_logger.flush()
+    run_logger.close()
+    content = _lines(tmp_path / "1.jsonl")[0]["stages"][0]["result"]["content"]
+    assert content == "x" * 10 + "…(+40)"
@@ -0,0 +1,45 @@
+from datetime import timedelta
+
+from core.repositories import TaskRepository
+from core.services import StatusGuard
+from core.utils.timezone import local_now
+
+
+def _build_repo(tmp_path, now, write_json, task_payload) -> TaskRepository:
+    processed = write_json(
+        tmp_path / "processed_tasks.json",
+        {
+            "soon": task_payload("Soon", due_date=(now + timedelta(hours=2)).isoformat()),
+            "late": task_payload("Late", due_date=(now - timedelta(hours=1)).isoformat()),
+            "later": task_payload("Later", due_date=(now + timedelta(days=3)).isoformat()),
+            "done": task_payload("Done", due_date=(now - timedelta(days=1)).isoformat(), status="Done"),
+            "undated": task_payload("Undated"),
+        },
+    )
+    return TaskRepository(processed_path=processed, custom_path=tmp_path / "agent_tasks.json")
+
+
+def test_evaluate_reports_overdue_and_due_soon(tmp_path, write_json, task_payload):
+    now = local_now()
+    guard = StatusGuard(_build_repo(tmp_path, now, write_json, task_payload))
+    interventions = guard.evaluate(now)
+    assert [(item.task_id, item.reason) for item in interventions] == [
+        ("late", "overdue"),
+        ("soon", "due_soon"),
+    ]
+    assert guard.next_transition(now) == now + timedelta(hours=2)
+
+
+def test_due_index_follows_custom_task_changes(tmp_path, write_json, task_payload):
+    now = local_now()
+    repo = _build_repo(tmp_path, now, write_json, task_payload)
+    guard = StatusGuard(repo)
+    task = repo.create_custom_task("Custom", due_date=(now + timedelta(minutes=30)).isoformat())
+    assert guard.next_transition(now) == now + timedelta(minutes=30)
+
+    repo.update_custom_task(task.id, due_date=now.date().isoformat())
+    due_dates = {t.id: due for due, t in repo.tasks_due_between(start=now)}
+    assert due_dates[task.id].hour == 23
+
+    repo.delete_custom_task(task.id)
+    assert task.id not in {t.id for _, t in repo.tasks_due_between()}
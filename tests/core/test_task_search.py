@@ -0,0 +1,57 @@
+from core.domain import LogEntry
+from core.repositories import LogRepository, TaskRepository
+from core.services import TaskSearchIndex
+from core.utils.text_search import tokenize
+
+
+def _build(tmp_path, write_json, task_payload):
+    write_json(
+        tmp_path / "processed_tasks.json",
+        {
+            "task-a": task_payload("撰写周报", content="汇总本周进展"),
+            "task-b": task_payload("Fix login bug", content="用户反馈登录失败"),
+            "task-c": task_payload("整理文档", subtask_names=["周报模板"]),
+        },
+    )
+    task_repo = TaskRepository(
+        processed_path=tmp_path / "processed_tasks.json",
+        custom_path=tmp_path / "agent_tasks.json",
+    )
+    log_repo = LogRepository(
+        processed_path=tmp_path / "processed_logs.json",
+        custom_path=tmp_path / "agent_logs.json",
+    )
+    return task_repo, log_repo, TaskSearchIndex(task_repo, log_repo)
+
+
+def test_tokenize_mixes_cjk_bigrams_and_words():
+    assert tokenize("修复 Login 周报v2") == ["修复", "login", "周报", "v2"]
+
+
+def test_search_ranks_name_matches_first(tmp_path, write_json, task_payload):
+    _, _, index = _build(tmp_path, write_json, task_payload)
+    results = index.search("周报")
+    assert [result.task_id for result in results] == ["task-a", "task-c"]
+    assert "周报" in results[0].snippets["name"]
+    assert index.search("LOGIN")[0].task_id == "task-b"
+
+
+def test_search_follows_repository_changes(tmp_path, write_json, task_payload):
+    task_repo, log_repo, index = _build(tmp_path, write_json, task_payload)
+    assert index.search("数据库") == []
+
+    log_repo.add_local_log(
+        LogEntry(id="log-1", name="2025-01-01 10:00", status="Captured", content="排查数据库连接", task_id="task-b", task_name="Fix login bug")
+    )
+    hit = index.search("数据库")[0]
+    assert hit.task_id == "task-b"
+    assert "数据库" in hit.snippets["logs"]
+
+    log_repo.update_log("log-1", task_id="task-a")
+    assert [result.task_id for result in index.search("数据库")] == ["task-a"]
+
+    custom = task_repo.create_custom_task("数据库迁移")
+    assert index.search("数据库")[0].task_id == custom.id
+    task_repo.delete_custom_task(custom.id)
+    log_repo.delete_log("log-1")
+    assert index.search("数据库") == []
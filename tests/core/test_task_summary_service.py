@@ -2,7 +2,8 @@ import json
 from importlib import reload
 from pathlib import Path
 
-from core.repositories import ProjectRepository, TaskRepository
+from core.domain import LogEntry
+from core.repositories import LogRepository, LogView, ProjectRepository, TaskRepository
 from core.services import TaskSummaryService
 from data_pipeline.storage import paths
 
@@ -11,6 +12,9 @@ class DummyLogRepo:
     def list_logs(self):
         return []
 
+    def query_logs(self, **_):
+        return LogView(lambda: iter(()))
+
 
 def _write_json(path: Path, payload: dict):
     path.parent.mkdir(parents=True, exist_ok=True)
@@ -60,3 +64,42 @@ def test_task_summary_orders_by_priority(tmp_path, monkeypatch):
     assert summary.index("Urgent task") < summary.index("Low priority")
     monkeypatch.delenv("DATA_DIR", raising=False)
     reload(paths)
+
+
+def test_task_payloads_are_cached_per_generation(tmp_path):
+    tasks_path = tmp_path / "processed_tasks.json"
+    _write_json(
+        tasks_path,
+        {
+            "task1": {
+                "name": "Write report",
+                "priority": "High",
+                "status": "Todo",
+                "content": "",
+                "project_id": "proj1",
+                "project_name": "Main",
+                "due_date": None,
+                "subtask_names": [],
+            },
+        },
+    )
+    task_repo = TaskRepository(processed_path=tasks_path, custom_path=tmp_path / "agent_tasks.json")
+    log_repo = LogRepository(
+        processed_path=tmp_path / "processed_logs.json",
+        custom_path=tmp_path / "agent_logs.json",
+    )
+    project_repo = ProjectRepository(processed_path=tmp_path / "processed_projects.json")
+    service = TaskSummaryService(task_repo, project_repo, log_repo)
+
+    first = service.build_task_payloads()
+    assert service.build_task_payloads()[0] is first[0]
+
+    log_repo.add_local_log(
+        LogEntry(id="log-1", name="2025-01-01 10:00", status="Captured", content="开工", task_id="task1", task_name="Write report")
+    )
+    refreshed = service.get_task_payload("task1")
+    assert refreshed is not first[0]
+    assert [log["content"] for log in refreshed["logs"]] == ["开工"]
+
+    task_repo.create_custom_task("Urgent fix", priority="Urgent")
+    assert [payload["name"] for payload in service.build_task_payloads()] == ["Urgent fix", "Write report"]
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from core.utils.telemetry import Histogram, Telemetry
+
+
+def test_histogram_percentiles_follow_recent_window():
+    histogram = Histogram(window=10)
+    for value in range(1, 101):
+        histogram.add(float(value))
+    data = histogram.to_dict()
+    assert data["count"] == 100
+    assert data["p50_ms"] == 95.0
+    assert data["p95_ms"] == 100.0
+
+
+def test_telemetry_spans_and_token_counters():
+    telemetry = Telemetry()
+    with telemetry.span("llm_call"):
+        pass
+    telemetry.add_usage(7, {"prompt_tokens": 120, "completion_tokens": 30, "cached_tokens": 100})
+    telemetry.add_usage(7, {"prompt_tokens": 80, "completion_tokens": 10})
+    telemetry.add_tokens("tool:today_tasks", {"result_tokens": 42})
+
+    snapshot = telemetry.snapshot()
+    assert snapshot["timings"]["llm_call"]["count"] == 1
+    assert snapshot["tokens"]["chat:7"] == {"prompt_tokens": 200, "completion_tokens": 40, "cached_tokens": 100}
+    lines = telemetry.report_lines()
+    assert lines[0].startswith("llm_call: n=1")
+    assert "tool:today_tasks: result_tokens=42" in lines
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from core.llm.agent import LLMAgent
+from core.llm.openai_client import ChatResponse, ToolCall
+from core.llm.tool_selector import ToolSelector
+from core.llm.tools import AgentTool
+
+
+def _tool(name: str, group: str, executor=None) -> AgentTool:
+    return AgentTool(name, name, {"type": "object", "properties": {}}, executor or (lambda *_: {"ok": True}), group=group)
+
+
+TOOLS = [
+    _tool("today_tasks", "tasks"),
+    _tool("record_log", "logs"),
+    _tool("start_tracker", "tracking"),
+    _tool("rest_propose", "rest"),
+    _tool("report_state", "state"),
+    _tool("refresh_notion_data", "sync"),
+]
+
+
+def test_selector_picks_groups_from_text_and_recent_usage():
+    selector = ToolSelector(TOOLS, recent_turns=2)
+    everyday = {"tasks", "logs", "tracking", "rest", "state"}
+    assert selector.select(1, "在吗") == everyday
+    assert selector.select(1, "帮我休息一下，顺便同步 Notion") == everyday | {"sync"}
+    assert selector.select(1, "系统提醒：用户的行动状态超过设定时间未更新。请询问。") == {"tasks", "state"}
+
+    selector.record_usage(1, ["refresh_notion_data"])
+    assert "sync" in selector.select(1, "好的")
+    selector.record_usage(1, [])
+    selector.record_usage(1, [])
+    assert "sync" not in selector.select(1, "好的")
+
+    schemas, names = selector.schemas(frozenset({"tasks", "state"}))
+    assert [schema["function"]["name"] for schema in schemas] == ["today_tasks", "report_state"]
+    assert selector.schemas(frozenset({"state", "tasks"}))[0] is schemas
+    assert names == {"today_tasks", "report_state"}
+
+
+def test_plain_log_tracking_and_state_phrasings_keep_their_tools():
+    selector = ToolSelector(TOOLS)
+    for text, tool in [
+        ("刚跑完5公里", "record_log"),
+        ("报告初稿搞定了", "record_log"),
+        ("开始写周报，半小时后问我", "start_tracker"),
+        ("我现在好困", "report_state"),
+    ]:
+        _, names = selector.schemas(selector.select(1, text))
+        assert tool in names, text
+    tracker_reply = "跟踪任务 周报 的进展反馈：写了一半\n请结合任务链接 x 的状态，给出下一步建议。"
+    _, names = selector.schemas(selector.select(2, tracker_reply))
+    assert {"record_log", "start_tracker"} <= names
+    assert "rest_propose" not in names
+
+
+def test_agent_reoffers_full_tool_set_for_hidden_tool():
+    class Builder:
+        def build_messages(self, chat_id, text):
+            return [{"role": "user", "content": text}]
+
+    class Client:
+        def __init__(self):
+            self.offered = []
+            self.replies = [
+                ChatResponse(None, [ToolCall("refresh_notion_data", "{}")], {}),
+                ChatResponse(None, [ToolCall("refresh_notion_data", "{}")], {}),
+                ChatResponse("已同步", [], {}),
+            ]
+
+        def chat(self, messages, tools, temperature):
+            self.offered.append(len(tools))
+            return self.replies.pop(0)
+
+    client = Client()
+    agent = LLMAgent(
+        context_builder=Builder(),
+        task_service=None,
+        logbook_service=None,
+        status_guard=None,
+        tools=TOOLS,
+        llm_client=client,
+        tool_selector=ToolSelector(TOOLS),
+    )
+    prompt = "系统提醒：用户的行动状态超过设定时间未更新。请询问。"
+    assert agent.handle(1, prompt) == ["已同步"]
+    assert client.offered == [2, len(TOOLS), len(TOOLS)]